@@ -2,8 +2,33 @@ import PyInstaller.__main__
 import os
 import json
 import sys
+import time
+import zipfile
+import tempfile
+import subprocess
 from multiprocessing import cpu_count
 
+# Single-file copy of assets/, read at runtime by scripts/resources.py (ASSET_BUNDLE there)
+ASSET_BUNDLE_NAME = 'assets.bundle'
+
+# Modules desktop_pet imports by name when each startup stage runs, which the
+# analysis cannot see
+LAZY_IMPORTS = ['audio_engine', 'text_to_speech', 'voice_assistant', 'settings_dialog']
+
+# Qt plugin directories a frameless widget app on Windows needs; the fast profile drops the rest
+QT_PLUGINS_KEPT = ['platforms', 'styles']
+
+# Qt modules Ova never imports
+QT_EXCLUDES = [
+    'PyQt5.QtNetwork', 'PyQt5.QtQml', 'PyQt5.QtQuick', 'PyQt5.QtQuickWidgets', 'PyQt5.QtSql',
+    'PyQt5.QtMultimedia', 'PyQt5.QtMultimediaWidgets', 'PyQt5.QtOpenGL', 'PyQt5.QtPrintSupport',
+    'PyQt5.QtSvg', 'PyQt5.QtTest', 'PyQt5.QtXml', 'PyQt5.QtXmlPatterns', 'PyQt5.QtDBus',
+    'PyQt5.QtDesigner', 'PyQt5.QtHelp', 'PyQt5.QtBluetooth', 'PyQt5.QtNfc', 'PyQt5.QtPositioning',
+    'PyQt5.QtLocation', 'PyQt5.QtSensors', 'PyQt5.QtSerialPort', 'PyQt5.QtWebChannel',
+    'PyQt5.QtWebSockets', 'PyQt5.QtWebEngine', 'PyQt5.QtWebEngineCore', 'PyQt5.QtWebEngineWidgets',
+    'PyQt5.QtRemoteObjects', 'PyQt5.QtTextToSpeech', 'PyQt5.Qt3DCore'
+]
+
 def create_default_config():
     return {
         'voice_type': 'Azure Voice',
@@ -55,7 +80,8 @@ a = Analysis(
     datas=[*asset_datas, *preset_datas, (r'{current_dir}/config.json', '.')],
     hiddenimports=[
         'PyQt5.QtWidgets', 'PyQt5.QtCore', 'PyQt5.QtGui',
-        'edge_tts', 'speech_recognition', 'ollama', 'PyQt5.sip'
+        'edge_tts', 'speech_recognition', 'ollama', 'PyQt5.sip',
+        *{LAZY_IMPORTS!r}
     ],
     hookspath=[],
     hooksconfig={{}},
@@ -97,6 +123,199 @@ exe = EXE(
 )
 '''
 
+def create_fast_spec_content(script_path, current_dir, bundle_path, icon_path, variants):
+    """Spec for the fast-start profile: one analysis, one onedir folder for every variant
+
+    variants is a list of console flags. Each variant's EXE is built from the
+    same Analysis and all of them share the libraries in one COLLECT, so the
+    second variant costs an EXE link instead of a full build.
+    """
+    exes = []
+    for console in variants:
+        exe_name = 'OVA-debug' if console else 'OVA'
+        exes.append(f'''
+EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='{exe_name}',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,  # Compressed DLLs have to be unpacked in memory on every start
+    console={console},
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=r'{icon_path}'
+)''')
+    exe_block = ','.join(exes)
+    return f'''
+# -*- mode: python ; coding: utf-8 -*-
+
+presets_dir = os.path.join(r'{current_dir}', 'scripts', 'presets')
+
+# Collect all preset files
+preset_datas = []
+for root, dirs, files in os.walk(presets_dir):
+    for file in files:
+        preset_datas.append((os.path.join(root, file), 'presets'))
+
+a = Analysis(
+    [r'{script_path}'],
+    pathex=[r'{current_dir}'],
+    binaries=[],
+    # Assets ship as a single prebuilt bundle instead of hundreds of loose files
+    datas=[(r'{bundle_path}', '.'), *preset_datas, (r'{current_dir}/config.json', '.')],
+    hiddenimports=[
+        'PyQt5.QtWidgets', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.sip',
+        *{LAZY_IMPORTS!r}
+    ],
+    hookspath=[],
+    hooksconfig={{}},
+    runtime_hooks=[],
+    excludes=['matplotlib', 'notebook', 'PIL', 'tk', 'tkinter', 'scipy', *{QT_EXCLUDES!r}],
+    noarchive=False
+)
+
+def keep_qt_file(dest):
+    """Drop Qt translations and every plugin directory Ova does not use"""
+    parts = dest.replace('\\\\', '/').split('/')
+    if parts[:2] != ['PyQt5', 'Qt5']:
+        return True
+    if 'translations' in parts:
+        return False
+    if 'plugins' in parts:
+        return parts[parts.index('plugins') + 1] in {QT_PLUGINS_KEPT!r}
+    return True
+
+# Remove unnecessary files
+a.binaries = [x for x in a.binaries if keep_qt_file(x[0])]
+a.binaries = [x for x in a.binaries if not x[0].startswith('msvcp')]
+a.binaries = [x for x in a.binaries if not x[0].startswith('opengl')]
+a.binaries = [x for x in a.binaries if not x[0].startswith('qt5web')]
+a.datas = [x for x in a.datas if keep_qt_file(x[0])]
+
+pyz = PYZ(a.pure, a.zipped_data)
+
+exes = [{exe_block}]
+
+coll = COLLECT(
+    *exes,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='OVA'
+)
+'''
+
+def build_asset_bundle(current_dir, bundle_path):
+    """Pack assets/ into one uncompressed zip read by scripts/resources.py
+
+    Entries are written in sorted order with a fixed timestamp, so an
+    unchanged assets folder always gives a byte-identical bundle.
+    """
+    assets_dir = os.path.join(current_dir, 'assets')
+    paths = []
+    for root, _, filenames in os.walk(assets_dir):
+        for filename in filenames:
+            paths.append(os.path.join(root, filename))
+    os.makedirs(os.path.dirname(bundle_path), exist_ok=True)
+    with zipfile.ZipFile(bundle_path, 'w', zipfile.ZIP_STORED) as bundle:
+        for path in sorted(paths):
+            name = os.path.relpath(path, current_dir).replace(os.sep, '/')
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            with open(path, 'rb') as f:
+                bundle.writestr(info, f.read())
+    return len(paths)
+
+def directory_size(path):
+    """Total bytes and number of files under path"""
+    total = 0
+    count = 0
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(root, filename))
+            count += 1
+    return total, count
+
+def measure_cold_start(exe_path, timeout=90):
+    """Launch a built executable once and read back its startup report
+
+    Returns (seconds from launch to the first frame, seconds until every stage
+    was ready) or None if the app did not write a report.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        report_path = os.path.join(directory, 'startup.json')
+        env = dict(os.environ, OVA_STARTUP_CHECK='1', OVA_STARTUP_REPORT=report_path)
+        launched = time.time()
+        try:
+            subprocess.run([exe_path], env=env, timeout=timeout,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"Could not measure startup of {os.path.basename(exe_path)}: {e}")
+        try:
+            with open(report_path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            return None
+    if not report.get('first_frame_time'):
+        return None
+    # The app's own clock starts after the bootloader; the launch time covers it
+    first_frame = report['first_frame_time'] - launched
+    total = first_frame + ((report['total_ms'] or 0) - report['first_frame_ms']) / 1000
+    return first_frame, total
+
+def print_fast_report(dist_dir, bundle_path, variants, launch):
+    """Bundle size and, unless launch is False, cold-start time of each variant"""
+    app_dir = os.path.join(dist_dir, 'OVA')
+    total, count = directory_size(app_dir)
+    print(f"\nBundle: {app_dir}")
+    print(f"  size on disk:  {total / (1024 * 1024):.1f} MB in {count} files")
+    print(f"  asset bundle:  {os.path.getsize(bundle_path) / 1024:.0f} KB")
+    if not launch:
+        return
+    for console in variants:
+        exe_name = 'OVA-debug' if console else 'OVA'
+        exe_path = os.path.join(app_dir, exe_name + ('.exe' if sys.platform == 'win32' else ''))
+        timing = measure_cold_start(exe_path)
+        if timing:
+            print(f"  {exe_name}: first frame {timing[0] * 1000:.0f} ms after launch, "
+                  f"fully started after {timing[1]:.1f}s")
+        else:
+            print(f"  {exe_name}: no startup report")
+
+def build_fast(current_dir, script_path, icon_path):
+    """Fast-start profile: onedir, bundled assets, trimmed Qt, one shared analysis"""
+    bundle_path = os.path.join(current_dir, 'build', 'fast', ASSET_BUNDLE_NAME)
+    files = build_asset_bundle(current_dir, bundle_path)
+    print(f"Packed {files} asset files into {bundle_path}")
+
+    variants = [True] if '--debug-only' in sys.argv else [False, True]
+    spec_path = os.path.join(current_dir, 'OVA-fast.spec')
+    with open(spec_path, 'w') as f:
+        f.write(create_fast_spec_content(script_path, current_dir, bundle_path, icon_path, variants))
+
+    started = time.perf_counter()
+    # The work directory is kept between builds, so unchanged modules are not analysed again
+    args = [spec_path, '--noconfirm', '--log-level=WARN',
+            '--workpath', os.path.join(current_dir, 'build', 'fast')]
+    if '--clean' in sys.argv:
+        args.append('--clean')
+    PyInstaller.__main__.run(args)
+    os.remove(spec_path)
+    print(f"\nBuilt {len(variants)} variant(s) in {time.perf_counter() - started:.0f}s")
+
+    print_fast_report(os.path.join(current_dir, 'dist'), bundle_path, variants,
+                      launch='--no-launch' not in sys.argv)
+    return variants
+
 def verify_required_files():
     """Verify all required asset directories and files exist"""
     current_dir = os.path.abspath(os.path.dirname(__file__))
@@ -135,6 +354,16 @@ def build_exe():
     with open(config_path, 'w') as f:
         json.dump(create_default_config(), f, indent=4)
 
+    if '--fast' in sys.argv:
+        try:
+            variants = build_fast(current_dir, script_path, icon_path)
+        finally:
+            os.remove(config_path)
+        print("\nBuild complete!")
+        names = ' and '.join('OVA-debug' if console else 'OVA' for console in variants)
+        print(f"{names} share the dist/OVA folder; run them from there (no unpacking on start)")
+        return
+
     # Build only debug version during development, both for production
     versions = [True] if '--debug-only' in sys.argv else [False, True]
     
@@ -0,0 +1,288 @@
+"""Stand-in Ollama server for offline end-to-end and load testing
+
+Implements enough of the Ollama HTTP API for OVA: /api/chat (streaming and
+non-streaming), /api/tags and /api/version. Time-to-first-token, tokens per
+second, failures and the canned answers are all configurable, so latency and
+throughput runs are deterministic.
+
+Run standalone and point OVA at it with "ollama_host" in config.json (or the
+OLLAMA_HOST environment variable):
+
+    python helpers/fake_ollama.py --port 11435 --ttft 0.3 --tps 25
+
+or embed it in a script:
+
+    with FakeOllamaServer(ttft=0.1) as server:
+        client = LLMClient(host=server.url)
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSES = [
+    "Hoo hoo! I'm Ova, your friendly owl assistant. What can I help you with?",
+    "That's a great question! Let me ruffle my feathers and think. The answer is forty two.",
+    "I'm just a fake owl for testing, but I'm happy to chat with you anyway!"
+]
+
+FAILURE_MODES = ('error', 'hang', 'disconnect')
+
+class FakeOllamaConfig:
+    """Behaviour knobs for the fake server"""
+
+    def __init__(self, models=None, ttft=0.2, tokens_per_second=30.0, responses=None,
+                 failure_rate=0.0, failure_mode='error', hang_seconds=120.0,
+                 model_profiles=None, seed=None):
+        self.models = models or ['llama3.2:latest']
+        self.ttft = ttft                            # Seconds before the first token
+        self.tokens_per_second = tokens_per_second
+        self.responses = responses or DEFAULT_RESPONSES
+        self.failure_rate = failure_rate            # Probability a chat request fails
+        self.failure_mode = failure_mode            # One of FAILURE_MODES
+        self.hang_seconds = hang_seconds            # How long 'hang' failures stall
+        self.model_profiles = model_profiles or {}  # Per-model {'ttft': .., 'tokens_per_second': ..}
+        self.random = random.Random(seed)
+        self._next_response = 0
+        self._lock = threading.Lock()
+
+    def timing_for(self, model):
+        """(ttft, tokens_per_second) for a model, honouring per-model profiles"""
+        profile = self.model_profiles.get(model, {})
+        return profile.get('ttft', self.ttft), profile.get('tokens_per_second', self.tokens_per_second)
+
+    def should_fail(self):
+        with self._lock:
+            return self.failure_rate > 0 and self.random.random() < self.failure_rate
+
+    def pick_response(self, prompt):
+        """Canned responses are served round-robin; a dict maps prompt substrings to answers"""
+        with self._lock:
+            if isinstance(self.responses, dict):
+                for key, answer in self.responses.items():
+                    if key != '*' and key.lower() in prompt.lower():
+                        return answer
+                return self.responses.get('*', DEFAULT_RESPONSES[0])
+            answer = self.responses[self._next_response % len(self.responses)]
+            self._next_response += 1
+            return answer
+
+def tokenize(text):
+    """Split text into word-sized tokens that join back to the original"""
+    tokens = []
+    for i, word in enumerate(text.split(' ')):
+        tokens.append(word if i == 0 else ' ' + word)
+    return [t for t in tokens if t]
+
+def _timestamp():
+    return datetime.now(timezone.utc).isoformat()
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeOllama/1.0'
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._send_json(200, {'models': [
+                {
+                    'name': name,
+                    'model': name,
+                    'modified_at': _timestamp(),
+                    'size': 0,
+                    'digest': 'fake',
+                    'details': {'format': 'gguf', 'family': 'fake'}
+                }
+                for name in self.config.models
+            ]})
+        elif self.path == '/api/version':
+            self._send_json(200, {'version': '0.0.0-fake'})
+        elif self.path == '/':
+            body = b'Ollama is running'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/api/chat':
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_json(400, {'error': 'invalid JSON'})
+            return
+
+        model = request.get('model', '')
+        if model not in self.config.models:
+            self._send_json(404, {'error': f"model '{model}' not found"})
+            return
+
+        failure = self.config.failure_mode if self.config.should_fail() else None
+        if failure == 'error':
+            self._send_json(500, {'error': 'injected failure'})
+            return
+        if failure == 'hang':
+            time.sleep(self.config.hang_seconds)
+
+        messages = request.get('messages', [])
+        prompt = next((m.get('content', '') for m in reversed(messages) if m.get('role') == 'user'), '')
+        tokens = tokenize(self.config.pick_response(prompt))
+        ttft, tps = self.config.timing_for(model)
+
+        if request.get('stream', True):
+            self._stream_chat(model, tokens, ttft, tps, messages, failure == 'disconnect')
+        else:
+            started = time.perf_counter()
+            time.sleep(ttft + len(tokens) / tps)
+            payload = self._chunk(model, ''.join(tokens), done=True)
+            payload.update(self._stats(started, ttft, len(tokens), messages))
+            self._send_json(200, payload)
+
+    def _chunk(self, model, content, done=False):
+        return {
+            'model': model,
+            'created_at': _timestamp(),
+            'message': {'role': 'assistant', 'content': content},
+            'done': done
+        }
+
+    def _stats(self, started, ttft, token_count, messages):
+        """Ollama-style duration counters in nanoseconds"""
+        total = time.perf_counter() - started
+        return {
+            'done_reason': 'stop',
+            'total_duration': int(total * 1e9),
+            'load_duration': 0,
+            'prompt_eval_count': sum(len(m.get('content', '').split()) for m in messages),
+            'prompt_eval_duration': int(ttft * 1e9),
+            'eval_count': token_count,
+            'eval_duration': int(max(total - ttft, 1e-9) * 1e9)
+        }
+
+    def _write_chunk(self, payload):
+        """Write one NDJSON line as an HTTP chunk"""
+        data = (json.dumps(payload) + '\n').encode('utf-8')
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def _stream_chat(self, model, tokens, ttft, tps, messages, disconnect):
+        started = time.perf_counter()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        try:
+            time.sleep(ttft)
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(1.0 / tps)
+                if disconnect and i >= len(tokens) // 2:
+                    # Drop the connection mid-stream without a terminating chunk
+                    self.close_connection = True
+                    return
+                self._write_chunk(self._chunk(model, token))
+
+            final = self._chunk(model, '', done=True)
+            final.update(self._stats(started, ttft, len(tokens), messages))
+            self._write_chunk(final)
+            self.wfile.write(b'0\r\n\r\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away (e.g. a cancelled request)
+            self.close_connection = True
+
+class FakeOllamaServer:
+    """Runs the fake Ollama API on a background thread"""
+
+    def __init__(self, host='127.0.0.1', port=0, verbose=False, **config):
+        self.config = FakeOllamaConfig(**config)
+        self.httpd = ThreadingHTTPServer((host, port), FakeOllamaHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = self.config
+        self.httpd.verbose = verbose
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join(timeout=1)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Ollama server for offline testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--model', action='append', dest='models',
+                        help='Model name to advertise (repeatable, default llama3.2:latest)')
+    parser.add_argument('--ttft', type=float, default=0.2, help='Seconds to first token')
+    parser.add_argument('--tps', type=float, default=30.0, help='Tokens per second')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Probability a chat request fails')
+    parser.add_argument('--failure-mode', choices=FAILURE_MODES, default='error')
+    parser.add_argument('--hang-seconds', type=float, default=120.0)
+    parser.add_argument('--responses', help='JSON file with a list of answers or a {substring: answer} map')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for failure injection')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses, 'r') as f:
+            responses = json.load(f)
+
+    server = FakeOllamaServer(
+        host=args.host, port=args.port, verbose=args.verbose,
+        models=args.models, ttft=args.ttft, tokens_per_second=args.tps,
+        responses=responses, failure_rate=args.failure_rate,
+        failure_mode=args.failure_mode, hang_seconds=args.hang_seconds, seed=args.seed
+    )
+    print(f'Fake Ollama listening on {server.url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == '__main__':
+    main()
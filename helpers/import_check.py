@@ -0,0 +1,99 @@
+"""Check what importing scripts/desktop_pet.py costs before the first frame
+
+Imports desktop_pet under `python -X importtime` (a fresh interpreter per run)
+and reports the slowest modules. Exits non-zero if the import takes longer
+than the budget, if any heavy dependency that should only load when its
+feature starts is imported, or if importing configured logging. The repo has
+no test suite; this is the regression check for startup imports, and
+--rules-only skips the timing so it gives the same answer on any machine:
+
+    python helpers/import_check.py
+    python helpers/import_check.py --budget 400 --runs 5 --top 20
+    python helpers/import_check.py --rules-only
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+
+# Default budget for importing desktop_pet, in milliseconds
+IMPORT_BUDGET_MS = 500
+
+# Loaded by the startup stages after the first frame, never by the import itself
+DEFERRED_MODULES = ('speech_recognition', 'ollama', 'httpx', 'edge_tts', 'pyttsx3', 'pygame', 'piper',
+                    'voice_assistant', 'text_to_speech', 'settings_dialog', 'audio_engine', 'llm_client')
+
+IMPORT_CODE = (
+    "import sys, logging; sys.path.insert(0, {scripts!r}); import desktop_pet; "
+    "print('handlers', len(logging.root.handlers))"
+)
+
+def import_times(code):
+    """Run code under -X importtime, returns ([(module, depth, self us, cumulative us)], stdout)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, cwd=SCRIPTS_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries, result.stdout
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import cost of OVA startup')
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS,
+                        help=f'Import budget in ms (default {IMPORT_BUDGET_MS})')
+    parser.add_argument('--runs', type=int, default=3, help='Imports to measure; the median is checked')
+    parser.add_argument('--top', type=int, default=10, help='Slowest modules to list')
+    parser.add_argument('--rules-only', action='store_true',
+                        help='Import once and only check deferred modules and logging, not the time')
+    args = parser.parse_args()
+    runs = 1 if args.rules_only else args.runs
+
+    # Whatever the bare interpreter imports is not part of Ova's cost
+    baseline = {name for name, _, _, _ in import_times('pass')[0]}
+
+    totals = []
+    failures = 0
+    for run in range(runs):
+        try:
+            entries, output = import_times(IMPORT_CODE.format(scripts=SCRIPTS_DIR))
+        except RuntimeError as e:
+            print(f'importing desktop_pet failed: {e}')
+            return 1
+        ours = [entry for entry in entries if entry[0] not in baseline]
+        totals.append(sum(cumulative for _, depth, _, cumulative in ours if depth == 0) / 1000)
+
+    imported = {name for name, _, _, _ in ours}
+    for name in DEFERRED_MODULES:
+        if name in imported:
+            print(f'FAIL {name} is imported at startup')
+            failures += 1
+    if 'handlers 0' not in output:
+        print('FAIL importing desktop_pet configured logging')
+        failures += 1
+    if args.rules_only:
+        print(f'{failures} import rule violations')
+        return 1 if failures else 0
+
+    print('slowest imports (last run, self time):')
+    for name, _, self_us, cumulative_us in sorted(ours, key=lambda entry: entry[2], reverse=True)[:args.top]:
+        print(f'  {name:<40} {self_us / 1000:7.1f} ms  (cumulative {cumulative_us / 1000:.1f} ms)')
+
+    median = statistics.median(totals)
+    print(f'import desktop_pet: median {median:.0f} ms over {runs} runs '
+          f'({", ".join(f"{total:.0f}" for total in totals)}), budget {args.budget:.0f} ms')
+    if median > args.budget:
+        print(f'FAIL import time over the {args.budget:.0f} ms budget')
+        failures += 1
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Latency and throughput benchmark for OVA's LLM client
+
+Runs chat requests through scripts/llm_client.LLMClient and prints
+time-to-first-token, request latency and tokens/sec percentiles. With --fake
+(the default when no --host is given) it starts helpers/fake_ollama.py
+in-process so results are deterministic and need no real model:
+
+    python helpers/llm_benchmark.py --requests 50 --concurrency 4 --ttft 0.3 --tps 25
+    python helpers/llm_benchmark.py --host http://localhost:11434 --model llama3.2:latest
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from fake_ollama import FakeOllamaServer
+from llm_client import LLMClient, LLMUnavailableError
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def run_benchmark(host, model, requests, concurrency, prompt):
+    client = LLMClient(host=host, max_retries=0)
+    results = []
+    failures = 0
+
+    def one_request(_):
+        stats = {}
+        messages = [{'role': 'user', 'content': prompt}]
+        client.chat(model, messages, on_stats=stats.update)
+        return stats
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(one_request, i) for i in range(requests)]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except LLMUnavailableError as e:
+                failures += 1
+                print(f'Request failed: {e}')
+    elapsed = time.perf_counter() - started
+    client.close()
+    return results, failures, elapsed
+
+def report(results, failures, elapsed):
+    ttft = [r['ttft'] for r in results if r.get('ttft') is not None]
+    latency = [r['latency'] for r in results if r.get('latency') is not None]
+    tps = [r['eval_count'] / (r['eval_duration'] / 1e9)
+           for r in results if r.get('eval_count') and r.get('eval_duration')]
+    tokens = sum(r.get('eval_count') or 0 for r in results)
+
+    print(f'\nRequests: {len(results)} ok, {failures} failed in {elapsed:.2f}s')
+    print(f'Throughput: {len(results) / elapsed:.2f} req/s, {tokens / elapsed:.1f} tokens/s overall')
+    print(f"{'metric':<20}{'p50':>10}{'p90':>10}{'p99':>10}{'mean':>10}")
+    for name, values, unit in [('ttft (ms)', ttft, 1000), ('latency (ms)', latency, 1000), ('tokens/s', tps, 1)]:
+        if not values:
+            continue
+        row = [percentile(values, p) * unit for p in (50, 90, 99)] + [statistics.mean(values) * unit]
+        print(f'{name:<20}' + ''.join(f'{v:>10.1f}' for v in row))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OVA LLM latency and throughput')
+    parser.add_argument('--host', help='Ollama host to benchmark (default: start a fake server)')
+    parser.add_argument('--model', default='llama3.2:latest')
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--prompt', default="what's your favorite color")
+    parser.add_argument('--ttft', type=float, default=0.2, help='Fake server time to first token')
+    parser.add_argument('--tps', type=float, default=30.0, help='Fake server tokens per second')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fake server failure rate')
+    args = parser.parse_args()
+
+    if args.host:
+        results, failures, elapsed = run_benchmark(args.host, args.model, args.requests,
+                                                   args.concurrency, args.prompt)
+    else:
+        with FakeOllamaServer(models=[args.model], ttft=args.ttft, tokens_per_second=args.tps,
+                              failure_rate=args.failure_rate, seed=0) as server:
+            print(f'Benchmarking fake Ollama at {server.url}')
+            results, failures, elapsed = run_benchmark(server.url, args.model, args.requests,
+                                                       args.concurrency, args.prompt)
+    report(results, failures, elapsed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Check scripts/speech_text.py against a corpus of typical model answers
+
+Each case pairs raw model output with the text that should be spoken. Prints
+the characters saved per case and exits non-zero if any case differs. The repo
+has no test suite; this corpus is the regression check for speech_text, so add
+a case here for every normalisation bug that is fixed:
+
+    python helpers/speech_text_check.py
+    python helpers/speech_text_check.py -v
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from speech_text import normalize_for_speech, CUTOFF_PHRASE
+
+LONG_ANSWER = ' '.join(f'Owls have fact number {i} worth knowing.' for i in range(30))
+
+# (name, model output, expected speech, max_chars)
+CORPUS = [
+    ('plain', 'Hoot! Owls can turn their heads 270 degrees.',
+     'Hoot! Owls can turn their heads 270 degrees.', 600),
+    ('emphasis', 'That is **really** _quite_ ~~wrong~~ *amazing*.',
+     'That is really quite wrong amazing.', 600),
+    ('snake case kept', 'Call get_resource_path first.',
+     'Call get_resource_path first.', 600),
+    ('dunder name kept', 'Override __init__ in the subclass.',
+     'Override __init__ in the subclass.', 600),
+    ('arithmetic kept', 'Work out 2*3*4 first.',
+     'Work out 2*3*4 first.', 600),
+    ('code block', "Try this:\n\n```python\nprint('hoot')\n```\nIt prints hoot.",
+     'Try this: The code is in the chat. It prints hoot.', 600),
+    ('inline code', 'Run `pip install edge-tts` and restart.',
+     'Run pip install edge-tts and restart.', 600),
+    ('markdown link', 'See [the owl guide](https://example.org/owls/guide.html) for more.',
+     'See the owl guide for more.', 600),
+    ('bare url', 'Go to https://www.audubon.org/field-guide/bird/barn-owl?ref=1 today.',
+     'Go to audubon.org today.', 600),
+    ('url ends sentence', 'For more, see www.example.com. Owls are birds.',
+     'For more, see example.com. Owls are birds.', 600),
+    ('heading and list', '## Owl facts\n- They are nocturnal\n- They hunt mice\n1. Barn owl\n2. Snowy owl',
+     'Owl facts. They are nocturnal. They hunt mice. Barn owl. Snowy owl.', 600),
+    ('blockquote', '> Wise old owl\nsat in an oak.',
+     'Wise old owl sat in an oak.', 600),
+    ('table', '| Owl | Size |\n|-----|------|\n| Barn | Medium |',
+     'Owl, Size. Barn, Medium.', 600),
+    ('emoji', 'Goodnight 🦉🌙! Sleep well 😴.',
+     'Goodnight! Sleep well.', 600),
+    ('emoji sequence', 'Nice 👍🏽 work ❤️',
+     'Nice work', 600),
+    ('ellipsis kept', 'Hmm... let me think.',
+     'Hmm... let me think.', 600),
+    ('wrapped paragraph', 'Owls fly silently because\ntheir feathers are soft\nat the edges.',
+     'Owls fly silently because their feathers are soft at the edges.', 600),
+    ('whitespace', 'Lots   of\t\tspace\n\n\nhere.',
+     'Lots of space here.', 600),
+    ('cut off', LONG_ANSWER,
+     ' '.join(f'Owls have fact number {i} worth knowing.' for i in range(4)) + ' ' + CUTOFF_PHRASE, 200),
+    ('no cap', LONG_ANSWER, LONG_ANSWER, 0),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='Check TTS text normalisation against a corpus')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show every case')
+    args = parser.parse_args()
+
+    failures = 0
+    saved = 0
+    total = 0
+    for name, text, expected, max_chars in CORPUS:
+        spoken, stats = normalize_for_speech(text, max_chars=max_chars)
+        saved += stats['chars_saved']
+        total += stats['chars_in']
+        ok = spoken == expected
+        if not ok:
+            failures += 1
+        if args.verbose or not ok:
+            print(f"{'ok  ' if ok else 'FAIL'} {name}: saved {stats['chars_saved']} chars")
+            if not ok:
+                print(f'     expected: {expected!r}')
+                print(f'     got:      {spoken!r}')
+
+    print(f'{len(CORPUS) - failures}/{len(CORPUS)} cases passed, '
+          f'{saved} of {total} characters saved ({saved / total:.0%})')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Start Ova, wait for every startup stage and check time-to-first-frame
+
+Runs scripts/desktop_pet.py with OVA_STARTUP_CHECK=1, which makes it quit
+once audio, TTS, speech recognition and the language model are all up (or
+give up), then prints the startup report and exits non-zero if the first
+frame took longer than the budget. Before that, StartupSequence is driven with
+a simulated clock on both sides of the budget, so a broken budget check fails
+without having to start the GUI (the repo has no test suite; this is the
+regression check for time-to-first-frame):
+
+    python helpers/startup_check.py
+    python helpers/startup_check.py --budget 800 --runs 5
+    python helpers/startup_check.py --no-launch   # simulated clock only
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+
+import startup
+from startup import StartupSequence, FIRST_FRAME_BUDGET_MS, CHECK_TIMEOUT_MS, STAGES
+
+def check_sequence(budget, directory):
+    """Run StartupSequence with a simulated clock just within and just over budget, returns failures"""
+    failures = 0
+    for first_frame_ms, within in ((budget - 1, True), (budget + 1, False)):
+        report_path = os.path.join(directory, f'simulated-{first_frame_ms:.0f}.json')
+        # Every reading of the clock moves it 10 ms on from the first frame
+        ticks = itertools.count(first_frame_ms, 10)
+        elapsed_ms = startup.elapsed_ms
+        startup.elapsed_ms = lambda: next(ticks)
+        try:
+            sequence = StartupSequence(budget_ms=budget, report_path=report_path)
+            reports = []
+            sequence.finished.connect(reports.append)
+            sequence.mark_first_frame()
+            for stage in STAGES:
+                sequence.begin(stage)
+                sequence.ready(stage)
+        finally:
+            startup.elapsed_ms = elapsed_ms
+
+        label = f'simulated first frame at {first_frame_ms:.0f} ms'
+        if len(reports) != 1:
+            print(f'FAIL {label}: finished was emitted {len(reports)} times')
+            failures += 1
+            continue
+        report = reports[0]
+        if report['first_frame_ms'] != first_frame_ms or report['within_budget'] != within:
+            print(f"FAIL {label}: first_frame_ms {report['first_frame_ms']}, "
+                  f"within_budget {report['within_budget']} (expected {within})")
+            failures += 1
+        if not os.path.exists(report_path):
+            print(f'FAIL {label}: no startup report was written')
+            failures += 1
+    if not failures:
+        print(f'simulated clock: budget check passes at {budget - 1:.0f} ms and fails at {budget + 1:.0f} ms')
+    return failures
+
+def run_once(report_path, timeout):
+    """Start Ova once, returns (startup report or None, wall-clock seconds)"""
+    env = dict(os.environ, OVA_STARTUP_CHECK='1', OVA_STARTUP_REPORT=report_path)
+    started = time.perf_counter()
+    try:
+        subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, 'desktop_pet.py')],
+                       env=env, timeout=timeout, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except subprocess.TimeoutExpired:
+        print(f'Ova did not quit within {timeout:.0f}s')
+    wall = time.perf_counter() - started
+    try:
+        with open(report_path) as f:
+            return json.load(f), wall
+    except (OSError, ValueError):
+        return None, wall
+
+def print_report(report, wall):
+    first_frame = report.get('first_frame_ms')
+    print(f"first frame: {first_frame:.0f} ms" if first_frame is not None else 'first frame: never painted')
+    for name in STAGES:
+        timing = report['stages'].get(name)
+        if not timing or timing['ready_ms'] is None:
+            print(f'  {name:<11} not ready')
+            continue
+        error = f"  ({timing['error']})" if timing['error'] else ''
+        print(f"  {name:<11} ready at {timing['ready_ms']:6.0f} ms, took {timing['duration_ms']:6.0f} ms{error}")
+    print(f'  process ran {wall:.1f}s in total')
+
+def main():
+    parser = argparse.ArgumentParser(description='Check OVA startup time-to-first-frame')
+    parser.add_argument('--budget', type=float, default=FIRST_FRAME_BUDGET_MS,
+                        help=f'Time-to-first-frame budget in ms (default {FIRST_FRAME_BUDGET_MS})')
+    parser.add_argument('--runs', type=int, default=1, help='Number of starts; every one must be within budget')
+    parser.add_argument('--timeout', type=float, default=CHECK_TIMEOUT_MS / 1000 + 15,
+                        help='Seconds to wait for Ova to quit')
+    parser.add_argument('--no-launch', action='store_true',
+                        help='Only check the budget logic with a simulated clock')
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        if check_sequence(args.budget, directory):
+            return 1
+        if args.no_launch:
+            return 0
+        for run in range(args.runs):
+            report_path = os.path.join(directory, f'startup-{run}.json')
+            report, wall = run_once(report_path, args.timeout)
+            if args.runs > 1:
+                print(f'run {run + 1}:')
+            if report is None:
+                print('no startup report was written')
+                failures += 1
+                continue
+            print_report(report, wall)
+            first_frame = report.get('first_frame_ms')
+            if first_frame is None or first_frame > args.budget:
+                print(f'FAIL time-to-first-frame over the {args.budget:.0f} ms budget')
+                failures += 1
+
+    print(f'{args.runs - failures}/{args.runs} starts within the {args.budget:.0f} ms first-frame budget')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
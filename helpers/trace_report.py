@@ -0,0 +1,111 @@
+"""Per-stage latency report from OVA interaction traces
+
+Reads traces/traces.jsonl (plus its rotated backups) written by
+scripts/tracing.py and prints latency percentiles for each pipeline stage and
+for the end-to-end path from wake word to first and last spoken word:
+
+    python helpers/trace_report.py
+    python helpers/trace_report.py path/to/traces.jsonl --json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from tracing import STAGES
+
+DEFAULT_TRACE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'traces', 'traces.jsonl')
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def trace_files(path):
+    """The trace file and its rotated backups, oldest first"""
+    backups = [p for p in glob.glob(path + '.*') if p.rsplit('.', 1)[1].isdigit()]
+    backups.sort(key=lambda p: int(p.rsplit('.', 1)[1]), reverse=True)
+    return backups + ([path] if os.path.exists(path) else [])
+
+def load_records(path):
+    records = []
+    for file in trace_files(path):
+        with open(file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # Partially written line at rotation or crash
+    return records
+
+def stage_durations(records):
+    """Map of stage name to list of durations (ms), including end-to-end stages"""
+    durations = defaultdict(list)
+    traces = defaultdict(list)
+    for record in records:
+        if 'span' in record:
+            durations[record['span']].append(record['duration_ms'])
+            traces[record['trace_id']].append(record)
+
+    for spans in traces.values():
+        begin = min(span['start'] for span in spans)
+        first_audio = [span['end'] for span in spans if span['span'] == 'first_audio']
+        playback = [span['end'] for span in spans if span['span'] == 'playback']
+        if first_audio:
+            durations['wake_to_first_audio'].append((min(first_audio) - begin) * 1000)
+        if playback:
+            durations['wake_to_last_word'].append((max(playback) - begin) * 1000)
+    return durations
+
+def summarize(durations):
+    ordered = STAGES + sorted(set(durations) - set(STAGES) - {'wake_to_first_audio', 'wake_to_last_word'})
+    ordered += ['wake_to_first_audio', 'wake_to_last_word']
+    summary = {}
+    for stage in ordered:
+        values = durations.get(stage)
+        if not values:
+            continue
+        summary[stage] = {
+            'count': len(values),
+            'p50': percentile(values, 50),
+            'p90': percentile(values, 90),
+            'p99': percentile(values, 99),
+            'max': max(values)
+        }
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-stage latency percentiles from OVA traces')
+    parser.add_argument('path', nargs='?', default=DEFAULT_TRACE_FILE, help='Trace JSONL file')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    records = load_records(args.path)
+    if not records:
+        print(f'No traces found at {args.path}')
+        return 1
+
+    summary = summarize(stage_durations(records))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    trace_count = len({r['trace_id'] for r in records})
+    print(f'{trace_count} interactions, {len(records)} records\n')
+    print(f"{'stage (ms)':<22}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for stage, row in summary.items():
+        print(f"{stage:<22}{row['count']:>7}" +
+              ''.join(f'{row[k]:>10.1f}' for k in ('p50', 'p90', 'p99', 'max')))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,60 +1,180 @@
+"""Make the background of Ova's PNG frames transparent
+
+The colour of each image's top-left pixel is the background: every pixel
+within THRESHOLD of it on R, G and B becomes transparent white. Files are keyed
+in parallel and written back in place, and a manifest of content hashes means
+files already processed (and unchanged since) are skipped next time:
+
+    python helpers/transparent.py                 # every PNG under assets/
+    python helpers/transparent.py assets/dance -n # dry run: report pixel counts only
+    python helpers/transparent.py --verify        # compare with the per-pixel version
+"""
+import argparse
+import glob
+import hashlib
+import io
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 from PIL import Image
-import glob
 
-def make_transparent(image_path):
-    # Open the image
-    img = Image.open(image_path)
-    # Convert to RGBA if not already
-    img = img.convert('RGBA')
-    
-    # Get the background color from the top-left corner
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+from persistence import atomic_write
+
+# Largest per-channel difference from the background colour that still counts as background
+THRESHOLD = 30
+TRANSPARENT = (255, 255, 255, 0)  # Transparent white
+
+# Content hash of every file as this helper last wrote it, by path relative to the repo
+MANIFEST_PATH = os.path.join(ROOT_DIR, 'cache', 'transparent.json')
+
+def colors_match(c1, c2, threshold):
+    return all(abs(a - b) <= threshold for a, b in zip(c1[:3], c2[:3]))
+
+def key_background_per_pixel(img, threshold=THRESHOLD):
+    """Original pixel-by-pixel keying of an RGBA image, kept as the reference for --verify"""
     background_color = img.getpixel((0, 0))
-    
-    # Create a new data array
-    data = img.getdata()
     new_data = []
-    
-    # Define threshold for color matching (to handle slight variations)
-    threshold = 30
-    
-    def colors_match(c1, c2, threshold):
-        return all(abs(a - b) <= threshold for a, b in zip(c1[:3], c2[:3]))
-    
-    # Process all pixels
-    for item in data:
-        # If the pixel matches the background color (within threshold), make it transparent
+    for item in img.getdata():
         if colors_match(item, background_color, threshold):
-            new_data.append((255, 255, 255, 0))  # Transparent white
+            new_data.append(TRANSPARENT)
         else:
-            new_data.append(item)  # Keep original color
-    
-    # Update image with new data
+            new_data.append(item)
     img.putdata(new_data)
-    
-    # Save the modified image back to the original file
-    img.save(image_path)
-    print(f'Processed: {os.path.basename(image_path)}')
-
-def process_all_images():
-    # Get the assets directory path
-    assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets')
-    
-    # Find all PNG files in assets directory and its subdirectories
-    png_files = glob.glob(os.path.join(assets_dir, '**', '*.png'), recursive=True)
-    
+
+def key_background(img, threshold=THRESHOLD):
+    """Key out the background of an RGBA image in place, as one array operation
+
+    Gives exactly the pixels key_background_per_pixel() does. Returns the
+    number of background pixels and how many of them actually changed.
+    """
+    pixels = np.array(img)
+    background = pixels[0, 0, :3].astype(np.int16)
+    mask = (np.abs(pixels[..., :3].astype(np.int16) - background) <= threshold).all(axis=-1)
+    changed = mask & (pixels != TRANSPARENT).any(axis=-1)
+    pixels[mask] = TRANSPARENT
+    img.frombytes(pixels.tobytes())
+    return int(mask.sum()), int(changed.sum())
+
+def png_bytes(img):
+    """The file img.save() writes for a .png path"""
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def make_transparent(image_path, dry_run=False, verify=False):
+    """Key out the background of one PNG and save it in place, returns its stats
+
+    With dry_run nothing is written. With verify the per-pixel version is run
+    too and 'identical' says whether both produce the same file.
+    """
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    stats = {'path': image_path, 'before': hashlib.sha256(data).hexdigest()}
+
+    # Convert to RGBA if not already
+    img = Image.open(io.BytesIO(data)).convert('RGBA')
+    reference = img.copy() if verify else None
+    stats['pixels'] = img.width * img.height
+    stats['background'], stats['changed'] = key_background(img)
+
+    output = png_bytes(img)
+    if verify:
+        key_background_per_pixel(reference)
+        stats['identical'] = png_bytes(reference) == output
+    stats['after'] = hashlib.sha256(output).hexdigest()
+    if not dry_run:
+        atomic_write(image_path, output)
+    return stats
+
+def _process(job):
+    image_path, dry_run, verify = job
+    try:
+        return make_transparent(image_path, dry_run, verify)
+    except Exception as e:
+        return {'path': image_path, 'error': str(e)}
+
+def find_images(paths):
+    """PNG files in paths (files or directories, searched recursively)"""
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            images.extend(glob.glob(os.path.join(path, '**', '*.png'), recursive=True))
+        elif path.lower().endswith('.png'):
+            images.append(path)
+    return sorted(os.path.abspath(image) for image in images)
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description='Make the background of PNG frames transparent')
+    parser.add_argument('paths', nargs='*', help='PNG files or directories (default: assets/)')
+    parser.add_argument('-n', '--dry-run', action='store_true', help='Report pixel counts without writing anything')
+    parser.add_argument('--verify', action='store_true',
+                        help='Also run the per-pixel version and fail if any output differs (implies --dry-run)')
+    parser.add_argument('--force', action='store_true', help='Process files the manifest says are done')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Worker processes')
+    args = parser.parse_args()
+    dry_run = args.dry_run or args.verify
+
+    png_files = find_images(args.paths or [os.path.join(ROOT_DIR, 'assets')])
     if not png_files:
-        print('No PNG files found in the assets directory!')
-        return
-    
-    print(f'Found {len(png_files)} PNG files to process')
-    
-    # Process each PNG file
-    for image_path in png_files:
-        try:
-            make_transparent(image_path)
-        except Exception as e:
-            print(f'Error processing {os.path.basename(image_path)}: {str(e)}')
+        print('No PNG files found!')
+        return 1
+
+    # Files whose content is what this helper last wrote are already transparent
+    manifest = load_manifest()
+    relative = {path: os.path.relpath(path, ROOT_DIR).replace(os.sep, '/') for path in png_files}
+    todo = [path for path in png_files
+            if args.force or args.verify or manifest.get(relative[path]) != file_hash(path)]
+    print(f'Found {len(png_files)} PNG files, {len(png_files) - len(todo)} unchanged since the last run')
+
+    jobs = [(path, dry_run, args.verify) for path in todo]
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_process, jobs, chunksize=max(1, len(jobs) // (args.jobs * 4))))
+    else:
+        results = [_process(job) for job in jobs]
+
+    failures = 0
+    changed = 0
+    pixels = 0
+    for stats in results:
+        name = relative[stats['path']]
+        if 'error' in stats:
+            print(f"Error processing {name}: {stats['error']}")
+            failures += 1
+            continue
+        changed += stats['changed']
+        pixels += stats['pixels']
+        if args.verify and not stats['identical']:
+            print(f'MISMATCH {name}: output differs from the per-pixel version')
+            failures += 1
+        if dry_run:
+            print(f"{name}: {stats['background']} background pixels, {stats['changed']} would change")
+        else:
+            manifest[name] = stats['after']
+            print(f"Processed: {name} ({stats['changed']} pixels changed)")
+
+    if not dry_run and results:
+        atomic_write(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    print(f"{len(results) - failures}/{len(results)} files {'checked' if dry_run else 'processed'}, "
+          f"{changed} of {pixels} pixels {'would change' if dry_run else 'changed'}")
+    return 1 if failures else 0
 
 if __name__ == '__main__':
-    process_all_images()
\ No newline at end of file
+    sys.exit(main())
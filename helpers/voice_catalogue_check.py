@@ -0,0 +1,63 @@
+"""Check that scripts/voice_catalogue.py saves the catalogue and reads it back
+
+Stores Windows voices and a fetched Edge list in a catalogue kept in a
+temporary directory, writes it to disk and loads it into a new catalogue.
+Exits non-zero if saving fails, nothing is written, updated is not emitted or
+the reloaded catalogue differs (or is already stale):
+
+    python helpers/voice_catalogue_check.py
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from persistence import get_persistent_writer
+from voice_catalogue import VoiceCatalogue
+
+WINDOWS_VOICES = [('Microsoft Zira', 'zira'), ('Microsoft David', 'david')]
+EDGE_VOICES = [{'id': 'en-US-AnaNeural', 'locale': 'en-US', 'gender': 'Female'}]
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'voices.json')
+        catalogue = VoiceCatalogue(path=path)
+        updates = []
+        catalogue.updated.connect(lambda: updates.append(True))
+
+        try:
+            catalogue.set_windows_voices(WINDOWS_VOICES)
+            catalogue._data['edge'] = EDGE_VOICES
+            catalogue._data['fetched_at'] = time.time()
+            catalogue._save()
+        except Exception as e:
+            print(f'FAIL saving the catalogue raised {type(e).__name__}: {e}')
+            return 1
+        get_persistent_writer().flush(path)
+
+        if not updates:
+            print('FAIL set_windows_voices() did not emit updated')
+            failures += 1
+        if not os.path.exists(path):
+            print('FAIL no catalogue was written')
+            return 1
+
+        reloaded = VoiceCatalogue(path=path)
+        if reloaded.windows_voices() != WINDOWS_VOICES:
+            print(f'FAIL reloaded Windows voices {reloaded.windows_voices()} != {WINDOWS_VOICES}')
+            failures += 1
+        if reloaded.edge_voices(prefix='') != [('Ova', 'en-US-AnaNeural')]:
+            print(f"FAIL reloaded Edge voices {reloaded.edge_voices(prefix='')}")
+            failures += 1
+        if reloaded.is_stale:
+            print('FAIL a catalogue fetched just now is stale after reloading')
+            failures += 1
+
+    print('voice catalogue saved and reloaded' if not failures else f'{failures} checks failed')
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
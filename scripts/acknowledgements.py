@@ -0,0 +1,114 @@
+import io
+import random
+import asyncio
+import threading
+import logging
+import pygame
+from audio_engine import PROMPTS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Short fillers played while the answer is being generated
+ACKNOWLEDGEMENT_PHRASES = [
+    "Hmm.",
+    "Let me think.",
+    "One moment.",
+    "Hmm, let me see.",
+    "Good question."
+]
+
+class AcknowledgementBank:
+    """Short pre-synthesised clips that mask LLM and TTS latency
+
+    Clips are synthesised once per Edge voice through the TTS cache, decoded in
+    memory and registered with the audio engine. play() starts one on the
+    prompts channel the moment Ova starts thinking; cut() fades it out as soon
+    as the real answer's first audio is ready.
+    """
+
+    FADE_MS = 150
+
+    def __init__(self, audio, cache, phrases=None):
+        self.audio = audio
+        self.cache = cache
+        self.phrases = phrases or ACKNOWLEDGEMENT_PHRASES
+        self.clips = {}  # voice -> names of registered sounds
+        self.playing = False
+        self.pending = None  # Clip waiting for a prompt (e.g. the activation sound) to end
+        self._preparing = set()
+        self._lock = threading.Lock()
+        audio.sound_finished.connect(self._on_sound_finished)
+
+    def is_ready(self, voice):
+        return bool(self.clips.get(voice))
+
+    def prepare(self, voice):
+        """Synthesise and decode the clips for voice in the background (cached clips load from disk)"""
+        with self._lock:
+            if voice in self.clips or voice in self._preparing:
+                return
+            self._preparing.add(voice)
+        threading.Thread(target=self._prepare_thread, args=(voice,), daemon=True).start()
+
+    def _prepare_thread(self, voice):
+        names = []
+        try:
+            for index, phrase in enumerate(self.phrases):
+                data = self.cache.get('edge', voice, phrase)
+                if data is None:
+                    data = asyncio.run(self._synthesize(voice, phrase))
+                    self.cache.put('edge', voice, phrase, data)
+                name = f"ack/{voice}/{index}"
+                self.audio.add_sound(name, pygame.mixer.Sound(file=io.BytesIO(data)))
+                names.append(name)
+            logger.info(f"Prepared {len(names)} acknowledgement clips for {voice}")
+        except Exception as e:
+            # Offline before the clips were ever cached: keep what we have, retry next time
+            logger.warning(f"Could not prepare acknowledgement clips for {voice}: {e}")
+        finally:
+            with self._lock:
+                if names:
+                    self.clips[voice] = names
+                self._preparing.discard(voice)
+
+    async def _synthesize(self, voice, phrase):
+        import edge_tts
+        audio = bytearray()
+        async for chunk in edge_tts.Communicate(phrase, voice).stream():
+            if chunk['type'] == 'audio':
+                audio.extend(chunk['data'])
+        if not audio:
+            raise Exception(f"No audio for '{phrase}'")
+        return bytes(audio)
+
+    def play(self, voice):
+        """Play a random clip for voice, returns False if none are ready yet
+        
+        If another prompt is still playing the clip follows it instead of cutting it off.
+        """
+        names = self.clips.get(voice)
+        if not names:
+            self.prepare(voice)
+            return False
+        name = random.choice(names)
+        if self.audio.is_busy(PROMPTS):
+            self.pending = name
+            return True
+        self.playing = self.audio.play(name, PROMPTS, on_finished=self._on_finished)
+        return self.playing
+
+    def cut(self):
+        """Fade out the clip if it is still playing (or drop it if it has not started)"""
+        self.pending = None
+        if self.playing:
+            self.playing = False
+            self.audio.stop(PROMPTS, fade_ms=self.FADE_MS)
+
+    def _on_sound_finished(self, name, channel):
+        if channel == PROMPTS and self.pending:
+            name, self.pending = self.pending, None
+            self.playing = self.audio.play(name, PROMPTS, on_finished=self._on_finished)
+
+    def _on_finished(self):
+        self.playing = False
@@ -0,0 +1,170 @@
+import io
+import os
+import threading
+import logging
+import pygame
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from resources import get_asset_store, get_resource_path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Reserved mixer channels, so sound effects never steal speech
+SPEECH = 'speech'
+PROMPTS = 'prompts'
+EFFECTS = 'effects'
+CHANNEL_IDS = {SPEECH: 0, PROMPTS: 1, EFFECTS: 2}
+
+# Sound bank: name -> file under assets/sounds
+SOUND_FILES = {
+    'activation': 'HeyOva.mp3',
+    'no_answer': 'NoAnswer.mp3'
+}
+# Groups of interchangeable sounds: group -> directory under assets/sounds
+SOUND_GROUPS = {
+    'screech': 'screeches'
+}
+
+class AudioEngine(QObject):
+    """Owns the pygame mixer, the decoded sound bank and the reserved channels
+
+    Every effect is decoded once at startup (or later through preload(), so
+    decoding can run off the GUI thread while Ova starts). Completion is reported through the
+    sound_finished signal (and optional per-call callbacks) from one shared
+    watcher that only runs while something is playing, instead of each caller
+    polling its own channel. Effects are ducked while speech is playing.
+    """
+    sound_finished = pyqtSignal(str, str)  # Sound name, channel name
+    _watch_requested = pyqtSignal()
+
+    WATCH_INTERVAL_MS = 50
+
+    def __init__(self, duck_volume=0.3, preload=True):
+        super().__init__()
+        self.duck_volume = duck_volume
+        self.ducked = False
+        self.sounds = {}
+        self.groups = {}
+        self._playing = {}  # channel name -> (sound name, callback)
+        self._lock = threading.Lock()
+
+        pygame.mixer.init()
+        pygame.mixer.set_reserved(len(CHANNEL_IDS))
+        self.channels = {name: pygame.mixer.Channel(index) for name, index in CHANNEL_IDS.items()}
+        if preload:
+            self.preload()
+
+        # Watcher lives in the GUI thread; play() may be called from any thread
+        self._watcher = QTimer(self)
+        self._watcher.setInterval(self.WATCH_INTERVAL_MS)
+        self._watcher.timeout.connect(self._check_finished)
+        self._watch_requested.connect(self._start_watcher)
+
+    def preload(self):
+        """Decode every effect sound once (safe to run in a background thread)"""
+        sounds_dir = 'assets/sounds'
+        for name, file_name in SOUND_FILES.items():
+            self._load(name, f"{sounds_dir}/{file_name}")
+        for group, directory in SOUND_GROUPS.items():
+            names = []
+            for path in get_asset_store().list(f"{sounds_dir}/{directory}", '.mp3'):
+                name = f"{group}/{os.path.splitext(os.path.basename(path))[0]}"
+                if self._load(name, path):
+                    names.append(name)
+            # Published whole, so group() never sees a half-loaded list
+            self.groups[group] = names
+        logger.info(f"Audio engine loaded {len(self.sounds)} sounds")
+
+    def _load(self, name, path):
+        """Decode the asset at path (from the bundle or a loose file) into the bank"""
+        try:
+            data = get_asset_store().read(path)
+            self.sounds[name] = pygame.mixer.Sound(file=io.BytesIO(data))
+            return True
+        except Exception as e:
+            logger.error(f"Error loading sound {path}: {e}")
+            return False
+
+    def add_sound(self, name, sound):
+        """Register an already decoded Sound under name"""
+        self.sounds[name] = sound
+
+    def channel(self, name):
+        """The reserved pygame Channel for speech, prompts or effects"""
+        return self.channels[name]
+
+    def group(self, group):
+        """Names of the sounds in a group, e.g. screech"""
+        return list(self.groups.get(group, []))
+
+    def play(self, name, channel=EFFECTS, on_finished=None, fade_ms=0):
+        """Play a preloaded sound, replacing whatever that channel was playing
+
+        on_finished is called in the GUI thread once the sound has ended (it is
+        not called if the sound is stopped or replaced). Returns False if the
+        sound is not in the bank.
+        """
+        sound = self.sounds.get(name)
+        if sound is None:
+            logger.warning(f"Unknown sound: {name}")
+            return False
+        target = self.channels[channel]
+        with self._lock:
+            self._playing[channel] = (name, on_finished)
+        target.set_volume(self.duck_volume if self.ducked and channel == EFFECTS else 1.0)
+        target.play(sound, fade_ms=fade_ms)
+        self._watch_requested.emit()
+        return True
+
+    def stop(self, channel, fade_ms=0):
+        """Stop a channel, optionally fading out"""
+        with self._lock:
+            self._playing.pop(channel, None)
+        if fade_ms:
+            self.channels[channel].fadeout(fade_ms)
+        else:
+            self.channels[channel].stop()
+
+    def is_busy(self, channel):
+        return self.channels[channel].get_busy()
+
+    def duck(self, active):
+        """Lower the effects channel while speech is playing"""
+        self.ducked = active
+        self.channels[EFFECTS].set_volume(self.duck_volume if active else 1.0)
+
+    def _start_watcher(self):
+        if not self._watcher.isActive():
+            self._watcher.start()
+
+    def _check_finished(self):
+        done = []
+        with self._lock:
+            for channel, (name, callback) in list(self._playing.items()):
+                if not self.channels[channel].get_busy():
+                    del self._playing[channel]
+                    done.append((channel, name, callback))
+            if not self._playing:
+                self._watcher.stop()
+        for channel, name, callback in done:
+            self.sound_finished.emit(name, channel)
+            if callback:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Error in sound callback for {name}: {e}")
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_audio_engine(preload=True):
+    """Shared audio engine; first call must come from the GUI thread
+
+    preload only applies to that first call: False leaves decoding the sound
+    bank to an explicit preload() call.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AudioEngine(preload=preload)
+        return _engine
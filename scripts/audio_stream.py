@@ -0,0 +1,279 @@
+import io
+import time
+import wave
+import threading
+import logging
+from collections import deque
+import pygame
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# MPEG audio layer III tables, indexed by header fields
+MPEG1 = 3
+BITRATES_KBPS = {
+    MPEG1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],
+    'lsf': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]  # MPEG2 / 2.5
+}
+SAMPLE_RATES = {
+    MPEG1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],   # MPEG2
+    0: [11025, 12000, 8000]     # MPEG2.5
+}
+
+def parse_frame_header(data, pos):
+    """Parse the layer III frame header at pos, returns (frame_length, seconds) or None"""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = (data[pos + 1] >> 1) & 0x03
+    bitrate_index = (data[pos + 2] >> 4) & 0x0F
+    rate_index = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+    if version == 1 or layer != 1 or rate_index == 3:
+        return None
+
+    bitrate = BITRATES_KBPS[MPEG1 if version == MPEG1 else 'lsf'][bitrate_index] * 1000
+    if not bitrate:
+        return None
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    if version == MPEG1:
+        return 144 * bitrate // sample_rate + padding, 1152 / sample_rate
+    return 72 * bitrate // sample_rate + padding, 576 / sample_rate
+
+def split_frames(data):
+    """Find complete frames in data, returns (frames, consumed) where frames is a list of (start, end, seconds)
+
+    Garbage before a sync word (e.g. an ID3 tag or a torn frame) is skipped.
+    """
+    frames = []
+    pos = 0
+    while pos + 4 <= len(data):
+        header = parse_frame_header(data, pos)
+        if header is None:
+            pos += 1
+            continue
+        length, seconds = header
+        if pos + length > len(data):
+            break  # Incomplete frame, wait for more data
+        frames.append((pos, pos + length, seconds))
+        pos += length
+    return frames, pos
+
+class StreamPlayer:
+    """Plays an audio byte stream while it is still arriving
+
+    Subclasses cut incoming bytes into short segments, decode each in memory
+    into a pygame Sound and hand it to _enqueue; segments are queued on a
+    dedicated channel. The first segment is kept short so audio starts as soon
+    as possible.
+    """
+
+    FIRST_SEGMENT_SECONDS = 0.3
+    SEGMENT_SECONDS = 1.0
+
+    def __init__(self, channel, active=True):
+        self.channel = channel
+        self.active = active        # Only the active player may use the channel
+        self.first_audio_at = None  # time.time() when the first segment started playing
+        self.on_first_audio = None  # Optional callback run when the first segment starts
+        self.audio_seconds = 0.0    # Duration of all audio fed so far
+        self._pending = deque()      # Decoded Sounds waiting for the channel
+        self._lock = threading.Lock()
+        self._finished = False
+        self._stopped = False
+        self._starved = False
+        self.segments_played = 0
+        self.underruns = 0          # Times the channel ran dry while more audio was still coming
+
+    def feed(self, data):
+        """Add encoded bytes, decoding a segment once enough audio has arrived"""
+        raise NotImplementedError
+
+    def _flush(self):
+        """Decode whatever has been fed but not decoded yet"""
+        raise NotImplementedError
+
+    def _segment_target(self):
+        return self.FIRST_SEGMENT_SECONDS if self.segments_played == 0 and not self._pending else self.SEGMENT_SECONDS
+
+    @property
+    def finished(self):
+        """True once the whole stream has arrived and been decoded"""
+        return self._finished
+
+    @property
+    def has_audio(self):
+        """True if decoded audio is waiting to be played"""
+        with self._lock:
+            return bool(self._pending)
+
+    def activate(self):
+        """Give this player the channel and start playing what is already decoded"""
+        self.active = True
+        self.pump()
+
+    def finish(self):
+        """Mark the stream complete and decode whatever is left"""
+        self._flush()
+        self._finished = True
+
+    def _enqueue(self, sound):
+        with self._lock:
+            self._pending.append(sound)
+        self.pump()
+
+    def pump(self):
+        """Move decoded segments onto the channel as space frees up"""
+        with self._lock:
+            if self._stopped or not self.active:
+                return
+            if not self._pending and self.segments_played and not self._finished:
+                # Nothing decoded to follow the current segment: count each dry spell once
+                if not self.channel.get_busy() and not self._starved:
+                    self._starved = True
+                    self.underruns += 1
+            while self._pending and self.channel.get_queue() is None:
+                self._starved = False
+                sound = self._pending.popleft()
+                # queue() starts playback immediately when the channel is idle
+                self.channel.queue(sound)
+                self.segments_played += 1
+                if self.first_audio_at is None:
+                    self.first_audio_at = time.time()
+                    if self.on_first_audio:
+                        self.on_first_audio()
+
+    def is_playing(self):
+        """True until every segment has been played (or the player was stopped)"""
+        if self._stopped:
+            return False
+        with self._lock:
+            pending = bool(self._pending)
+        return pending or not self._finished or self.channel.get_busy()
+
+    def stop(self):
+        """Stop playback immediately and drop everything not yet played"""
+        with self._lock:
+            self._stopped = True
+            self._pending.clear()
+            self._discard()
+        self.channel.stop()
+        # Stopping promotes a queued segment to playing, so stop once more
+        if self.channel.get_busy():
+            self.channel.stop()
+
+    def _discard(self):
+        """Drop undecoded input (lock held)"""
+
+class Mp3StreamPlayer(StreamPlayer):
+    """Streams MP3 audio, cutting segments on frame boundaries
+
+    Each segment is decoded with a couple of frames of the previous one as
+    priming (layer III frames borrow bits from their predecessors) and the
+    primed audio is trimmed.
+    """
+
+    PRIMING_FRAMES = 2
+
+    def __init__(self, channel, active=True):
+        super().__init__(channel, active)
+        self._buffer = bytearray()
+        self._frames = []            # (bytes, seconds) not yet decoded
+        self._frame_seconds = 0.0
+        self._priming = []           # Last frames of the previous segment
+
+    def feed(self, data):
+        """Add MP3 bytes, decoding a segment once enough audio has arrived"""
+        self._buffer.extend(data)
+        frames, consumed = split_frames(self._buffer)
+        for start, end, seconds in frames:
+            self._frames.append((bytes(self._buffer[start:end]), seconds))
+            self._frame_seconds += seconds
+            self.audio_seconds += seconds
+        del self._buffer[:consumed]
+
+        if self._frame_seconds >= self._segment_target():
+            self._decode_segment()
+
+    def _flush(self):
+        if self._frames:
+            self._decode_segment()
+
+    def _discard(self):
+        self._frames = []
+
+    def _decode_segment(self):
+        frames, self._frames = self._frames, []
+        self._frame_seconds = 0.0
+        priming = self._priming
+        self._priming = frames[-self.PRIMING_FRAMES:]
+
+        data = b''.join(f for f, _ in priming + frames)
+        try:
+            sound = pygame.mixer.Sound(file=io.BytesIO(data))
+        except Exception as e:
+            logger.error(f"Error decoding speech segment: {e}")
+            return
+
+        if priming:
+            # Drop the decoded priming audio so segments join without repeats
+            frequency, size, channels = pygame.mixer.get_init()
+            bytes_per_frame = abs(size) // 8 * channels
+            trim = int(sum(s for _, s in priming) * frequency) * bytes_per_frame
+            raw = sound.get_raw()
+            if trim < len(raw):
+                sound = pygame.mixer.Sound(buffer=raw[trim:])
+
+        self._enqueue(sound)
+
+class PcmStreamPlayer(StreamPlayer):
+    """Streams raw signed 16-bit little-endian PCM (e.g. from a local neural voice)
+
+    Segments are wrapped in an in-memory WAV header so the mixer converts the
+    sample rate and channel count.
+    """
+
+    def __init__(self, channel, sample_rate, channels=1, active=True):
+        super().__init__(channel, active)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._buffer = bytearray()
+
+    @property
+    def _bytes_per_second(self):
+        return self.sample_rate * 2 * self.channels
+
+    def feed(self, data):
+        """Add PCM bytes, decoding a segment once enough audio has arrived"""
+        self._buffer.extend(data)
+        self.audio_seconds += len(data) / self._bytes_per_second
+        if len(self._buffer) >= self._segment_target() * self._bytes_per_second:
+            self._decode_segment()
+
+    def _flush(self):
+        if self._buffer:
+            self._decode_segment()
+
+    def _discard(self):
+        self._buffer = bytearray()
+
+    def _decode_segment(self):
+        # Keep whole sample frames together
+        usable = len(self._buffer) - len(self._buffer) % (2 * self.channels)
+        data = bytes(self._buffer[:usable])
+        del self._buffer[:usable]
+
+        wav = io.BytesIO()
+        with wave.open(wav, 'wb') as writer:
+            writer.setnchannels(self.channels)
+            writer.setsampwidth(2)
+            writer.setframerate(self.sample_rate)
+            writer.writeframes(data)
+        wav.seek(0)
+        try:
+            sound = pygame.mixer.Sound(file=wav)
+        except Exception as e:
+            logger.error(f"Error decoding speech segment: {e}")
+            return
+        self._enqueue(sound)
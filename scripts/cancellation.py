@@ -0,0 +1,57 @@
+import threading
+import time
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class CancelledError(Exception):
+    """Raised when work is abandoned because its interaction was cancelled"""
+    pass
+
+class CancellationToken:
+    """Thread-safe flag shared by every stage of one interaction (LLM, TTS, display)"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.created_at = time.perf_counter()
+        self.cancelled_at = None  # perf_counter timestamp of the cancel request
+
+    @property
+    def cancelled(self):
+        """True once cancel() has been called"""
+        return self._event.is_set()
+
+    def cancel(self):
+        """Cancel the interaction and run registered callbacks exactly once"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.cancelled_at = time.perf_counter()
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in cancellation callback: {e}")
+
+    def on_cancel(self, callback):
+        """Register a callback to run on cancel (runs immediately if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self):
+        """Raise CancelledError if the token has been cancelled"""
+        if self._event.is_set():
+            raise CancelledError()
+
+    def wait(self, timeout=None):
+        """Block until cancelled or timeout, returns True if cancelled"""
+        return self._event.wait(timeout)
@@ -0,0 +1,236 @@
+import os
+import copy
+import json
+import threading
+import logging
+from PyQt5.QtCore import QObject, pyqtSignal
+from persistence import get_persistent_writer
+from resources import get_resource_path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class Setting:
+    """Type, default and allowed values of one config key"""
+
+    def __init__(self, kind, default, choices=None, minimum=None, maximum=None, optional=False):
+        self.kind = kind
+        self.default = default
+        self.choices = choices
+        self.minimum = minimum
+        self.maximum = maximum
+        self.optional = optional
+
+    def validate(self, value):
+        """Return value converted to this setting's type, or raise ValueError"""
+        if value is None:
+            if self.optional:
+                return None
+            raise ValueError("a value is required")
+        if self.kind is bool:
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, int) and value in (0, 1):
+                return bool(value)
+            raise ValueError(f"expected true or false, got {value!r}")
+        if self.kind in (int, float):
+            if isinstance(value, bool):
+                raise ValueError(f"expected a number, got {value!r}")
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"expected a number, got {value!r}")
+            if self.kind is int:
+                if number != int(number):
+                    raise ValueError(f"expected a whole number, got {value!r}")
+                number = int(number)
+            if self.minimum is not None and number < self.minimum:
+                raise ValueError(f"{number} is below the minimum of {self.minimum}")
+            if self.maximum is not None and number > self.maximum:
+                raise ValueError(f"{number} is above the maximum of {self.maximum}")
+            return number
+        if not isinstance(value, self.kind):
+            raise ValueError(f"expected {self.kind.__name__}, got {type(value).__name__}")
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"{value!r} is not one of {', '.join(map(str, self.choices))}")
+        return value
+
+# Every key Ova reads from config.json; keys not listed here are kept but not validated
+SCHEMA = {
+    # Voice
+    'voice_type': Setting(str, 'Azure Voice', choices=('Azure Voice', 'Edge Voice', 'Windows Voice')),
+    'voice_name': Setting(str, 'en-US-AnaNeural'),
+    'tts_engine': Setting(str, 'auto', choices=('auto', 'edge', 'piper', 'fake', 'system')),
+    'max_tts_ttfa': Setting(float, 1.5, minimum=0),
+    'tts_lookahead': Setting(int, 2, minimum=0, maximum=10),
+    'tts_cache_mb': Setting(float, 50, minimum=0),
+    'piper_voice': Setting(str, None, optional=True),
+    'acknowledgements': Setting(bool, True),
+    'max_spoken_chars': Setting(int, 600, minimum=0),
+
+    # Behaviour
+    'sleep_timer': Setting(int, 30, minimum=1),
+    'personality_preset': Setting(str, 'ova'),
+    'display_mode': Setting(str, 'bubble', choices=('bubble', 'chat', 'none')),
+    'enable_random_actions': Setting(bool, True),
+    'min_action_interval': Setting(int, 5, minimum=1),
+    'max_action_interval': Setting(int, 10, minimum=1),
+    'enabled_actions': Setting(dict, {
+        'take_flight': True,
+        'look_around': True,
+        'dance': True,
+        'screech': True
+    }),
+
+    # Conversation
+    'max_conversation_pairs': Setting(int, 10, minimum=1),
+    'save_conversation_history': Setting(bool, True),
+    'current_conversation': Setting(str, None, optional=True),
+
+    # Language model
+    'ollama_host': Setting(str, None, optional=True),
+    'model_routing': Setting(dict, {}),
+}
+
+class ConfigService(QObject):
+    """config.json, loaded once and validated against SCHEMA
+
+    get() returns the stored value, or the schema default if it is missing or
+    invalid. set()/update() validate, save and publish the keys whose value
+    actually changed; subscribe() callbacks receive {key: new value} for the
+    keys they asked for, on the thread that owns the service (the GUI thread).
+    """
+
+    # {key: new value} for every key that changed
+    changed = pyqtSignal(object)
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or get_resource_path('config.json')
+        self._values = {}
+        self._lock = threading.RLock()
+        self._subscribers = []  # (keys, callback)
+        self.changed.connect(self._dispatch)
+        self.load()
+
+    def load(self):
+        """Read config.json, replacing invalid values with their defaults"""
+        stored = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading config: {e}")
+        if not isinstance(stored, dict):
+            logger.error("Ignoring config.json: expected a JSON object")
+            stored = {}
+
+        values = {}
+        for key, value in stored.items():
+            setting = SCHEMA.get(key)
+            if setting is None:
+                values[key] = value
+                continue
+            try:
+                values[key] = setting.validate(value)
+            except ValueError as e:
+                logger.warning(f"Invalid config value for {key} ({e}), using {setting.default!r}")
+        with self._lock:
+            self._values = values
+        logger.info(f"Loaded config: {values}")
+
+    def get(self, key, default=None):
+        """Value of key; keys in SCHEMA fall back to the schema default, others to default"""
+        with self._lock:
+            if key in self._values:
+                return copy.deepcopy(self._values[key])
+        setting = SCHEMA.get(key)
+        if setting is not None:
+            return copy.deepcopy(setting.default)
+        return default
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._values
+
+    def snapshot(self):
+        """Every setting (defaults included) as a plain dict"""
+        with self._lock:
+            values = {key: setting.default for key, setting in SCHEMA.items()}
+            values.update(self._values)
+            return copy.deepcopy(values)
+
+    def set(self, key, value):
+        """Change one setting, returns True if its value changed"""
+        return bool(self.update({key: value}))
+
+    def update(self, values):
+        """Validate, store and save several settings at once
+
+        Raises ValueError (and changes nothing) if any value is invalid.
+        Returns the {key: value} that actually changed.
+        """
+        validated = {}
+        for key, value in values.items():
+            setting = SCHEMA.get(key)
+            try:
+                validated[key] = setting.validate(value) if setting else value
+            except ValueError as e:
+                raise ValueError(f"Invalid value for {key}: {e}")
+
+        with self._lock:
+            # Compare with the effective value so re-saving a default is not a change
+            changes = {key: value for key, value in validated.items()
+                       if key in self._values and self._values[key] != value
+                       or key not in self._values and (key not in SCHEMA or SCHEMA[key].default != value)}
+            if not changes:
+                return {}
+            self._values.update(copy.deepcopy(changes))
+            self.save()
+        logger.info(f"Config changed: {changes}")
+        self.changed.emit(copy.deepcopy(changes))
+        return changes
+
+    def notify(self, *keys):
+        """Publish keys as changed without changing them (e.g. their file was replaced)"""
+        self.changed.emit({key: self.get(key) for key in keys})
+
+    def save(self):
+        """Queue the settings to be written to config.json (bursts become one write)"""
+        with self._lock:
+            get_persistent_writer().write_json(self.path, self._values)
+
+    def subscribe(self, keys, callback):
+        """Call callback({key: new value}) whenever any of keys changes"""
+        if isinstance(keys, str):
+            keys = (keys,)
+        self._subscribers.append((frozenset(keys), callback))
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(keys, cb) for keys, cb in self._subscribers if cb != callback]
+
+    def _dispatch(self, changes):
+        # Subscribers are called in the order they subscribed
+        for keys, callback in list(self._subscribers):
+            relevant = {key: value for key, value in changes.items() if key in keys}
+            if not relevant:
+                continue
+            try:
+                callback(relevant)
+            except Exception as e:
+                logger.error(f"Error applying config change {relevant}: {e}")
+
+_config_service = None
+_config_service_lock = threading.Lock()
+
+def get_config_service():
+    """Shared config service; config.json is read the first time this is called"""
+    global _config_service
+    with _config_service_lock:
+        if _config_service is None:
+            _config_service = ConfigService()
+        return _config_service
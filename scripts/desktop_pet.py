@@ -1,33 +1,22 @@
+from startup import StartupSequence, CHECK_TIMEOUT_MS  # First, so startup is timed from here
 import sys
 import os
 import random
-import glob
+import importlib
 from PyQt5.QtWidgets import QApplication, QWidget, QSystemTrayIcon, QMenu, QDialog
 from PyQt5.QtCore import Qt, QTimer, QPoint, pyqtSignal, QObject, QSize, QThread
-from PyQt5.QtGui import QPixmap, QIcon, QTransform, QPainter
-from voice_assistant import VoiceAssistant
+from PyQt5.QtGui import QPixmap, QImage, QIcon, QTransform, QPainter
 from display.display_manager import DisplayManager
-from text_to_speech import TTSEngine
-from settings_dialog import SettingsDialog
-import json
+from tracing import get_tracer
+from config_service import get_config_service
+from resources import get_asset_store, get_resource_path
+from persistence import get_persistent_writer
 import time
 import logging
-import pygame
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def get_resource_path(relative_path):
-    """Get the correct resource path whether running as script or frozen exe"""
-    if hasattr(sys, '_MEIPASS'):
-        # Running as PyInstaller bundle
-        base_path = sys._MEIPASS
-    else:
-        # Running as script
-        base_path = os.path.dirname(os.path.dirname(__file__))
-    return os.path.join(base_path, relative_path)
-
 class ChatBubble:
     def __init__(self, parent=None):
         self.parent = parent
@@ -64,17 +53,29 @@ class ResponseHandler(QObject):
 
 class OwlPet(QWidget):
     handle_response_signal = pyqtSignal(object)  # Changed from str to object to handle tuples
-    start_thinking_signal = pyqtSignal()
+    start_thinking_signal = pyqtSignal(object)  # Trace ID (or None)
     start_speaking_signal = pyqtSignal()
     stop_speaking_signal = pyqtSignal()
-    start_listening_signal = pyqtSignal()
-    stop_listening_signal = pyqtSignal()
+    start_listening_signal = pyqtSignal(object)  # Trace ID (or None)
+    stop_listening_signal = pyqtSignal(object)  # Trace ID (or None)
     state_change_signal = pyqtSignal(str)  # New signal for state changes
+    interrupt_signal = pyqtSignal(object)  # Carries the cancelled interaction token
+    partial_response_signal = pyqtSignal(object)  # (text piece, user text, token)
+    
+    # Animation directories under assets; idle is loaded before the window shows
+    ANIMATIONS = ['idle', 'flying', 'landing', 'take_flight', 'look_around', 'thinking',
+                  'speaking', 'dance', 'pickup', 'falling_asleep', 'asleep', 'waking_up', 'listening']
     
     def __init__(self):
         super().__init__()
-        # Initialize pygame mixer for sound effects
-        pygame.mixer.init()
+        # Only the idle owl is needed for the first frame; everything else starts after it
+        self.startup = StartupSequence()
+        self.startup.first_frame.connect(self.on_first_frame)
+        self.animations = {}
+        self.audio = None  # Shared audio engine, owns the mixer and the preloaded sound effects
+        self.tts_engine = None
+        self.voice_assistant = None
+        self.speech_started = False
         
         # Initialize variables
         self.current_state = "idle"
@@ -84,13 +85,15 @@ class OwlPet(QWidget):
         self.in_transition = False
         self.scale_factor = 2  # Reduced scale factor
         
-        # Load config
-        self.config = self.load_config()
+        # Shared config, read from disk once
+        self.config = get_config_service()
         
         # Random action timer
         self.random_action_timer = QTimer(self)
         self.random_action_timer.timeout.connect(self.perform_random_action)
         self.schedule_next_random_action()
+        self.config.subscribe(('enable_random_actions', 'min_action_interval', 'max_action_interval'),
+                              self.on_random_actions_changed)
         
         # Initialize variables
         self.current_state = "idle"
@@ -100,12 +103,13 @@ class OwlPet(QWidget):
         self.in_transition = False
         self.scale_factor = 2  # Reduced scale factor
         
-        # Load config
-        self.config = self.load_config()
-        
         # Flag for direct listening mode
         self.waiting_for_response = False
         
+        # Tracing of the interaction currently in progress
+        self.tracer = get_tracer()
+        self.current_trace_id = None
+        
         # Movement and position variables
         self.dragging = False
         self.offset = QPoint()
@@ -127,7 +131,8 @@ class OwlPet(QWidget):
         self.last_activity_time = QTimer()
         self.last_activity_time.timeout.connect(self.check_idle)
         self.last_activity_time.start(1000)  # Check every second
-        self.idle_timeout = self.config.get('sleep_timer', 30)  # Get sleep timer from config, default to 30 seconds
+        self.idle_timeout = self.config.get('sleep_timer')  # Seconds idle before falling asleep
+        self.config.subscribe('sleep_timer', self.on_sleep_timer_changed)
         self.last_active = time.time()
         
         # Animation states and transitions
@@ -150,9 +155,9 @@ class OwlPet(QWidget):
         # States that should loop
         self.looping_states = {"flying", "listening", "thinking", "speaking", "dance", "held", "asleep"}
         
-        # Initialize UI and animations
+        # Initialize UI and the idle animation
         self.initUI()
-        self.loadAnimations()
+        self.loadAnimations(['idle'])
         self.setupTimers()
         
         # Initialize components
@@ -174,26 +179,11 @@ class OwlPet(QWidget):
         # self.state_timer.start(random.randint(5000, 10000))  # Random interval between 5-10 seconds
 
     def setupComponents(self):
-        """Setup additional components like TTS and voice assistant"""
+        """Setup the display and window; audio, TTS and voice assistant start after the first frame"""
         # Initialize display manager
         self.display_manager = DisplayManager(self)
-        display_mode = self.config.get('display_mode', 'bubble')
-        self.display_manager.initialize(display_mode)
-        
-        # Initialize TTS Engine
-        self.tts_engine = TTSEngine()
-        self.tts_engine.speak_started.connect(self.start_speaking)
-        self.tts_engine.speak_finished.connect(self.on_speak_done)
-        self.tts_engine.speak_error.connect(lambda e: print(f"TTS Error: {e}"))
-        
-        # Initialize Voice Assistant
-        try:
-            self.voice_assistant = VoiceAssistant(callback=self.handle_response_thread)
-            print("Voice assistant initialized. Continuously listening...")
-            self.voice_assistant.start_listening()
-        except Exception as e:
-            print(f"Voice assistant not available: {e}")
-            self.voice_assistant = None
+        self.display_manager.initialize(self.config.get('display_mode'))
+        self.config.subscribe('display_mode', self.on_display_mode_changed)
         
         # Connect all signals
         self.handle_response_signal.connect(self.handle_response_gui)
@@ -202,6 +192,8 @@ class OwlPet(QWidget):
         self.stop_speaking_signal.connect(self.on_speak_done)
         self.start_listening_signal.connect(self.start_listening)
         self.stop_listening_signal.connect(self.stop_listening)
+        self.interrupt_signal.connect(self.interrupt)
+        self.partial_response_signal.connect(self.handle_partial_response)
         
         # Initialize response handler
         self.response_handler = ResponseHandler()
@@ -223,6 +215,85 @@ class OwlPet(QWidget):
         # Create system tray
         self.createSystemTray()
     
+    def on_first_frame(self, elapsed_ms):
+        """Start the remaining subsystems once the idle owl has been painted"""
+        self.start_animations()
+        # Also covers the audio stage failing before the mixer could be opened
+        self.startup.audio_ready.connect(self.start_speech)
+        self.start_audio()
+    
+    def start_animations(self):
+        """Decode the remaining animations in the background"""
+        names = [name for name in self.ANIMATIONS if name not in self.animations]
+        self.startup.run_in_background('animations', lambda: self.read_animation_frames(names),
+                                       self.add_animations)
+    
+    def start_audio(self):
+        """Import pygame and the audio engine in the background, then open the mixer"""
+        self.startup.run_in_background('audio', lambda: importlib.import_module('audio_engine'),
+                                       self.open_audio)
+    
+    def open_audio(self, audio_engine):
+        """Open the mixer (GUI thread), returns the sound bank decoding to run in the background"""
+        try:
+            self.audio = audio_engine.get_audio_engine(preload=False)
+        finally:
+            self.start_speech()
+        return self.audio.preload
+    
+    def start_speech(self):
+        """Start TTS and the voice assistant, which play through the mixer, once it is open"""
+        if self.speech_started:
+            return
+        self.speech_started = True
+        QTimer.singleShot(0, self.start_tts)
+        QTimer.singleShot(0, self.start_voice_assistant)
+    
+    def start_tts(self):
+        """Import the TTS engine in the background, then initialize it"""
+        self.startup.run_in_background('tts', lambda: importlib.import_module('text_to_speech'),
+                                       self.create_tts)
+    
+    def create_tts(self, text_to_speech):
+        """Initialize the TTS engine (GUI thread)"""
+        self.tts_engine = text_to_speech.TTSEngine()
+        self.tts_engine.speak_started.connect(self.start_speaking)
+        self.tts_engine.speak_finished.connect(self.on_speak_done)
+        self.tts_engine.speak_error.connect(lambda e: print(f"TTS Error: {e}"))
+    
+    def start_voice_assistant(self):
+        """Import speech recognition and the LLM client in the background, then start listening"""
+        def import_voice_assistant():
+            try:
+                return importlib.import_module('voice_assistant')
+            except Exception as e:
+                # The llm stage is only started once the import succeeds
+                self.startup.ready('llm', f"voice assistant not available: {e}")
+                raise
+
+        self.startup.run_in_background('stt', import_voice_assistant, self.create_voice_assistant)
+    
+    def create_voice_assistant(self, voice_assistant):
+        """Initialize the voice assistant (GUI thread), returns the microphone setup to run in the background"""
+        try:
+            self.voice_assistant = voice_assistant.VoiceAssistant(callback=self.handle_response_thread)
+        except Exception as e:
+            print(f"Voice assistant not available: {e}")
+            self.startup.ready('llm', "voice assistant not available")
+            raise
+        self.sync_chat_history()
+        self.config.subscribe(('current_conversation', 'save_conversation_history'),
+                              self.on_conversation_changed)
+        
+        # Load the language model while the microphone is calibrated
+        self.startup.run_in_background('llm', self.voice_assistant.warm_up)
+        
+        def listen():
+            self.voice_assistant.open_microphone()
+            self.voice_assistant.start_listening()
+            print("Voice assistant initialized. Continuously listening...")
+        return listen
+    
     def initUI(self):
         # Create a window without frame that stays on top
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
@@ -233,7 +304,12 @@ class OwlPet(QWidget):
     def createSystemTray(self):
         """Create system tray icon and menu"""
         self.tray_icon = QSystemTrayIcon(self)
-        self.tray_icon.setIcon(QIcon(get_resource_path(os.path.join("assets", "tray_icon.png"))))
+        icon = QPixmap()
+        try:
+            icon.loadFromData(get_asset_store().read("assets/tray_icon.png"))
+        except OSError as e:
+            logger.warning(f"Tray icon not available: {e}")
+        self.tray_icon.setIcon(QIcon(icon))
         
         # Create the menu
         menu = QMenu()
@@ -262,34 +338,34 @@ class OwlPet(QWidget):
         else:
             self.show()
 
-    def loadAnimations(self):
-        """Load all animation frames from assets directory"""
-        # Get path to assets directory using resource path
-        assets_dir = get_resource_path('assets')
-        
-        # Load all animations
-        self.animations = {}
-        for anim_dir in ['idle', 'flying', 'landing', 'take_flight', 'look_around', 'thinking', 
-                        'speaking', 'dance', 'pickup', 'falling_asleep', 'asleep', 'waking_up', 'listening']:
-            anim_path = os.path.join(assets_dir, anim_dir)
-            if os.path.exists(anim_path):
-                frames = sorted(glob.glob(os.path.join(anim_path, '*.png')))
+    def loadAnimations(self, names=None):
+        """Load animation frames from assets directory (all of them by default)"""
+        self.add_animations(self.read_animation_frames(names or self.ANIMATIONS))
+
+    def read_animation_frames(self, names):
+        """Decode and scale the frames of each animation, returns {name: [QImage]}
+        
+        Only touches QImage, so it can run in a background thread.
+        """
+        # Frames come from the asset bundle in packaged builds, loose files otherwise
+        assets = get_asset_store()
+        
+        frames_by_name = {}
+        for anim_dir in names:
+            anim_path = f"assets/{anim_dir}"
+            if assets.exists(anim_path):
+                frames = [QImage.fromData(assets.read(frame)) for frame in assets.list(anim_path, '.png')]
                 if frames:
-                    # Load first frame to get dimensions
-                    first_frame = QPixmap(frames[0])
-                    base_size = first_frame.size()
+                    # First frame gives the dimensions
+                    base_size = frames[0].size()
                     
                     # Calculate scaled size maintaining aspect ratio
                     scaled_width = base_size.width() * self.scale_factor
                     scaled_height = base_size.height() * self.scale_factor
-                    scaled_size = QSize(scaled_width, scaled_height)
-                    
-                    # Set window to scaled size
-                    self.setFixedSize(scaled_size)
                     
                     # Scale all frames maintaining square pixels
-                    self.animations[anim_dir] = [
-                        QPixmap(frame).scaled(
+                    frames_by_name[anim_dir] = [
+                        frame.scaled(
                             scaled_width,
                             scaled_height,
                             Qt.IgnoreAspectRatio,  # Force exact dimensions
@@ -297,14 +373,23 @@ class OwlPet(QWidget):
                         )
                         for frame in frames
                     ]
-                    
-                    # Create putdown animation by reversing pickup frames
-                    if anim_dir == 'pickup':
-                        self.animations['putdown'] = list(reversed(self.animations['pickup']))
-                        # Create held state using last frame of pickup
-                        self.animations['held'] = [self.animations['pickup'][-1]]
             else:
                 print(f"Warning: Animation directory not found: {anim_path}")
+        return frames_by_name
+
+    def add_animations(self, frames_by_name):
+        """Make decoded frames available to paint (GUI thread only)"""
+        for anim_dir, frames in frames_by_name.items():
+            self.animations[anim_dir] = [QPixmap.fromImage(frame) for frame in frames]
+            
+            # Set window to scaled size
+            self.setFixedSize(self.animations[anim_dir][0].size())
+            
+            # Create putdown animation by reversing pickup frames
+            if anim_dir == 'pickup':
+                self.animations['putdown'] = list(reversed(self.animations['pickup']))
+                # Create held state using last frame of pickup
+                self.animations['held'] = [self.animations['pickup'][-1]]
 
     def updateAnimation(self):
         """Update the current animation frame"""
@@ -402,6 +487,7 @@ class OwlPet(QWidget):
             return
             
         print(f"Changing state from {self.current_state} to {new_state}")
+        self.tracer.event(self.current_trace_id, 'state', **{'from': self.current_state, 'to': new_state})
         
         # Store previous state
         self.previous_state = self.current_state
@@ -443,6 +529,10 @@ class OwlPet(QWidget):
             if self.current_state in ['asleep', 'falling_asleep']:
                 self.wake_up()
                 return
+            
+            # Clicking Ova while she is thinking or talking cuts her off
+            if self.current_state in ['thinking', 'speaking'] or (self.tts_engine and self.tts_engine.is_speaking):
+                self.request_interrupt()
                 
             self.dragging = True
             self.offset = event.pos()
@@ -564,13 +654,18 @@ class OwlPet(QWidget):
             if self.current_state in ['asleep', 'falling_asleep']:
                 self.wake_up()
             
-            # Handle different response types
-            if response == "START_LISTENING":
-                self.start_listening_signal.emit()
-            elif response == "STOP_LISTENING":
-                self.stop_listening_signal.emit()
-            elif response == "START_THINKING":
-                self.start_thinking_signal.emit()
+            # Control messages arrive as (command, payload) tuples
+            command = response[0] if isinstance(response, tuple) else None
+            if command == "INTERRUPT":
+                self.interrupt_signal.emit(response[1])
+            elif command == "START_LISTENING":
+                self.start_listening_signal.emit(response[1])
+            elif command == "STOP_LISTENING":
+                self.stop_listening_signal.emit(response[1])
+            elif command == "START_THINKING":
+                self.start_thinking_signal.emit(response[1])
+            elif command == "PARTIAL":
+                self.partial_response_signal.emit(response[1])
             else:
                 # Emit signal to handle response in GUI thread
                 self.handle_response_signal.emit(response)
@@ -580,18 +675,27 @@ class OwlPet(QWidget):
     def handle_response_gui(self, response):
         """Handle the response in the GUI thread"""
         try:
-            # Extract response text and user text from tuple if present
+            # Drop responses whose interaction was cancelled while queued
+            token = response[2] if isinstance(response, tuple) and len(response) > 2 else None
+            if token is not None and token.cancelled:
+                logger.info("Dropping stale response from cancelled interaction")
+                return
+            
+            # Extract response text, user text and trace ID from tuple if present
             response_text = response[0] if isinstance(response, tuple) else response
+            trace_id = response[3] if isinstance(response, tuple) and len(response) > 3 else None
+            if trace_id:
+                self.current_trace_id = trace_id
             
             # Show the message in the current display mode
             self.show_speech_bubble(response)
             # Change from thinking to speaking
             self.state_change_signal.emit("speaking")
             # Speak the response
-            self.speak_response(response_text)
+            self.speak_response(response_text, trace_id)
             
             # Check if response ends with a question mark
-            if response_text.strip().endswith('?') and not self.waiting_for_response:
+            if response_text.strip().endswith('?') and not self.waiting_for_response and self.tts_engine:
                 self.waiting_for_response = True
                 # Connect to speak finished to start listening
                 self.tts_engine.speak_finished.connect(self.handle_question_response)
@@ -599,6 +703,19 @@ class OwlPet(QWidget):
         except Exception as e:
             print(f"Error handling response: {e}")
     
+    def sync_chat_history(self):
+        """Show the voice assistant's current conversation in the chat window"""
+        if self.display_manager and hasattr(self, 'voice_assistant') and self.voice_assistant:
+            self.display_manager.load_history(self.voice_assistant.history_path)
+    
+    def handle_partial_response(self, partial):
+        """Show a piece of a response that is still being generated"""
+        text, user_text, token = partial
+        if token is not None and token.cancelled:
+            return
+        if self.display_manager:
+            self.display_manager.append_text(text, user_text)
+    
     def handle_question_response(self):
         """Handle when Ova asks a question"""
         try:
@@ -607,9 +724,10 @@ class OwlPet(QWidget):
             
             if hasattr(self, 'voice_assistant') and self.voice_assistant:
                 # Play activation sound before starting to listen
-                if self.voice_assistant.activation_sound_obj:
-                    self.voice_assistant.activation_sound_obj.play()
-                    time.sleep(0.1)  # Small delay to let sound start playing
+                if self.audio:
+                    from audio_engine import PROMPTS
+                    self.audio.play('activation', PROMPTS)
+                time.sleep(0.1)  # Small delay to let sound start playing
                 
                 # Start listening animation through signal
                 self.state_change_signal.emit("listening")
@@ -623,21 +741,63 @@ class OwlPet(QWidget):
             print(f"Error in handle_question_response: {e}")
             self.waiting_for_response = False
 
-    def start_thinking(self):
+    def request_interrupt(self):
+        """Cancel the current interaction from the GUI (e.g. on click)"""
+        voice_assistant = getattr(self, 'voice_assistant', None)
+        token = voice_assistant.current_token if voice_assistant else None
+        if token is not None and not token.cancelled:
+            # Routes back through interrupt() via the INTERRUPT callback
+            voice_assistant.interrupt()
+        else:
+            # Nothing left to cancel, but speech or display updates may still be queued
+            self.interrupt(None)
+    
+    def interrupt(self, token):
+        """Stop speech and flush pending display updates in GUI thread"""
+        requested_at = token.cancelled_at if token is not None else None
+        if self.tts_engine:
+            self.tts_engine.stop(requested_at)
+        
+        if self.display_manager:
+            self.display_manager.cancel_pending()
+        
+        # Don't follow up a question that was cut off
+        if self.waiting_for_response:
+            try:
+                self.tts_engine.speak_finished.disconnect(self.handle_question_response)
+            except TypeError:
+                pass
+            self.waiting_for_response = False
+        
+        if self.current_state in ['thinking', 'speaking']:
+            self.state_change_signal.emit("idle")
+        self.reset_idle_timer()
+        self.tracer.event(self.current_trace_id, 'interrupted')
+
+    def start_thinking(self, trace_id=None):
         """Start thinking animation when wake word detected"""
+        if trace_id:
+            self.current_trace_id = trace_id
         self.state_change_signal.emit("thinking")
+        # Fill the silence until the answer's first audio is ready
+        if self.tts_engine:
+            self.tts_engine.acknowledge(trace_id)
     
-    def speak_response(self, response):
+    def speak_response(self, response, trace_id=None):
         """Speak the response using TTS"""
         # Extract response text if it's a tuple
         response_text = response[0] if isinstance(response, tuple) else response
-        self.tts_engine.speak(response_text)
+        if self.tts_engine:
+            self.tts_engine.speak(response_text, trace_id=trace_id)
     
     def on_speak_done(self):
         """Handle completion of speaking in GUI thread"""
         if self.current_state == "speaking":
             self.state_change_signal.emit("idle")
             self.reset_idle_timer()  # Reset sleep timer when done speaking
+        # The interaction's trace ends with the last spoken word
+        self.tracer.event(self.current_trace_id, 'interaction_end')
+        self.current_trace_id = None
 
     def start_speaking(self):
         """Start speaking animation in GUI thread"""
@@ -710,8 +870,10 @@ class OwlPet(QWidget):
 
     def get_current_frame(self):
         """Get the current frame, flipping it if necessary"""
-        if self.current_state in self.animations and self.animations[self.current_state]:
-            current_frame = self.animations[self.current_state][self.frame_index]
+        # Stay on the idle owl while the state's own frames are still loading
+        frames = self.animations.get(self.current_state) or self.animations.get('idle')
+        if frames:
+            current_frame = frames[self.frame_index % len(frames)]
             
             # Flip the sprite if facing left for flight-related animations and regular movement
             if not self.facing_right and (self.current_state in ["flying", "take_flight", "landing"] or self.dragging):
@@ -756,54 +918,27 @@ class OwlPet(QWidget):
         self.state_change_signal.emit("dance")
 
     def showSettings(self):
-        """Show settings dialog"""
+        """Show settings dialog; saved changes reach each subsystem as config notifications"""
+        from settings_dialog import SettingsDialog
         dialog = SettingsDialog(self)
         if dialog.exec_() == QDialog.Accepted:
-            logger.info("Settings dialog accepted, reloading config")
-            # Reload config
-            self.config = self.load_config()
-            logger.info(f"Reloaded config: {self.config}")
-            
-            # Update voice if changed
-            selected_voice = dialog.getSelectedVoice()
-            if selected_voice:
-                self.tts_engine.change_voice(selected_voice)
-                
-            # Update sleep timer
-            self.idle_timeout = self.config.get('sleep_timer', 30)
-            logger.info(f"Updated sleep timer to {self.idle_timeout}")
-            
-            # Update display mode
-            if self.display_manager:
-                display_mode = self.config.get('display_mode', 'bubble')
-                self.display_manager.initialize(display_mode)
-            
-            # Update voice assistant with new config
-            if hasattr(self, 'voice_assistant') and self.voice_assistant:
-                self.voice_assistant.reload_config()
-                
-            # Reschedule random actions with new settings
-            self.schedule_next_random_action()
+            logger.info("Settings dialog accepted")
     
-    def load_config(self):
-        """Load configuration from config.json"""
-        config_path = get_resource_path('config.json')
-        default_config = {
-            'voice_type': 'Azure Voice',
-            'voice_name': 'en-US-AnaNeural',
-            'sleep_timer': 30,
-            'personality_preset': 'ova',
-            'display_mode': 'bubble'
-        }
-        
-        try:
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Error loading config: {e}")
-        
-        return default_config
+    def on_sleep_timer_changed(self, changes):
+        self.idle_timeout = changes['sleep_timer']
+        logger.info(f"Updated sleep timer to {self.idle_timeout}")
+    
+    def on_random_actions_changed(self, changes):
+        self.random_action_timer.stop()
+        self.schedule_next_random_action()
+    
+    def on_display_mode_changed(self, changes):
+        if self.display_manager:
+            self.display_manager.change_mode(changes['display_mode'])
+    
+    def on_conversation_changed(self, changes):
+        # The voice assistant subscribed first, so its history is already reloaded
+        self.sync_chat_history()
 
     def check_idle(self):
         """Check if Ova has been idle for too long"""
@@ -813,13 +948,10 @@ class OwlPet(QWidget):
             return
             
         # Don't sleep if currently speaking
-        if hasattr(self, 'tts_engine') and self.tts_engine.is_speaking:
+        if self.tts_engine and self.tts_engine.is_speaking:
             return
             
-        # Get sleep timer from config, default to 30 seconds
-        sleep_timer = self.config.get('sleep_timer', 30)
-            
-        if time.time() - self.last_active > sleep_timer:
+        if time.time() - self.last_active > self.idle_timeout:
             self.state_change_signal.emit("falling_asleep")
 
     def fall_asleep(self):
@@ -848,64 +980,55 @@ class OwlPet(QWidget):
         current_frame = self.get_current_frame()
         if current_frame:
             painter.drawPixmap(self.rect(), current_frame)
+            self.startup.mark_first_frame()
 
-    def start_listening(self):
+    def start_listening(self, trace_id=None):
         """Start listening animation in GUI thread"""
         print("Starting listening animation")
+        if trace_id:
+            self.current_trace_id = trace_id
         self.state_change_signal.emit("listening")
         self.reset_idle_timer()
 
-    def stop_listening(self):
+    def stop_listening(self, trace_id=None):
         """Stop listening animation in GUI thread"""
         print("Stopping listening animation")
         if self.current_state == "listening":
             self.state_change_signal.emit("idle")
             self.reset_idle_timer()
+        self.tracer.event(trace_id or self.current_trace_id, 'no_response')
+        self.current_trace_id = None
 
     def screech(self):
         """Play a random screech sound and animate"""
         try:
-            # Get list of screech sound files
-            screech_dir = get_resource_path(os.path.join('assets', 'sounds', 'screeches'))
-            screech_files = glob.glob(os.path.join(screech_dir, '*.mp3'))
+            # Empty until the sound bank has been decoded
+            screeches = self.audio.group('screech') if self.audio else []
             
-            if screech_files:
-                # Choose random screech
-                screech_file = random.choice(screech_files)
-                
-                # Load and play the sound
-                sound = pygame.mixer.Sound(screech_file)
-                
+            if screeches:
                 # Start speaking animation
                 self.state_change_signal.emit("speaking")
                 
-                # Play the sound
-                channel = sound.play()
-                
-                # Create a timer to check when sound is done
-                check_timer = QTimer(self)
-                check_timer.timeout.connect(lambda: self.check_screech_done(channel))
-                check_timer.start(100)  # Check every 100ms
+                # Play a random preloaded screech, back to idle when it ends
+                from audio_engine import EFFECTS
+                self.audio.play(random.choice(screeches), EFFECTS, on_finished=self.on_screech_done)
                 
         except Exception as e:
             print(f"Error playing screech: {e}")
             self.state_change_signal.emit("idle")
     
-    def check_screech_done(self, channel):
-        """Check if screech sound is finished playing"""
-        if not channel.get_busy():
-            # Sound is done, stop the timer
-            self.sender().stop()
-            # Return to idle
+    def on_screech_done(self):
+        """Return to idle once the screech sound has finished"""
+        if self.current_state == "speaking":
             self.state_change_signal.emit("idle")
 
     def schedule_next_random_action(self):
         """Schedule the next random action based on config settings"""
-        if not self.config.get('enable_random_actions', True):
+        if not self.config.get('enable_random_actions'):
             return
             
-        min_interval = self.config.get('min_action_interval', 5)
-        max_interval = self.config.get('max_action_interval', 10)
+        min_interval = self.config.get('min_action_interval')
+        max_interval = max(min_interval, self.config.get('max_action_interval'))
         
         # Convert to milliseconds
         interval = random.randint(min_interval * 1000, max_interval * 1000)
@@ -925,7 +1048,7 @@ class OwlPet(QWidget):
             return
             
         # Get enabled actions
-        enabled_actions = self.config.get('enabled_actions', {})
+        enabled_actions = self.config.get('enabled_actions')
         available_actions = [
             action for action, enabled in enabled_actions.items()
             if enabled
@@ -949,7 +1072,15 @@ class OwlPet(QWidget):
         self.schedule_next_random_action()
 
 if __name__ == '__main__':
+    # Logging is configured here only; importing a module never changes it
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)  # Keep running when window is closed
+    # Write settings and history still waiting to be saved before exiting
+    app.aboutToQuit.connect(get_persistent_writer().close)
     pet = OwlPet()
+    if os.environ.get('OVA_STARTUP_CHECK'):
+        # Started by helpers/startup_check.py: quit once startup has been measured
+        pet.startup.finished.connect(lambda report: app.quit())
+        QTimer.singleShot(CHECK_TIMEOUT_MS, lambda: (pet.startup.save(), app.quit()))
     sys.exit(app.exec_())
@@ -1,27 +1,338 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QScrollArea, QLabel, QFrame
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QListView, QFrame, QStyledItemDelegate,
+                             QAbstractItemView, QMenu, QApplication, QStyle)
+from PyQt5.QtCore import Qt, QTimer, QSize, QRect, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPainterPath
+import json
+import tempfile
+import threading
 import logging
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class ChatTranscript:
+    """Every message shown this session, kept in a temporary file instead of memory
+
+    Messages are addressed by position; older history can be added in front of
+    the live messages with prepend().
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile(mode='w+b')
+        self._offsets = []  # File offset of each message, in display order
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def _write(self, text, is_user):
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        self._file.write(json.dumps([text, is_user]).encode('utf-8') + b'\n')
+        return offset
+
+    def append(self, text, is_user):
+        """Add a message at the end, returns its position"""
+        self._offsets.append(self._write(text, is_user))
+        return len(self._offsets) - 1
+
+    def prepend(self, messages):
+        """Add (text, is_user) messages, in chronological order, before all others"""
+        self._offsets[:0] = [self._write(text, is_user) for text, is_user in messages]
+
+    def replace_last(self, text, is_user):
+        """Replace the newest message (e.g. while it is still being streamed)"""
+        self._offsets[-1] = self._write(text, is_user)
+
+    def read(self, start, end):
+        """Messages in positions start..end-1 as (text, is_user)"""
+        messages = []
+        for offset in self._offsets[start:end]:
+            self._file.seek(offset)
+            text, is_user = json.loads(self._file.readline().decode('utf-8'))
+            messages.append((text, is_user))
+        return messages
+
+    def clear(self):
+        self._file.seek(0)
+        self._file.truncate()
+        self._offsets = []
+
+class ChatModel(QAbstractListModel):
+    """A window of at most max_messages rows over the session transcript
+
+    New messages are appended at the bottom, dropping the oldest rows once the
+    cap is reached; load_older() pages earlier messages back in at the top.
+    """
+    IsUserRole = Qt.UserRole + 1
+
+    def __init__(self, max_messages=200, page_size=50, parent=None):
+        super().__init__(parent)
+        self.transcript = ChatTranscript()
+        self.max_messages = max_messages
+        self.page_size = page_size
+        self._start = 0   # Transcript position of the first row
+        self._rows = []   # (text, is_user)
+        self._streaming = None  # Text of the newest message while it is streamed, not yet in the transcript
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        text, is_user = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return text
+        if role == self.IsUserRole:
+            return is_user
+        return None
+
+    @property
+    def start(self):
+        """Transcript position of the first loaded row"""
+        return self._start
+
+    @property
+    def at_end(self):
+        """True if the newest message is loaded"""
+        return self._start + len(self._rows) == len(self.transcript)
+
+    def can_load_older(self):
+        return self._start > 0
+
+    def add_message(self, text, is_user=False):
+        """Append a message, keeping at most max_messages rows"""
+        showing_end = self.at_end
+        self._save_streaming()
+        position = self.transcript.append(text, is_user)
+        if not showing_end:
+            # Scrolled back into older pages: jump to the newest messages
+            self._show_latest()
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows))
+        self._rows.append((text, is_user))
+        self.endInsertRows()
+        if len(self._rows) > self.max_messages:
+            self._drop_top(len(self._rows) - self.max_messages)
+
+    def prepend_history(self, messages):
+        """Add (text, is_user) messages, in chronological order, before everything else
+        
+        As many as fit under the cap are shown straight away if the window
+        reaches back to the oldest message; the rest page in on scroll.
+        """
+        count = len(messages)
+        if not count:
+            return 0
+        self.transcript.prepend(messages)
+        if self._start > 0:
+            self._start += count
+            return 0
+        room = self.max_messages - len(self._rows)
+        shown = messages[-room:] if room > 0 else []
+        self._start = count - len(shown)
+        if shown:
+            self.beginInsertRows(QModelIndex(), 0, len(shown) - 1)
+            self._rows[:0] = shown
+            self.endInsertRows()
+        return len(shown)
+
+    def update_last(self, text, final=True):
+        """Replace the text of the newest message, returns its row if it is loaded
+        
+        With final=False the text is only kept in memory, so a message streamed
+        in many small updates is written to the transcript once, when it is final.
+        """
+        if not len(self.transcript):
+            return None
+        loaded = self.at_end and bool(self._rows)
+        if final:
+            self._streaming = None
+            self.transcript.replace_last(text, self._last_is_user())
+        else:
+            self._streaming = text
+        if not loaded:
+            return None
+        row = len(self._rows) - 1
+        self._rows[row] = (text, self._rows[row][1])
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+        return row
+
+    def _last_is_user(self):
+        if self.at_end and self._rows:
+            return self._rows[-1][1]
+        return self.transcript.read(len(self.transcript) - 1, len(self.transcript))[0][1]
+
+    def _save_streaming(self):
+        """Write a message still being streamed to the transcript"""
+        if self._streaming is not None:
+            self.update_last(self._streaming)
+
+    def _read(self, start, end):
+        """Transcript messages start..end-1, with the newest one as far as it has streamed"""
+        messages = self.transcript.read(start, end)
+        if self._streaming is not None and messages and end >= len(self.transcript):
+            messages[-1] = (self._streaming, messages[-1][1])
+        return messages
+
+    def _show_latest(self):
+        self.beginResetModel()
+        self._start = max(0, len(self.transcript) - self.page_size)
+        self._rows = self._read(self._start, len(self.transcript))
+        self.endResetModel()
+
+    def _drop_top(self, count):
+        self.beginRemoveRows(QModelIndex(), 0, count - 1)
+        del self._rows[:count]
+        self._start += count
+        self.endRemoveRows()
+
+    def load_older(self):
+        """Page the previous messages in at the top, returns how many were added"""
+        count = min(self.page_size, self._start)
+        if not count:
+            return 0
+        older = self._read(self._start - count, self._start)
+        self.beginInsertRows(QModelIndex(), 0, count - 1)
+        self._rows[:0] = older
+        self._start -= count
+        self.endInsertRows()
+        # Stay under the cap by letting go of the newest rows; they page back in on demand
+        excess = len(self._rows) - self.max_messages
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), len(self._rows) - excess, len(self._rows) - 1)
+            del self._rows[-excess:]
+            self.endRemoveRows()
+        return count
+
+    def load_newer(self):
+        """Page later messages back in at the bottom, returns how many were added"""
+        end = self._start + len(self._rows)
+        count = min(self.page_size, len(self.transcript) - end)
+        if not count:
+            return 0
+        newer = self._read(end, end + count)
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + count - 1)
+        self._rows.extend(newer)
+        self.endInsertRows()
+        excess = len(self._rows) - self.max_messages
+        if excess > 0:
+            self._drop_top(excess)
+        return count
+
+    def clear(self):
+        self.beginResetModel()
+        self.transcript.clear()
+        self._streaming = None
+        self._rows = []
+        self._start = 0
+        self.endResetModel()
+
+class MessageDelegate(QStyledItemDelegate):
+    """Paints a sender line and a rounded message bubble; sizes are cached per width"""
+
+    PADDING = 10
+    SIDE_MARGIN = 50    # Space left on the opposite side of each bubble
+    SPACING = 15        # Gap between messages
+    SENDER_HEIGHT = 18
+    USER_BACKGROUND = QColor(240, 240, 240, 242)
+    OVA_BACKGROUND = QColor(220, 240, 255, 242)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sender_font = QFont("Segoe UI")
+        self.sender_font.setPixelSize(11)
+        self.sender_font.setBold(True)
+        self.user_font = QFont("Segoe UI")
+        self.user_font.setPixelSize(12)
+        self.ova_font = QFont("Segoe UI")
+        self.ova_font.setPixelSize(13)
+        self._size_cache = {}
+
+    def _text_rect(self, text, is_user, width):
+        """Bounding rect of the wrapped message text for a row width (cached)"""
+        key = (text, is_user, width)
+        rect = self._size_cache.get(key)
+        if rect is None:
+            text_width = max(50, width - self.SIDE_MARGIN - 2 * self.PADDING)
+            metrics = QFontMetrics(self.user_font if is_user else self.ova_font)
+            rect = metrics.boundingRect(QRect(0, 0, text_width, 100000), Qt.TextWordWrap, text)
+            if len(self._size_cache) > 2000:
+                self._size_cache.clear()
+            self._size_cache[key] = rect
+        return rect
+
+    def sizeHint(self, option, index):
+        text = index.data(Qt.DisplayRole) or ""
+        is_user = index.data(ChatModel.IsUserRole)
+        rect = self._text_rect(text, is_user, option.rect.width())
+        return QSize(option.rect.width(), self.SENDER_HEIGHT + rect.height() + 2 * self.PADDING + self.SPACING)
+
+    def paint(self, painter, option, index):
+        text = index.data(Qt.DisplayRole) or ""
+        is_user = index.data(ChatModel.IsUserRole)
+        area = option.rect
+        text_rect = self._text_rect(text, is_user, area.width())
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Sender line
+        painter.setFont(self.sender_font)
+        painter.setPen(QColor('#666666'))
+        painter.drawText(QRect(area.left() + self.PADDING, area.top(), area.width(), self.SENDER_HEIGHT),
+                         Qt.AlignLeft | Qt.AlignVCenter, "You:" if is_user else "Ova:")
+
+        # Bubble, offset from the side the other speaker uses
+        bubble_left = area.left() + (0 if is_user else self.SIDE_MARGIN)
+        bubble_width = area.width() - self.SIDE_MARGIN
+        bubble_height = text_rect.height() + 2 * self.PADDING
+        bubble = QRect(bubble_left, area.top() + self.SENDER_HEIGHT, bubble_width, bubble_height)
+        path = QPainterPath()
+        path.addRoundedRect(bubble.x(), bubble.y(), bubble.width(), bubble.height(), 10, 10)
+        background = self.USER_BACKGROUND if is_user else self.OVA_BACKGROUND
+        if option.state & QStyle.State_Selected:
+            background = background.darker(108)
+        painter.fillPath(path, background)
+
+        # Message text
+        painter.setFont(self.user_font if is_user else self.ova_font)
+        painter.setPen(QColor('#333333'))
+        painter.drawText(bubble.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING),
+                         Qt.TextWordWrap, text)
+        painter.restore()
+
 class ChatDisplay(QWidget):
-    """A scrollable chat window that shows the conversation history"""
-    
+    """A scrollable chat window that shows the conversation history
+
+    Messages live in a ChatModel and are painted by a MessageDelegate, so only
+    the visible rows cost anything to draw no matter how long the session runs.
+    """
+
+    LOAD_OLDER_THRESHOLD = 40  # Pixels from the top that trigger paging in older messages
+    HISTORY_PAGE_SIZE = 50
+
+    # (generation, messages) pages of stored history, newest page first
+    history_page = pyqtSignal(int, object)
+
     def __init__(self, parent=None):
         super().__init__(None)  # Set parent to None to make it a separate window
         self.owner = parent  # Keep reference to owner for positioning
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
+        self.model = ChatModel(parent=self)
+        self.streaming_text = None  # Text of the message being streamed in, if any
+        self.history_generation = 0  # Bumped whenever a new prefill replaces the last one
+        self.history_page.connect(self.on_history_page)
         self.setup_ui()
-        
+
     def setup_ui(self):
         # Create main layout
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
-        
+
         # Create main content widget
         self.content = QWidget(self)
         self.content.setStyleSheet("""
@@ -31,18 +342,25 @@ class ChatDisplay(QWidget):
             }
         """)
         layout.addWidget(self.content)
-        
+
         # Create content layout
         content_layout = QVBoxLayout(self.content)
         content_layout.setContentsMargins(15, 15, 15, 15)
-        content_layout.setSpacing(15)  # Add spacing between messages
-        
-        # Create scroll area
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setFrameShape(QFrame.NoFrame)
-        scroll.setStyleSheet("""
-            QScrollArea {
+
+        # Create message list
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.delegate = MessageDelegate(self.list_view)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.setFrameShape(QFrame.NoFrame)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.list_view.setResizeMode(QListView.Adjust)
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self.show_context_menu)
+        self.list_view.setStyleSheet("""
+            QListView {
                 border: none;
                 background: transparent;
             }
@@ -66,81 +384,117 @@ class ChatDisplay(QWidget):
                 background: none;
             }
         """)
-        content_layout.addWidget(scroll)
-        
-        # Create message container
-        self.message_container = QWidget()
-        self.message_container.setStyleSheet("""
-            QWidget {
-                background: transparent;
-            }
-        """)
-        self.messages_layout = QVBoxLayout(self.message_container)
-        self.messages_layout.setContentsMargins(0, 0, 0, 0)
-        self.messages_layout.setSpacing(15)  # Add spacing between messages
-        self.messages_layout.addStretch()
-        scroll.setWidget(self.message_container)
-        
-    def create_message_label(self, text, is_user=False):
-        """Create a styled message label"""
-        container = QWidget()
-        layout = QVBoxLayout(container)
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Add sender label
-        sender = QLabel("You:" if is_user else "Ova:")
-        sender.setStyleSheet("""
-            QLabel {
-                color: #666666;
-                font-family: Segoe UI;
-                font-size: 11px;
-                font-weight: bold;
-                padding: 0px 10px;
-            }
-        """)
-        sender.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        layout.addWidget(sender)
-        
-        # Add message label
-        message = QLabel(text)
-        message.setWordWrap(True)
-        message.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        message.setStyleSheet(f"""
-            QLabel {{
-                background-color: {'rgba(240, 240, 240, 0.95)' if is_user else 'rgba(220, 240, 255, 0.95)'};
-                border-radius: 10px;
-                padding: 10px;
-                font-family: Segoe UI;
-                font-size: {'12px' if is_user else '13px'};
-                color: #333333;
-                margin-{'right' if is_user else 'left'}: 50px;
-            }}
-        """)
-        layout.addWidget(message)
-        
-        return container
-        
+        self.list_view.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        content_layout.addWidget(self.list_view)
+
     def add_message(self, text, is_user=False):
         """Add a message to the chat window"""
-        # Create message widget
-        message = self.create_message_label(text, is_user)
-        
-        # Insert message before the stretch
-        self.messages_layout.insertWidget(self.messages_layout.count() - 1, message)
-        
-        # Scroll to bottom
-        QTimer.singleShot(100, self.scroll_to_bottom)
-        
+        self.model.add_message(text, is_user)
+
+        # Scroll to bottom once the new row has been laid out
+        QTimer.singleShot(0, self.scroll_to_bottom)
+
+    def begin_message(self):
+        """Start an Ova message that is filled in by append_text()"""
+        self.streaming_text = ""
+        self.add_message("", is_user=False)
+
+    def append_text(self, text):
+        """Add streamed text to the message started by begin_message()"""
+        if self.streaming_text is None:
+            self.begin_message()
+        scrollbar = self.list_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - self.LOAD_OLDER_THRESHOLD
+        self.streaming_text += text
+        row = self.model.update_last(self.streaming_text, final=False)
+        if row is not None:
+            # Row heights are cached by the view until the delegate says otherwise
+            self.delegate.sizeHintChanged.emit(self.model.index(row))
+            if at_bottom:
+                QTimer.singleShot(0, self.scroll_to_bottom)
+
+    def finish_message(self, text=None):
+        """End the streamed message, replacing its text with text if given"""
+        if self.streaming_text is None:
+            return
+        changed = text is not None and text != self.streaming_text
+        # The streamed text has only been kept in memory; write the final text once
+        row = self.model.update_last(text if changed else self.streaming_text)
+        if changed and row is not None:
+            self.delegate.sizeHintChanged.emit(self.model.index(row))
+            QTimer.singleShot(0, self.scroll_to_bottom)
+        self.streaming_text = None
+
     def scroll_to_bottom(self):
         """Scroll to the bottom of the chat"""
-        scroll = self.findChild(QScrollArea)
-        if scroll:
-            vsb = scroll.verticalScrollBar()
-            vsb.setValue(vsb.maximum())
-                
+        self.list_view.scrollToBottom()
+
+    def on_scroll(self, value):
+        """Page messages in as the view nears either end of what is loaded"""
+        scrollbar = self.list_view.verticalScrollBar()
+        if value <= self.LOAD_OLDER_THRESHOLD and self.model.can_load_older():
+            # Keep the message at the top of the view in place while rows are inserted above it
+            anchor = self.list_view.indexAt(self.list_view.viewport().rect().topLeft()).row()
+            added = self.model.load_older()
+            if added and anchor >= 0:
+                self.list_view.scrollTo(self.model.index(anchor + added), QAbstractItemView.PositionAtTop)
+        elif value >= scrollbar.maximum() - self.LOAD_OLDER_THRESHOLD and not self.model.at_end:
+            # Same for newer messages; rows dropped from the top shift the anchor up
+            anchor = self.list_view.indexAt(self.list_view.viewport().rect().bottomLeft()).row()
+            start = self.model.start
+            self.model.load_newer()
+            if anchor >= 0:
+                row = anchor - (self.model.start - start)
+                self.list_view.scrollTo(self.model.index(max(0, row)), QAbstractItemView.PositionAtBottom)
+
+    def prefill(self, path):
+        """Replace the chat with the conversation stored at path, loaded in the background"""
+        self.clear_history()
+        self.history_generation += 1
+        threading.Thread(target=self._load_history, args=(path, self.history_generation), daemon=True).start()
+
+    def _load_history(self, path, generation):
+        """Read the conversation file and hand it to the GUI thread a page at a time"""
+        try:
+            with open(path, 'r') as f:
+                history = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading chat history from {path}: {e}")
+            return
+        messages = [(msg.get('content', ''), msg.get('role') == 'user') for msg in history
+                    if isinstance(msg, dict) and msg.get('role') in ('user', 'assistant')]
+        logger.info(f"Prefilling chat with {len(messages)} messages from {path}")
+        for end in range(len(messages), 0, -self.HISTORY_PAGE_SIZE):
+            if generation != self.history_generation:
+                return
+            self.history_page.emit(generation, messages[max(0, end - self.HISTORY_PAGE_SIZE):end])
+
+    def on_history_page(self, generation, messages):
+        """Add a page of stored history above the messages already shown"""
+        if generation != self.history_generation:
+            return
+        scrollbar = self.list_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - self.LOAD_OLDER_THRESHOLD
+        anchor = self.list_view.indexAt(self.list_view.viewport().rect().topLeft()).row()
+        added = self.model.prepend_history(messages)
+        if at_bottom:
+            QTimer.singleShot(0, self.scroll_to_bottom)
+        elif added and anchor >= 0:
+            # Keep the message being read in place
+            self.list_view.scrollTo(self.model.index(anchor + added), QAbstractItemView.PositionAtTop)
+
+    def show_context_menu(self, position):
+        """Offer to copy the message under the cursor"""
+        index = self.list_view.indexAt(position)
+        if not index.isValid():
+            return
+        menu = QMenu(self)
+        copy_action = menu.addAction("Copy")
+        if menu.exec_(self.list_view.viewport().mapToGlobal(position)) == copy_action:
+            QApplication.clipboard().setText(index.data(Qt.DisplayRole))
+
     def clear_history(self):
         """Clear all messages from the chat"""
-        while self.messages_layout.count() > 1:  # Keep the stretch
-            item = self.messages_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
\ No newline at end of file
+        self.history_generation += 1  # Drop pages still on their way
+        self.streaming_text = None
+        self.model.clear()
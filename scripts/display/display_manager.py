@@ -1,10 +1,12 @@
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
 from .chat_display import ChatDisplay
 from .speech_bubble import SpeechBubble
+from persistence import get_persistent_writer
+import os
 import logging
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class DisplayManager:
@@ -16,12 +18,27 @@ class DisplayManager:
         "chat": "Chat Window"
     }
     
+    # Streamed text is applied at most once per frame
+    FRAME_MS = 16
+    
     def __init__(self, parent=None):
         self.parent = parent
         self.current_mode = "bubble"  # Default mode
         self.chat_display = None
         self.speech_bubble = None
         
+        # Text appended since the last frame
+        self.streaming = False
+        self.pending_text = ""
+        self.frame_timer = QTimer()
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(self.FRAME_MS)
+        self.frame_timer.timeout.connect(self._flush_pending)
+        
+        # Stored conversation shown in the chat window
+        self.history_path = None
+        self.prefilled = None  # (path, modification time) of the last prefill
+        
     def initialize(self, mode="bubble"):
         """Initialize display with specified mode"""
         self.current_mode = mode
@@ -39,6 +56,7 @@ class DisplayManager:
                 # Position at left edge with some margin
                 self.chat_display.move(20, 50)
             self.chat_display.show()
+            self._prefill_chat()
             if self.speech_bubble:
                 self.speech_bubble.hide()
                 
@@ -62,13 +80,20 @@ class DisplayManager:
         text = message_data[0] if isinstance(message_data, tuple) else message_data
         user_text = message_data[1] if isinstance(message_data, tuple) else user_text
         
+        # The full response replaces whatever was streamed in for it
+        streamed = self.streaming
+        self._end_stream()
+        
         if self.current_mode == "chat":
             if not self.chat_display:
                 self.initialize("chat")
-            if user_text:
-                self.chat_display.add_message(user_text, is_user=True)
-            if text:  # Only add non-empty messages
-                self.chat_display.add_message(text, is_user=False)
+            if streamed:
+                self.chat_display.finish_message(text)
+            else:
+                if user_text:
+                    self.chat_display.add_message(user_text, is_user=True)
+                if text:  # Only add non-empty messages
+                    self.chat_display.add_message(text, is_user=False)
             
         elif self.current_mode == "bubble":
             if not self.speech_bubble:
@@ -80,6 +105,63 @@ class DisplayManager:
                     self.parent.update_speech_bubble_position()
                 self.speech_bubble.show()
     
+    def append_text(self, text, user_text=""):
+        """Add a piece of a response that is still being generated
+        
+        Pieces are buffered and applied once per frame; the first one starts a
+        new message and show_message() later replaces it with the full text.
+        """
+        if self.current_mode not in ("chat", "bubble") or not text:
+            return
+        if not self.streaming:
+            self.streaming = True
+            self._begin_stream(user_text)
+        self.pending_text += text
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+    
+    def _begin_stream(self, user_text):
+        if self.current_mode == "chat":
+            if not self.chat_display:
+                self.initialize("chat")
+            if user_text:
+                self.chat_display.add_message(user_text, is_user=True)
+            self.chat_display.begin_message()
+        else:
+            if not self.speech_bubble:
+                self.initialize("bubble")
+            self.speech_bubble.begin_stream(user_text)
+    
+    def _flush_pending(self):
+        """Apply the text appended since the last frame"""
+        text, self.pending_text = self.pending_text, ""
+        if not text or not self.streaming:
+            return
+        if self.current_mode == "chat" and self.chat_display:
+            self.chat_display.append_text(text)
+        elif self.current_mode == "bubble" and self.speech_bubble:
+            resized = self.speech_bubble.append_text(text)
+            # Only move the bubble when it actually grew
+            if resized or not self.speech_bubble.isVisible():
+                if hasattr(self.parent, 'update_speech_bubble_position'):
+                    self.parent.update_speech_bubble_position()
+                self.speech_bubble.show()
+    
+    def _end_stream(self):
+        """Stop streaming, dropping text not yet applied"""
+        self.frame_timer.stop()
+        self.pending_text = ""
+        self.streaming = False
+    
+    def cancel_pending(self):
+        """Discard any display update belonging to an interrupted interaction"""
+        if self.streaming and self.chat_display:
+            # Keep what was already shown of the interrupted answer
+            self.chat_display.finish_message()
+        self._end_stream()
+        if self.speech_bubble:
+            self.speech_bubble.hide()
+    
     def hide_all(self):
         """Hide all displays"""
         if self.speech_bubble:
@@ -99,6 +181,31 @@ class DisplayManager:
             self.initialize("chat")
         return self.chat_display
     
+    def load_history(self, path):
+        """Show the stored conversation at path in the chat window
+        
+        The file is read in the background; if the chat window is not in use it
+        is filled the next time it opens.
+        """
+        self.history_path = path
+        if self.current_mode == "chat" and self.chat_display:
+            self._prefill_chat()
+    
+    def _prefill_chat(self):
+        if not self.history_path:
+            return
+        # Read the conversation as it will be on disk, not before a pending save
+        get_persistent_writer().flush(self.history_path)
+        try:
+            key = (self.history_path, os.path.getmtime(self.history_path))
+        except OSError:
+            key = (self.history_path, None)
+        if key == self.prefilled:
+            return
+        self.prefilled = key
+        self._end_stream()
+        self.chat_display.prefill(self.history_path)
+    
     def clear_history(self):
         """Clear chat history"""
         if self.chat_display:
@@ -108,6 +215,7 @@ class DisplayManager:
         """Change display mode"""
         if mode in self.DISPLAY_MODES:
             logger.info(f"Changing display mode to: {mode}")
+            self.cancel_pending()
             self.initialize(mode)
         else:
             logger.error(f"Invalid display mode: {mode}")
\ No newline at end of file
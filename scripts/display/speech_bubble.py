@@ -1,178 +1,271 @@
-from PyQt5.QtWidgets import QLabel, QVBoxLayout, QFrame, QWidget, QSizePolicy, QPushButton, QHBoxLayout
-from PyQt5.QtCore import Qt, QTimer, QSize
-from PyQt5.QtGui import QFontDatabase
+from PyQt5.QtWidgets import QWidget, QMenu, QApplication
+from PyQt5.QtCore import Qt, QTimer, QSize, QRectF, QPointF
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QPainter, QPainterPath, QTextLayout, QTextOption
+from collections import OrderedDict
+from resources import get_font_registry
 import logging
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class TextBlock:
+    """Word-wrapped text laid out once, then painted as often as needed"""
+
+    def __init__(self, text, font, max_width, line_spacing=1.0):
+        # QTextLayout only breaks lines on the unicode line separator
+        self.layout = QTextLayout(text.replace('\n', '\u2028'), font)
+        option = QTextOption()
+        option.setWrapMode(QTextOption.WrapAtWordBoundaryOrAnywhere)
+        self.layout.setTextOption(option)
+        line_height = QFontMetricsF(font).height() * line_spacing
+        width = 0.0
+        y = 0.0
+        self.layout.beginLayout()
+        while True:
+            line = self.layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(max_width)
+            line.setPosition(QPointF(0, y + (line_height - line.height()) / 2))
+            width = max(width, line.naturalTextWidth())
+            y += line_height
+        self.layout.endLayout()
+        self.width = width
+        self.height = y
+
+    def draw(self, painter, x, y):
+        self.layout.draw(painter, QPointF(x, y))
+
 class SpeechBubble(QWidget):
-    """A floating speech bubble that appears near the Ova pet"""
-    
+    """A floating speech bubble that appears near the Ova pet
+
+    The bubble paints its own background, close button and text. Text layouts
+    are cached, so re-showing or rapidly updating the text only lays out what
+    actually changed and never relayouts child widgets.
+    """
+
+    MIN_WIDTH = 250
+    MIN_HEIGHT = 100
+    MAX_TEXT_WIDTH = 420
+    MAX_SIZE = 1200
+    MARGIN_X = 15
+    MARGIN_Y = 10
+    SPACING = 4
+    RADIUS = 15
+    CLOSE_SIZE = 16
+    USER_TEXT_HEIGHT = 25
+    GROWTH_STEP = 40   # While streaming the bubble grows by whole steps and never shrinks
+    LAYOUT_CACHE_SIZE = 32
+
+    BACKGROUND = QColor(255, 255, 255, 242)
+    USER_COLOR = QColor('#666666')
+    TEXT_COLOR = QColor('#333333')
+    DIVIDER_COLOR = QColor('#cccccc')
+    CLOSE_COLOR = QColor('#ff4444')
+    CLOSE_HOVER_COLOR = QColor('#ff0000')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
-        
-        # Load Roboto font if available, otherwise fallback to system sans-serif
-        font_id = QFontDatabase.addApplicationFont("assets/fonts/Roboto-Regular.ttf")
-        if font_id != -1:
-            self.font_family = QFontDatabase.applicationFontFamilies(font_id)[0]
-        else:
-            self.font_family = "Segoe UI"  # Modern Windows default
-            
-        self.setup_ui()
+        self.setMouseTracking(True)
+
+        # Roboto if it could be registered, otherwise the system sans-serif
+        self.font_family = get_font_registry().family()
+        self.user_font = QFont(self.font_family)
+        self.user_font.setPixelSize(11)
+        self.user_font.setItalic(True)
+        self.response_font = QFont(self.font_family)
+        self.response_font.setPixelSize(14)
+        self.close_font = QFont(self.font_family)
+        self.close_font.setPixelSize(16)
+        self.close_font.setBold(True)
+
+        self.text = ""
+        self.last_text = ""
+        self.streaming = False
+        self.response_block = None
+        self.user_block = None
+        self.close_hovered = False
+        self._layouts = OrderedDict()  # (text, is_user) -> TextBlock
+        self._size = QSize(self.MIN_WIDTH, self.MIN_HEIGHT)
+
+        self.setMinimumSize(QSize(self.MIN_WIDTH, self.MIN_HEIGHT))
+        self.setMaximumSize(QSize(self.MAX_SIZE, self.MAX_SIZE))
+        self.resize(self._size)
         self.hide_timer = None
-        
-    def setup_ui(self):
-        # Set size policy
-        self.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
-        
-        # Create main layout
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(0)
-        
-        # Create main content widget
-        self.content = QWidget(self)
-        self.content.setStyleSheet("""
-            QWidget {
-                background-color: rgba(255, 255, 255, 0.95);
-                border-radius: 15px;
-            }
-        """)
-        self.content.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
-        layout.addWidget(self.content)
-        
-        # Create content layout
-        content_layout = QVBoxLayout(self.content)
-        content_layout.setContentsMargins(15, 10, 15, 10)
-        content_layout.setSpacing(4)
-        
-        # Create top row with user text and close button
-        top_row = QHBoxLayout()
-        
-        # Create labels for user text and response
-        self.user_label = QLabel()
-        self.user_label.setStyleSheet(f"""
-            QLabel {{
-                color: #666;
-                font-family: "{self.font_family}";
-                font-size: 11px;
-                font-style: italic;
-                background: transparent;
-                border: none;
-                padding: 0;
-                margin: 0;
-                max-height: 25px;
-            }}
-        """)
-        self.user_label.setWordWrap(True)
-        self.user_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        self.user_label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Minimum)
-        top_row.addWidget(self.user_label)
-        
-        # Add close button
-        self.close_button = QPushButton("×")
-        self.close_button.setFixedSize(16, 16)
-        self.close_button.setStyleSheet("""
-            QPushButton {
-                color: #ff4444;
-                background: transparent;
-                border: none;
-                font-size: 16px;
-                font-weight: bold;
-                padding: 0;
-                margin: 0;
-            }
-            QPushButton:hover {
-                color: #ff0000;
-            }
-        """)
-        self.close_button.clicked.connect(self.hide)
-        top_row.addWidget(self.close_button)
-        
-        content_layout.addLayout(top_row)
-        
-        # Create divider
-        self.divider = QFrame()
-        self.divider.setFrameShape(QFrame.HLine)
-        self.divider.setStyleSheet("""
-            background-color: #ccc;
-            margin: 5px 0 1px 0;
-        """)
-        self.divider.setFixedHeight(1)
-        content_layout.addWidget(self.divider)
-        
-        # Create response label
-        self.response_label = QLabel()
-        self.response_label.setStyleSheet(f"""
-            QLabel {{
-                color: #333;
-                font-family: "{self.font_family}";
-                font-size: 14px;
-                line-height: 1.4;
-                background: transparent;
-                border: none;
-                padding: 0;
-                margin: 0;
-            }}
-        """)
-        self.response_label.setWordWrap(True)
-        self.response_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        self.response_label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Minimum)
-        content_layout.addWidget(self.response_label)
-        
-        # Set size constraints
-        self.setMinimumSize(QSize(250, 100))
-        self.setMaximumSize(QSize(1200, 1200))
-        
+
+    def _block(self, text, is_user, cache=True):
+        """Cached layout for text, in the user or response style"""
+        key = (text, is_user)
+        block = self._layouts.get(key)
+        if block is None:
+            if is_user:
+                block = TextBlock(text, self.user_font, self.MAX_TEXT_WIDTH)
+            else:
+                block = TextBlock(text, self.response_font, self.MAX_TEXT_WIDTH, line_spacing=1.4)
+            if not cache:
+                # Partial streamed text is never shown twice
+                return block
+            self._layouts[key] = block
+            if len(self._layouts) > self.LAYOUT_CACHE_SIZE:
+                self._layouts.popitem(last=False)
+        else:
+            self._layouts.move_to_end(key)
+        return block
+
+    def _top_row_height(self):
+        if self.user_block:
+            return max(self.CLOSE_SIZE, min(self.user_block.height, self.USER_TEXT_HEIGHT))
+        return self.CLOSE_SIZE
+
+    def _response_top(self):
+        top = self.MARGIN_Y + self._top_row_height() + self.SPACING
+        if self.user_block:
+            # Divider: 5px above, 1px line, 1px below
+            top += 7 + self.SPACING
+        return top
+
+    def _close_rect(self):
+        return QRectF(self.width() - self.MARGIN_X - self.CLOSE_SIZE, self.MARGIN_Y,
+                      self.CLOSE_SIZE, self.CLOSE_SIZE)
+
     def sizeHint(self):
         """Return the recommended size for the widget"""
-        width = max(250, min(self.content.sizeHint().width() + 30, 1200))
-        height = max(100, min(self.content.sizeHint().height() + 30, 1200))
-        return QSize(width, height)
-        
+        return self._size
+
+    def _measure(self):
+        text_width = self.response_block.width if self.response_block else 0
+        if self.user_block:
+            text_width = max(text_width, self.user_block.width + self.CLOSE_SIZE + self.SPACING)
+        response_height = self.response_block.height if self.response_block else 0
+        width = int(text_width + 2 * self.MARGIN_X + 1)
+        height = int(self._response_top() + response_height + self.MARGIN_Y + 1)
+        return QSize(max(self.MIN_WIDTH, min(width, self.MAX_SIZE)),
+                     max(self.MIN_HEIGHT, min(height, self.MAX_SIZE)))
+
     def setText(self, text, last_text=""):
         """Set the text of the speech bubble"""
-        # Update user text if provided
-        if last_text:
-            self.user_label.setText(f"You: {last_text}")
-            self.user_label.show()
-            self.divider.show()
-        else:
-            self.user_label.hide()
-            self.divider.hide()
-        
-        # Update response text
-        self.response_label.setText(text)
-        
+        if text == self.text and last_text == self.last_text and self.response_block and not self.streaming:
+            return
+        self.streaming = False
+        self._apply(text, last_text)
+
+    def begin_stream(self, last_text=""):
+        """Start a response that arrives in pieces through append_text()"""
+        self.streaming = False
+        self._apply("", last_text)
+        self.streaming = True
+
+    def append_text(self, text):
+        """Add streamed text, returns True if the bubble changed size"""
+        if not self.streaming:
+            self.begin_stream(self.last_text)
+        return self._apply(self.text + text, self.last_text)
+
+    def _apply(self, text, last_text):
+        """Lay out text and resize if needed, returns True if the size changed"""
+        self.text = text
+        self.last_text = last_text
+
+        # Lay out only what changed
+        self.user_block = self._block(f"You: {last_text}", True) if last_text else None
+        self.response_block = self._block(text, False, cache=not self.streaming)
+
         # Update size
-        hint = self.sizeHint()
-        self.resize(hint)
-        
+        size = self._measure()
+        if self.streaming:
+            # Grow in steps so the bubble is not resized and moved for every line
+            steps = -(-size.height() // self.GROWTH_STEP)
+            size = QSize(max(size.width(), self._size.width()),
+                         max(min(steps * self.GROWTH_STEP, self.MAX_SIZE), self._size.height()))
+        resized = size != self._size
+        if resized:
+            self._size = size
+            self.resize(size)
+        self.update()
+        return resized
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+
+        # Background
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(self.rect()), self.RADIUS, self.RADIUS)
+        painter.fillPath(path, self.BACKGROUND)
+
+        # User text, clipped to its row
+        if self.user_block:
+            row_width = self.width() - 2 * self.MARGIN_X - self.CLOSE_SIZE - self.SPACING
+            painter.save()
+            painter.setClipRect(QRectF(self.MARGIN_X, self.MARGIN_Y, row_width, self.USER_TEXT_HEIGHT))
+            painter.setPen(self.USER_COLOR)
+            self.user_block.draw(painter, self.MARGIN_X, self.MARGIN_Y)
+            painter.restore()
+
+            divider_y = self.MARGIN_Y + self._top_row_height() + self.SPACING + 5
+            painter.fillRect(QRectF(self.MARGIN_X, divider_y, self.width() - 2 * self.MARGIN_X, 1),
+                             self.DIVIDER_COLOR)
+
+        # Close button
+        painter.setFont(self.close_font)
+        painter.setPen(self.CLOSE_HOVER_COLOR if self.close_hovered else self.CLOSE_COLOR)
+        painter.drawText(self._close_rect(), Qt.AlignCenter, "×")
+
+        # Response
+        if self.response_block:
+            painter.setPen(self.TEXT_COLOR)
+            self.response_block.draw(painter, self.MARGIN_X, self._response_top())
+
+    def mouseMoveEvent(self, event):
+        hovered = self._close_rect().contains(QPointF(event.pos()))
+        if hovered != self.close_hovered:
+            self.close_hovered = hovered
+            self.update(self._close_rect().toAlignedRect())
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        if self.close_hovered:
+            self.close_hovered = False
+            self.update(self._close_rect().toAlignedRect())
+        super().leaveEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self._close_rect().contains(QPointF(event.pos())):
+            self.hide()
+            return
+        super().mousePressEvent(event)
+
+    def contextMenuEvent(self, event):
+        """Offer to copy the response, since the painted text cannot be selected"""
+        menu = QMenu(self)
+        copy_action = menu.addAction("Copy")
+        if menu.exec_(event.globalPos()) == copy_action:
+            QApplication.clipboard().setText(self.text)
+
     def showMessage(self, text, duration=5000):
         """Show the speech bubble with text for a duration"""
         self.setText(text)
         self.show()
-        
+
         # Reset timer if exists
         if self.hide_timer:
             self.hide_timer.stop()
-            
+
         # Start new timer
         self.hide_timer = QTimer()
         self.hide_timer.timeout.connect(self.hideAndReset)
         self.hide_timer.setSingleShot(True)
         self.hide_timer.start(duration)
-        
+
     def hideAndReset(self):
         """Hide the bubble and notify parent to reset sleep timer"""
         self.hide()
         if self.parent():
             self.parent().reset_idle_timer()
-            
+
     def showAtPosition(self, x, y):
         """Show the speech bubble at the specified position"""
         self.move(x, y)
@@ -0,0 +1,199 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+import logging
+import httpx
+from ollama import AsyncClient, ResponseError
+from cancellation import CancelledError
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: Ollama unreachable, slow, or failing server-side
+RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.TransportError, ConnectionError)
+
+# Timing counters reported in the final chunk of an Ollama response
+OLLAMA_STAT_KEYS = ('total_duration', 'load_duration', 'prompt_eval_count',
+                    'prompt_eval_duration', 'eval_count', 'eval_duration')
+
+class LLMUnavailableError(Exception):
+    """Raised when Ollama can't be reached or the circuit breaker is open"""
+    pass
+
+class CircuitBreaker:
+    """Opens after repeated request failures so callers fail fast until Ollama recovers"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, failure_threshold=3):
+        self.failure_threshold = failure_threshold
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.state == self.OPEN
+
+    def record_success(self):
+        """Close the breaker after any successful call"""
+        with self._lock:
+            if self.state == self.OPEN:
+                logger.info("Ollama reachable again, closing circuit breaker")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """Count a failed call, returns True if this failure opened the breaker"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+                logger.warning(f"Ollama failed {self.consecutive_failures} times in a row, opening circuit breaker")
+                return True
+            return False
+
+class LLMClient:
+    """Async Ollama client running on its own event loop thread
+
+    Blocking callers (the voice assistant's worker threads) submit requests with
+    chat(); the request itself runs on the dedicated loop with connect/read
+    timeouts, bounded retries and a circuit breaker that re-probes in the background.
+    A host of None uses Ollama's default (OLLAMA_HOST or localhost:11434).
+    """
+
+    def __init__(self, host=None, connect_timeout=3.0, read_timeout=60.0,
+                 max_retries=2, retry_backoff=0.5, failure_threshold=3, probe_interval=10.0):
+        self.host = host
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.probe_interval = probe_interval
+        self.breaker = CircuitBreaker(failure_threshold)
+        self._client = AsyncClient(host=host, timeout=self.timeout)
+        self._probe_task = None
+
+        # Dedicated event loop for all LLM traffic
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="ollama-client", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def chat(self, model, messages, token=None, on_chunk=None, on_stats=None):
+        """Stream a chat completion and return the full text (blocks the calling thread)
+
+        on_chunk is called with each piece of content as it arrives and on_stats
+        with the request's timing stats once it completes. Raises CancelledError
+        if token is cancelled and LLMUnavailableError if Ollama can't be reached.
+        """
+        if self.breaker.is_open:
+            raise LLMUnavailableError("Ollama circuit breaker is open")
+
+        future = self._submit(self._chat_with_retries(model, messages, token, on_chunk, on_stats))
+        if token is not None:
+            # Cancelling the future cancels the task on the loop, aborting the HTTP request
+            token.on_cancel(future.cancel)
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            raise CancelledError()
+
+    async def _chat_with_retries(self, model, messages, token, on_chunk, on_stats):
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            received = []
+            try:
+                result, stats = await self._chat_once(model, messages, token, on_chunk, received)
+                self.breaker.record_success()
+                if on_stats:
+                    on_stats(stats)
+                return result
+            except ResponseError as e:
+                # Client errors (bad model name etc.) won't be fixed by retrying
+                if e.status_code < 500:
+                    raise
+                last_error = e
+            except RETRYABLE_ERRORS as e:
+                last_error = e
+
+            # Never retry once partial output has been handed to the caller
+            if received:
+                break
+            if attempt < self.max_retries:
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(f"Ollama request failed ({last_error}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        if self.breaker.record_failure():
+            self._start_probe()
+        raise LLMUnavailableError(f"Ollama request failed: {last_error}") from last_error
+
+    async def _chat_once(self, model, messages, token, on_chunk, received):
+        """Run one streaming request, returns (text, stats)
+
+        stats holds wall-clock ttft/latency in seconds plus Ollama's own
+        duration counters (nanoseconds) from the final chunk.
+        """
+        started = time.perf_counter()
+        stats = {'model': model, 'ttft': None}
+        stream = await self._client.chat(model=model, messages=messages, stream=True)
+        async for chunk in stream:
+            if token is not None and token.cancelled:
+                raise asyncio.CancelledError()
+            content = chunk['message']['content']
+            if content and stats['ttft'] is None:
+                stats['ttft'] = time.perf_counter() - started
+            received.append(content)
+            if on_chunk:
+                on_chunk(content)
+            if chunk.get('done'):
+                for key in OLLAMA_STAT_KEYS:
+                    stats[key] = chunk.get(key)
+        stats['latency'] = time.perf_counter() - started
+        return ''.join(received), stats
+
+    def _start_probe(self):
+        """Start the background re-probe task (runs on the loop thread)"""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = self._loop.create_task(self._probe_until_healthy())
+
+    async def _probe_until_healthy(self):
+        """Poll Ollama while the breaker is open and close it once it answers"""
+        while self.breaker.is_open:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await self._client.list()
+                self.breaker.record_success()
+            except Exception as e:
+                logger.info(f"Ollama still unavailable: {e}")
+
+    def list_models(self, timeout=None):
+        """Return the list of installed models (blocks the calling thread)"""
+        future = self._submit(self._client.list())
+        models = future.result(timeout)
+        return models['models']
+
+    def warm_up(self, model, timeout=None):
+        """Load model into Ollama's memory without generating (blocks the calling thread)
+
+        A chat request with no messages only loads the model, so the first real
+        answer does not pay for it.
+        """
+        future = self._submit(self._client.chat(model=model, messages=[]))
+        future.result(timeout)
+
+    def close(self):
+        """Stop the event loop thread"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1)
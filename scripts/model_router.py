@@ -0,0 +1,137 @@
+import re
+import threading
+import statistics
+import logging
+from collections import deque
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Routing policy defaults, overridden by the 'model_routing' section of config.json
+DEFAULT_ROUTING = {
+    'fast_model': 'llama3.2:latest',   # Short conversational turns
+    'large_model': 'llama3.2:latest',  # Long or reasoning-heavy prompts
+    'long_prompt_words': 25,           # Prompts at least this long go to the large model
+    'reasoning_keywords': [
+        'why', 'explain', 'how does', 'how do', 'compare', 'difference between',
+        'step by step', 'calculate', 'plan', 'write', 'summarize', 'summarise'
+    ],
+    'max_large_ttft': 4.0,             # Seconds; above this the large model is skipped
+    'min_large_tokens_per_second': 4.0,
+    'min_samples': 3,                  # Measurements needed before latency affects routing
+    'large_probe_interval': 10,        # Every Nth skipped prompt still tries the large model
+    'window': 20                       # Rolling window of measurements per model
+}
+
+class ModelStats:
+    """Rolling latency and throughput measurements for one model"""
+
+    def __init__(self, window=20):
+        self.ttft = deque(maxlen=window)               # Wall-clock time to first token (s)
+        self.latency = deque(maxlen=window)            # Wall-clock request time (s)
+        self.tokens_per_second = deque(maxlen=window)  # eval_count / eval_duration from Ollama
+
+    @property
+    def samples(self):
+        return len(self.latency)
+
+    def record(self, stats):
+        """Record the stats dict produced by LLMClient for one request"""
+        if stats.get('ttft') is not None:
+            self.ttft.append(stats['ttft'])
+        if stats.get('latency') is not None:
+            self.latency.append(stats['latency'])
+        eval_count = stats.get('eval_count')
+        eval_duration = stats.get('eval_duration')  # Nanoseconds
+        if eval_count and eval_duration:
+            self.tokens_per_second.append(eval_count / (eval_duration / 1e9))
+
+    def summary(self):
+        """Median of each rolling measurement (None when no data yet)"""
+        def median(values):
+            return statistics.median(values) if values else None
+        return {
+            'samples': self.samples,
+            'ttft': median(self.ttft),
+            'latency': median(self.latency),
+            'tokens_per_second': median(self.tokens_per_second)
+        }
+
+class ModelRouter:
+    """Chooses a local model per prompt from the config policy and measured latency"""
+
+    def __init__(self, config=None):
+        self._lock = threading.Lock()
+        self.stats = {}
+        self._skipped = 0  # Prompts routed away from the large model since it was last tried
+        self.update_config(config or {})
+
+    def update_config(self, config):
+        """Apply the routing policy from a config dict"""
+        policy = dict(DEFAULT_ROUTING)
+        policy.update(config.get('model_routing', {}))
+        with self._lock:
+            self.policy = policy
+        logger.info(f"Model routing: fast={policy['fast_model']}, large={policy['large_model']}")
+
+    def models(self):
+        """All models the current policy may route to"""
+        return sorted({self.policy['fast_model'], self.policy['large_model']})
+
+    def wants_large_model(self, text):
+        """True for long or reasoning-heavy prompts"""
+        lower = text.lower()
+        if len(lower.split()) >= self.policy['long_prompt_words']:
+            return True
+        # Whole words only, so 'plan' does not match 'planet' or 'why' match 'whyever'
+        return any(re.search(r'\b' + re.escape(keyword.lower()) + r'\b', lower)
+                   for keyword in self.policy['reasoning_keywords'])
+
+    def route(self, text):
+        """Return the model name to use for this prompt"""
+        fast = self.policy['fast_model']
+        large = self.policy['large_model']
+        if large == fast or not self.wants_large_model(text):
+            return fast
+
+        # Fall back to the fast model while the large one is measurably too slow
+        with self._lock:
+            model_stats = self.stats.get(large)
+            summary = model_stats.summary() if model_stats else None
+        reason = None
+        if summary and summary['samples'] >= self.policy['min_samples']:
+            tps = summary['tokens_per_second']
+            if summary['ttft'] is not None and summary['ttft'] > self.policy['max_large_ttft']:
+                reason = f"time-to-first-token {summary['ttft']:.2f}s over budget"
+            elif tps is not None and tps < self.policy['min_large_tokens_per_second']:
+                reason = f"running at {tps:.1f} tokens/s"
+        if reason is None:
+            with self._lock:
+                self._skipped = 0
+            return large
+
+        # Try the large model now and then anyway, so a recovered model gets new measurements
+        with self._lock:
+            self._skipped += 1
+            probe = self.policy['large_probe_interval'] and self._skipped >= self.policy['large_probe_interval']
+            if probe:
+                self._skipped = 0
+        if probe:
+            logger.info(f"{large} {reason}, trying it again to re-measure")
+            return large
+        logger.info(f"{large} {reason}, using {fast}")
+        return fast
+
+    def record(self, model, stats):
+        """Feed the stats of a finished request back into the rolling measurements"""
+        with self._lock:
+            if model not in self.stats:
+                self.stats[model] = ModelStats(self.policy['window'])
+            self.stats[model].record(stats)
+            summary = self.stats[model].summary()
+        logger.info(f"Model {model} stats: {summary}")
+
+    def summaries(self):
+        """Per-model rolling summaries"""
+        with self._lock:
+            return {model: stats.summary() for model, stats in self.stats.items()}
@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import atexit
+import threading
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+def atomic_write(path, data, attempts=3):
+    """Write bytes to path through a temporary file and an atomic rename
+
+    A crash leaves either the old file or the new one, never half of each.
+    The rename is retried briefly since Windows refuses it while another
+    process (e.g. a virus scanner) has the target open.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(attempts):
+            try:
+                os.replace(temp_path, path)
+                return
+            except PermissionError:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+    finally:
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+class PersistentWriter:
+    """Coalesces bursts of JSON writes into one atomic write per file
+
+    write_json() snapshots the data straight away and a background thread
+    writes it once no newer request has arrived for delay seconds (or at
+    most max_delay after the first one). flush() writes whatever is pending
+    right now and is run at exit, so nothing queued is lost on a clean quit.
+    """
+
+    def __init__(self, delay=0.5, max_delay=2.0):
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending = {}  # path -> [serialised bytes, first request, last request, version]
+        self._versions = {}  # path -> version of the latest request
+        self._written = {}   # path -> version last written, so an older payload never lands last
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # Serialises disk writes across threads
+        self._thread = None
+        self.requests = 0
+        self.writes = 0
+        self.failures = 0
+        self.bytes_written = 0
+
+    def write_json(self, path, data, immediate=False):
+        """Queue data to be written to path as JSON (or write it now if immediate)"""
+        payload = json.dumps(data).encode('utf-8')
+        now = time.monotonic()
+        with self._condition:
+            self.requests += 1
+            version = self._versions.get(path, 0) + 1
+            self._versions[path] = version
+            if immediate:
+                self._pending.pop(path, None)
+            else:
+                entry = self._pending.get(path)
+                if entry:
+                    entry[0] = payload
+                    entry[2] = now
+                    entry[3] = version
+                else:
+                    self._pending[path] = [payload, now, now, version]
+                self._ensure_started()
+                self._condition.notify()
+                return
+        self._write(path, payload, version)
+
+    def pending(self, path=None):
+        """True if a write is waiting for path (or for any file)"""
+        with self._condition:
+            return path in self._pending if path else bool(self._pending)
+
+    def discard(self, path):
+        """Drop a pending write, e.g. because the file is being deleted"""
+        with self._condition:
+            self._pending.pop(path, None)
+
+    def flush(self, path=None):
+        """Write pending data for path (or every file) now"""
+        with self._condition:
+            if path is None:
+                items = list(self._pending.items())
+                self._pending.clear()
+            elif path in self._pending:
+                items = [(path, self._pending.pop(path))]
+            else:
+                items = []
+        for item_path, (payload, _, _, version) in items:
+            self._write(item_path, payload, version)
+
+    def close(self):
+        """Flush everything and log the write counters (run on quit)"""
+        self.flush()
+        logger.info(f"Persistent writes: {self.stats()}")
+
+    def stats(self):
+        """Write counters: requests, writes to disk, requests coalesced away and failures"""
+        with self._condition:
+            pending = len(self._pending)
+            return {
+                'requests': self.requests,
+                'writes': self.writes,
+                'coalesced': max(0, self.requests - self.writes - self.failures - pending),
+                'failures': self.failures,
+                'pending': pending,
+                'bytes_written': self.bytes_written
+            }
+
+    def _write(self, path, payload, version):
+        with self._write_lock:
+            with self._condition:
+                if self._written.get(path, 0) > version:
+                    # A newer payload was flushed while this one waited for the lock
+                    return True
+            try:
+                atomic_write(path, payload)
+            except OSError as e:
+                with self._condition:
+                    self.failures += 1
+                logger.error(f"Error writing {path}: {e}")
+                return False
+            with self._condition:
+                self._written[path] = version
+                self.writes += 1
+                self.bytes_written += len(payload)
+        return True
+
+    def _ensure_started(self):
+        # Called with the condition held
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='persistent-writer', daemon=True)
+            self._thread.start()
+
+    def _due(self, now):
+        """Paths whose write is due, and seconds until the next one is"""
+        due = []
+        wait = None
+        for path, (_, first, last, _) in self._pending.items():
+            deadline = min(last + self.delay, first + self.max_delay)
+            if deadline <= now:
+                due.append(path)
+            else:
+                wait = deadline - now if wait is None else min(wait, deadline - now)
+        return due, wait
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    due, wait = self._due(time.monotonic())
+                    if due:
+                        break
+                    self._condition.wait(wait)
+                items = [(path, self._pending.pop(path)) for path in due]
+            for path, (payload, _, _, version) in items:
+                self._write(path, payload, version)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_persistent_writer():
+    """Shared writer for config and history files, flushed at exit"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = PersistentWriter()
+            atexit.register(_writer.flush)
+        return _writer
@@ -0,0 +1,130 @@
+import sys
+import os
+import zipfile
+import threading
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Font used by Ova's speech bubble
+UI_FONT = 'assets/fonts/Roboto-Regular.ttf'
+FALLBACK_FONT_FAMILY = 'Segoe UI'  # Modern Windows default
+
+# Single-file copy of assets/ written by `build.py --fast`; loose files are used when it is absent
+ASSET_BUNDLE = 'assets.bundle'
+
+def get_resource_path(relative_path):
+    """Get the correct resource path whether running as script or frozen exe"""
+    if hasattr(sys, '_MEIPASS'):
+        # Running as PyInstaller bundle
+        base_path = sys._MEIPASS
+    else:
+        # Running as script
+        base_path = os.path.dirname(os.path.dirname(__file__))
+    return os.path.join(base_path, relative_path)
+
+class AssetStore:
+    """Reads files under assets/, from the prebuilt bundle when there is one
+
+    The bundle is an uncompressed zip (PNG and MP3 are compressed already), so
+    a packaged build opens one file at startup instead of one per frame and
+    sound. Paths are relative to the resource root, e.g. 'assets/idle/1.png'.
+    """
+
+    def __init__(self, bundle_path=None):
+        bundle_path = bundle_path or get_resource_path(ASSET_BUNDLE)
+        self._bundle = zipfile.ZipFile(bundle_path) if os.path.exists(bundle_path) else None
+        self._lock = threading.Lock()  # Background loaders share the bundle's file handle
+        if self._bundle:
+            logger.info(f"Reading assets from {bundle_path}")
+
+    @property
+    def bundled(self):
+        return self._bundle is not None
+
+    def list(self, directory, suffix=''):
+        """Sorted paths of the files directly inside directory ending in suffix"""
+        if self._bundle:
+            prefix = directory.rstrip('/') + '/'
+            return sorted(name for name in self._bundle.namelist()
+                          if name.startswith(prefix) and '/' not in name[len(prefix):] and name.endswith(suffix))
+        full_path = get_resource_path(directory)
+        if not os.path.isdir(full_path):
+            return []
+        return sorted(f"{directory.rstrip('/')}/{name}" for name in os.listdir(full_path)
+                      if name.endswith(suffix) and os.path.isfile(os.path.join(full_path, name)))
+
+    def exists(self, relative_path):
+        """True if relative_path is a file or a directory of the assets"""
+        if self._bundle:
+            prefix = relative_path.rstrip('/')
+            return any(name == prefix or name.startswith(prefix + '/') for name in self._bundle.namelist())
+        return os.path.exists(get_resource_path(relative_path))
+
+    def read(self, relative_path):
+        """Contents of an asset, raises FileNotFoundError if there is no such file"""
+        if self._bundle:
+            with self._lock:
+                try:
+                    return self._bundle.read(relative_path)
+                except KeyError:
+                    raise FileNotFoundError(f"{relative_path} is not in {ASSET_BUNDLE}")
+        with open(get_resource_path(relative_path), 'rb') as f:
+            return f.read()
+
+_asset_store = None
+_asset_store_lock = threading.Lock()
+
+def get_asset_store():
+    """Shared asset store"""
+    global _asset_store
+    with _asset_store_lock:
+        if _asset_store is None:
+            _asset_store = AssetStore()
+        return _asset_store
+
+class FontRegistry:
+    """Application fonts, each added to Qt's font database once per process
+
+    Widgets ask for a family by font file; the first request registers the file
+    and every later one is a dictionary lookup. Needs a QApplication.
+    """
+
+    def __init__(self):
+        self._families = {}  # relative path -> family name, or None if loading failed
+        self._lock = threading.Lock()
+
+    def family(self, relative_path=UI_FONT, fallback=FALLBACK_FONT_FAMILY):
+        """Family name of the font in relative_path, or fallback if it cannot be loaded"""
+        with self._lock:
+            if relative_path not in self._families:
+                self._families[relative_path] = self._register(relative_path)
+            return self._families[relative_path] or fallback
+
+    def _register(self, relative_path):
+        # Imported here so modules that only need resource paths do not load Qt
+        from PyQt5.QtCore import QByteArray
+        from PyQt5.QtGui import QFontDatabase
+        try:
+            data = get_asset_store().read(relative_path)
+        except OSError:
+            data = b''
+        font_id = QFontDatabase.addApplicationFontFromData(QByteArray(data)) if data else -1
+        families = QFontDatabase.applicationFontFamilies(font_id) if font_id != -1 else []
+        if not families:
+            logger.warning(f"Could not load font {relative_path}, using {FALLBACK_FONT_FAMILY}")
+            return None
+        logger.info(f"Registered font {families[0]} from {relative_path}")
+        return families[0]
+
+_font_registry = None
+_font_registry_lock = threading.Lock()
+
+def get_font_registry():
+    """Shared font registry"""
+    global _font_registry
+    with _font_registry_lock:
+        if _font_registry is None:
+            _font_registry = FontRegistry()
+        return _font_registry
@@ -5,9 +5,11 @@ from PyQt5.QtCore import Qt
 import json
 import os
 import logging
+from voice_catalogue import get_voice_catalogue
+from config_service import get_config_service
+from persistence import get_persistent_writer
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class SettingsDialog(QDialog):
@@ -18,52 +20,20 @@ class SettingsDialog(QDialog):
         self.setModal(True)
         self.config = self.load_config()
         self.current_conversation = None
+        self._windows_voices_requested = False
         self.initUI()
         
     def load_config(self):
-        """Load configuration from config.json"""
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
-        default_config = {
-            'voice_type': 'Azure Voice',
-            'voice_name': 'en-US-AnaNeural',
-            'sleep_timer': 30,
-            'personality_preset': 'ova',
-            'display_mode': 'bubble',
-            'max_conversation_pairs': 10,  # Default to 10 pairs (20 messages)
-            'save_conversation_history': True,  # Default to saving history
-            'enable_random_actions': True,
-            'min_action_interval': 5,
-            'max_action_interval': 10,
-            'enabled_actions': {
-                'take_flight': True,
-                'look_around': True,
-                'dance': True,
-                'screech': True
-            }
-        }
-        
-        try:
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    loaded_config = json.load(f)
-                    logger.info(f"Loaded config: {loaded_config}")
-                    return loaded_config
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
-        
-        logger.info("Using default config")
-        return default_config.copy()
+        """Copy of the current settings for the dialog to edit"""
+        return get_config_service().snapshot()
     
     def save_config(self):
-        """Save configuration to config.json"""
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
+        """Publish the edited settings; returns the {key: value} that changed"""
         try:
-            logger.info(f"Saving config: {self.config}")
-            with open(config_path, 'w') as f:
-                json.dump(self.config, f)
-            logger.info("Config saved successfully")
-        except Exception as e:
+            return get_config_service().update(self.config)
+        except ValueError as e:
             logger.error(f"Error saving config: {e}")
+            return {}
     
     def get_available_presets(self):
         """Get list of available preset files"""
@@ -77,70 +47,9 @@ class SettingsDialog(QDialog):
         return sorted(presets)
 
     def get_available_voices(self):
-        """Get list of available voices"""
-        edge_voices = [
-            # Rename Ana to Ova
-            ("Ova", "en-US-AnaNeural"),
-            # US Voices
-            ("Aria (US)", "en-US-AriaNeural"),
-            ("Christopher (US)", "en-US-ChristopherNeural"),
-            ("Eric (US)", "en-US-EricNeural"),
-            ("Guy (US)", "en-US-GuyNeural"),
-            ("Jenny (US)", "en-US-JennyNeural"),
-            ("Michelle (US)", "en-US-MichelleNeural"),
-            ("Roger (US)", "en-US-RogerNeural"),
-            ("Steffan (US)", "en-US-SteffanNeural"),
-            # US Multilingual
-            ("Ava (US Multi)", "en-US-AvaMultilingualNeural"),
-            ("Andrew (US Multi)", "en-US-AndrewMultilingualNeural"),
-            ("Emma (US Multi)", "en-US-EmmaMultilingualNeural"),
-            ("Brian (US Multi)", "en-US-BrianMultilingualNeural"),
-            # UK Voices
-            ("Libby (UK)", "en-GB-LibbyNeural"),
-            ("Maisie (UK)", "en-GB-MaisieNeural"),
-            ("Ryan (UK)", "en-GB-RyanNeural"),
-            ("Sonia (UK)", "en-GB-SoniaNeural"),
-            ("Thomas (UK)", "en-GB-ThomasNeural"),
-            # Australian Voices
-            ("Natasha (AU)", "en-AU-NatashaNeural"),
-            ("William (AU)", "en-AU-WilliamNeural"),
-            # Canadian Voices
-            ("Clara (CA)", "en-CA-ClaraNeural"),
-            ("Liam (CA)", "en-CA-LiamNeural"),
-            # Irish Voices
-            ("Connor (IE)", "en-IE-ConnorNeural"),
-            ("Emily (IE)", "en-IE-EmilyNeural"),
-            # Indian Voices
-            ("Neerja (IN)", "en-IN-NeerjaNeural"),
-            ("Neerja Expressive (IN)", "en-IN-NeerjaExpressiveNeural"),
-            ("Prabhat (IN)", "en-IN-PrabhatNeural"),
-            # South African Voices
-            ("Leah (ZA)", "en-ZA-LeahNeural"),
-            ("Luke (ZA)", "en-ZA-LukeNeural"),
-            # Other Regional Voices
-            ("Asilia (KE)", "en-KE-AsiliaNeural"),
-            ("Chilemba (KE)", "en-KE-ChilembaNeural"),
-            ("Mitchell (NZ)", "en-NZ-MitchellNeural"),
-            ("Molly (NZ)", "en-NZ-MollyNeural"),
-            ("Abeo (NG)", "en-NG-AbeoNeural"),
-            ("Ezinne (NG)", "en-NG-EzinneNeural"),
-            ("James (PH)", "en-PH-JamesNeural"),
-            ("Rosa (PH)", "en-PH-RosaNeural"),
-            ("Luna (SG)", "en-SG-LunaNeural"),
-            ("Wayne (SG)", "en-SG-WayneNeural"),
-            ("Elimu (TZ)", "en-TZ-ElimuNeural"),
-            ("Imani (TZ)", "en-TZ-ImaniNeural")
-        ]
-        
-        # Get Windows voices
-        try:
-            engine = pyttsx3.init()
-            windows_voices = [(voice.name, voice.id) for voice in engine.getProperty('voices')]
-            engine.stop()
-        except:
-            windows_voices = []
-            
-        return edge_voices + windows_voices
+        """Get list of available voices from the shared voice catalogue"""
+        catalogue = get_voice_catalogue()
+        return catalogue.edge_voices() + catalogue.windows_voices()
     
     def initUI(self):
         layout = QVBoxLayout()
@@ -216,6 +125,11 @@ class SettingsDialog(QDialog):
         
         # Load saved settings
         self.loadSavedSettings()
+        
+        # Pick up newer voices if the catalogue is stale, without blocking the dialog
+        catalogue = get_voice_catalogue()
+        catalogue.updated.connect(self.onCatalogueUpdated)
+        catalogue.refresh()
 
     def setupVoiceTab(self, tab):
         """Setup the voice settings tab"""
@@ -392,6 +306,9 @@ class SettingsDialog(QDialog):
         
         if not os.path.exists(history_dir):
             os.makedirs(history_dir)
+        
+        # Show conversations as saved, not as they were before a pending write
+        get_persistent_writer().flush()
             
         # Get current conversation from config
         current_convo = self.config.get('current_conversation')
@@ -469,11 +386,8 @@ class SettingsDialog(QDialog):
         if self.current_conversation:
             # Update config with current conversation
             self.config['current_conversation'] = self.current_conversation
-            # Save config immediately
+            # Save config immediately; the voice assistant and chat window reload it
             self.save_config()
-            # Reload the conversation in voice assistant
-            if hasattr(self.parent(), 'voice_assistant'):
-                self.parent().voice_assistant.reload_config()
 
     def delete_conversation(self, file_name):
         """Delete a conversation file"""
@@ -481,7 +395,8 @@ class SettingsDialog(QDialog):
         file_path = os.path.join(history_dir, file_name)
         
         try:
-            # Delete the file
+            # Delete the file (and any save still waiting to recreate it)
+            get_persistent_writer().discard(file_path)
             os.remove(file_path)
             
             # Find another conversation or create new one
@@ -497,10 +412,6 @@ class SettingsDialog(QDialog):
             
             # Refresh the table
             self.load_conversations()
-            
-            # Reload voice assistant
-            if hasattr(self.parent(), 'voice_assistant'):
-                self.parent().voice_assistant.reload_config()
         except Exception as e:
             logger.error(f"Error deleting conversation {file_name}: {e}")
             from PyQt5.QtWidgets import QMessageBox
@@ -520,13 +431,14 @@ class SettingsDialog(QDialog):
             
         # Create new empty conversation file
         new_file = f"{next_num}.json"
-        with open(os.path.join(history_dir, new_file), 'w') as f:
-            json.dump([], f)
+        get_persistent_writer().write_json(os.path.join(history_dir, new_file), [], immediate=True)
             
         # Set as current conversation
         self.current_conversation = new_file
         self.config['current_conversation'] = new_file
-        self.save_config()
+        if 'current_conversation' not in self.save_config():
+            # Same file name as before but a fresh file: make sure it is reloaded
+            get_config_service().notify('current_conversation')
         
         # Refresh table
         self.load_conversations()
@@ -546,14 +458,11 @@ class SettingsDialog(QDialog):
                 # Delete all json files
                 for file in os.listdir(history_dir):
                     if file.endswith('.json'):
+                        get_persistent_writer().discard(os.path.join(history_dir, file))
                         os.remove(os.path.join(history_dir, file))
                 
                 # Create and select new conversation
                 self.new_conversation()
-                
-                # Reload voice assistant
-                if hasattr(self.parent(), 'voice_assistant'):
-                    self.parent().voice_assistant.reload_config()
         except Exception as e:
             logger.error(f"Error clearing all conversations: {e}")
             QMessageBox.warning(self, "Error", f"Could not clear all conversations: {str(e)}")
@@ -590,8 +499,8 @@ class SettingsDialog(QDialog):
         # Populate voice selection
         self.onVoiceTypeChanged(voice_type)
         
-        # Set voice name
-        index = self.voice_selection.findText(voice_name)
+        # Set voice name (the list shows display names, the config stores IDs)
+        index = self.voice_selection.findText(get_voice_catalogue().display_name(voice_name))
         if index >= 0:
             self.voice_selection.setCurrentIndex(index)
 
@@ -602,11 +511,21 @@ class SettingsDialog(QDialog):
             azure_voices = [voice for voice in voices if voice[1].startswith("en-")]
             self.voice_selection.addItems([voice[0] for voice in azure_voices])
         else:  # Windows Voice
-            import pyttsx3
-            engine = pyttsx3.init()
-            voices = engine.getProperty('voices')
-            self.voice_selection.addItems([voice.name for voice in voices])
-            engine.stop()
+            catalogue = get_voice_catalogue()
+            windows_voices = catalogue.windows_voices()
+            self.voice_selection.addItems([voice[0] for voice in windows_voices])
+            if not self._windows_voices_requested:
+                # Starts the shared system voice backend; the list refreshes when it answers
+                self._windows_voices_requested = True
+                catalogue.refresh_windows_voices()
+    
+    def onCatalogueUpdated(self):
+        """Repopulate the voice list when the catalogue refreshes, keeping the selection"""
+        selected = self.voice_selection.currentText()
+        self.onVoiceTypeChanged(self.voice_type.currentText())
+        index = self.voice_selection.findText(selected)
+        if index >= 0:
+            self.voice_selection.setCurrentIndex(index)
             
     def accept(self):
         """Called when Save button is clicked"""
@@ -614,7 +533,9 @@ class SettingsDialog(QDialog):
         
         # Update config with current values
         self.config['voice_type'] = self.voice_type.currentText()
-        self.config['voice_name'] = self.getSelectedVoice()
+        selected_voice = self.getSelectedVoice()
+        if selected_voice:
+            self.config['voice_name'] = selected_voice
         self.config['sleep_timer'] = self.sleep_timer.value()
         self.config['personality_preset'] = self.preset_selection.currentText()
         
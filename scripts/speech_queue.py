@@ -0,0 +1,138 @@
+import re
+import time
+import asyncio
+import logging
+from audio_stream import Mp3StreamPlayer
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SENTENCE_END = re.compile(r'(?<=[.!?…])["\')\]]*\s+')
+MIN_SENTENCE_CHARS = 20   # Shorter fragments are merged into the next sentence
+MAX_SENTENCE_CHARS = 240  # Longer sentences are split at a comma or space
+
+def split_sentences(text):
+    """Split text into speakable sentences for pipelined synthesis"""
+    parts = [p.strip() for p in SENTENCE_END.split(text.strip()) if p.strip()]
+
+    sentences = []
+    carry = ""
+    for part in parts:
+        part = f"{carry} {part}".strip() if carry else part
+        if len(part) < MIN_SENTENCE_CHARS:
+            carry = part
+            continue
+        carry = ""
+        while len(part) > MAX_SENTENCE_CHARS:
+            cut = part.rfind(', ', 0, MAX_SENTENCE_CHARS)
+            if cut == -1:
+                cut = part.rfind(' ', 0, MAX_SENTENCE_CHARS)
+            if cut == -1:
+                break
+            sentences.append(part[:cut + 1].strip())
+            part = part[cut + 1:].strip()
+        sentences.append(part)
+
+    if carry:
+        if sentences and len(sentences[-1]) + len(carry) < MAX_SENTENCE_CHARS:
+            sentences[-1] = f"{sentences[-1]} {carry}"
+        else:
+            sentences.append(carry)
+    return sentences
+
+class SpeechQueue:
+    """Plays sentence N while sentences N+1..N+lookahead are already being synthesised
+
+    synthesize is an async callable (text, player) that feeds the sentence's
+    audio into the player. Each sentence gets its own player from
+    create_player(channel); only the one being played is active on the speech
+    channel.
+    """
+
+    def __init__(self, synthesize, channel, lookahead=2, trace=None, create_player=None, on_first_audio=None):
+        self.synthesize = synthesize
+        self.channel = channel
+        self.create_player = create_player or (lambda channel: Mp3StreamPlayer(channel, active=False))
+        self.lookahead = max(0, lookahead)
+        self.trace = trace              # Optional (tracer, trace_id)
+        self.on_first_audio = on_first_audio  # Called when the first sentence starts playing
+        self.players = []
+        self.sentences = None
+        self.played = 0                 # Sentences that played to the end
+        self.first_audio_at = None
+        self.stats = {
+            'sentences': 0,
+            'max_queue_depth': 0,       # Most sentences decoded ahead of the one playing
+            'underruns': 0,             # Gaps where playback waited on synthesis
+            'queue_depths': []          # Depth each time a sentence started playing
+        }
+
+    def queue_depth(self, playing_index):
+        """Number of sentences after the playing one that already have audio ready"""
+        return sum(1 for p in self.players[playing_index + 1:] if p.has_audio or p.finished)
+
+    async def play(self, text):
+        """Synthesise and play text, returns when the last sentence finished playing"""
+        sentences = self.sentences = split_sentences(text)
+        self.stats['sentences'] = len(sentences)
+        self.players = [self.create_player(self.channel) for _ in sentences]
+        if self.players:
+            self.players[0].on_first_audio = self.on_first_audio
+        tasks = []
+
+        def start_synthesis(up_to):
+            while len(tasks) < min(up_to + 1, len(sentences)):
+                index = len(tasks)
+                tasks.append(asyncio.ensure_future(self._synthesize(index, sentences[index])))
+
+        try:
+            for index, player in enumerate(self.players):
+                start_synthesis(index + self.lookahead)
+
+                # The previous sentence is done; if this one has nothing yet we stall
+                if index > 0 and not player.has_audio and not player.finished:
+                    self.stats['underruns'] += 1
+                depth = self.queue_depth(index)
+                self.stats['queue_depths'].append(depth)
+                self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], depth)
+
+                player.activate()
+                while player.is_playing():
+                    if tasks[index].done() and not player.finished:
+                        break  # Synthesis failed, raised below
+                    player.pump()
+                    await asyncio.sleep(0.02)
+                if self.first_audio_at is None:
+                    self.first_audio_at = player.first_audio_at
+                # Surface synthesis errors for this sentence
+                await tasks[index]
+                self.stats['underruns'] += player.underruns
+                self.played = index + 1
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        logger.info(f"Speech queue: {self.stats['sentences']} sentences, "
+                    f"max depth {self.stats['max_queue_depth']}, underruns {self.stats['underruns']}")
+        return self.stats
+
+    def remaining_text(self, text):
+        """The part of text (as passed to play()) that has not been played to the end"""
+        if self.sentences is None:
+            return text
+        return ' '.join(self.sentences[self.played:])
+
+    async def _synthesize(self, index, sentence):
+        player = self.players[index]
+        started = time.time()
+        await self.synthesize(sentence, player)
+        player.finish()
+        if self.trace:
+            tracer, trace_id = self.trace
+            tracer.record_span(trace_id, 'tts_synthesis', started, time.time(),
+                               sentence=index, chars=len(sentence))
+
+    def stop(self):
+        """Stop playback of every sentence"""
+        for player in self.players:
+            player.stop()
@@ -0,0 +1,121 @@
+import re
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Spoken instead of text that only makes sense on screen
+CODE_PLACEHOLDER = "The code is in the chat."
+CUTOFF_PHRASE = "The rest is in the chat."
+DEFAULT_MAX_CHARS = 600
+
+CODE_BLOCK = re.compile(r'```.*?(```|$)', re.DOTALL)
+INLINE_CODE = re.compile(r'`([^`\n]+)`')
+MARKDOWN_IMAGE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+MARKDOWN_LINK = re.compile(r'\[([^\]]+)\]\([^)]*\)')
+# Punctuation right after a URL ends the sentence, it is not part of the URL
+URL = re.compile(r'\b(?:https?://|www\.)(?:www\.)?([^\s/?#)]+)[^\s)]*(?<![.,;:!?])', re.IGNORECASE)
+HEADING = re.compile(r'^\s{0,3}#{1,6}\s*', re.MULTILINE)
+BLOCKQUOTE = re.compile(r'^\s*>+\s?', re.MULTILINE)
+LIST_MARKER = re.compile(r'^\s*(?:[-*+•]|\d+[.)])\s+', re.MULTILINE)
+HORIZONTAL_RULE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$', re.MULTILINE)
+TABLE_DIVIDER = re.compile(r'^\s*\|?(\s*:?-+:?\s*\|)+\s*:?-*:?\s*$', re.MULTILINE)
+# Markers must sit at word boundaries, so 2*3*4 and snake_case are left alone
+EMPHASIS = re.compile(r'(?<![\w*~])(\*\*|\*|~~)(?=\S)(.+?)(?<=\S)\1(?![\w*~])')
+UNDERSCORE_EMPHASIS = re.compile(r'(?<!\w)(__|_)(?=\S)(.+?)(?<=\S)\1(?!\w)')
+DUNDER_NAME = re.compile(r'__\w+__')
+EMOJI = re.compile(
+    '['
+    '\U0001F000-\U0001FAFF'  # Pictographs, emoticons, transport, symbols
+    '\u2600-\u27BF'          # Miscellaneous symbols and dingbats
+    '\u2B00-\u2BFF'          # Arrows and stars
+    '\uFE0E\uFE0F\u200D'     # Variation selectors and joiners
+    '\U000E0020-\U000E007F'  # Tag sequences (flags)
+    ']+'
+)
+SENTENCE_END = re.compile(r'[.!?…:;,]["\')\]]*$')
+
+def _end_sentence(line):
+    """Add a full stop to a line that has no ending punctuation"""
+    return line if SENTENCE_END.search(line) else line + '.'
+
+def _end_structure(text):
+    """End headings and list items with punctuation so they are read as sentences"""
+    lines = []
+    for line in text.split('\n'):
+        if line.strip() and (HEADING.match(line) or LIST_MARKER.match(line)):
+            line = _end_sentence(line.rstrip())
+        lines.append(line)
+    return '\n'.join(lines)
+
+def _join_lines(text):
+    """Join lines with a space so wrapped sentences are read as one"""
+    return ' '.join(line.strip() for line in text.split('\n') if line.strip())
+
+def _table_rows(text):
+    """Read markdown table rows as comma separated cells"""
+    lines = []
+    for line in text.split('\n'):
+        if line.count('|') >= 2:
+            cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+            line = _end_sentence(', '.join(cell for cell in cells if cell))
+        lines.append(line)
+    return '\n'.join(lines)
+
+def _cap_length(text, max_chars, cutoff_phrase):
+    """Cut text at the last sentence end before max_chars and append the cut-off phrase"""
+    if not max_chars or len(text) <= max_chars:
+        return text, False
+    # Leave room for the cut-off phrase
+    budget = max(1, max_chars - len(cutoff_phrase) - 1)
+    head = text[:budget]
+    cut = max(head.rfind('. '), head.rfind('! '), head.rfind('? '))
+    if cut < budget // 3:
+        # No sentence end close enough: cut between words instead
+        cut = head.rfind(' ')
+        head = head[:cut].rstrip(',;: ') + '...' if cut > 0 else head
+    else:
+        head = head[:cut + 1]
+    return f"{head} {cutoff_phrase}".strip(), True
+
+def normalize_for_speech(text, max_chars=DEFAULT_MAX_CHARS, cutoff_phrase=CUTOFF_PHRASE):
+    """Turn model output into text worth speaking
+
+    Code blocks become a short note, links and URLs are reduced to their text or
+    domain, markdown markup and emoji are dropped, whitespace is collapsed, and
+    anything past max_chars is replaced by cutoff_phrase. Returns (text, stats)
+    where stats reports input/output lengths and characters saved.
+    """
+    original = text or ''
+    spoken = CODE_BLOCK.sub(f'\n{CODE_PLACEHOLDER}\n', original)
+    spoken = INLINE_CODE.sub(r'\1', spoken)
+    spoken = MARKDOWN_IMAGE.sub(r'\1', spoken)
+    spoken = MARKDOWN_LINK.sub(r'\1', spoken)
+    spoken = URL.sub(r'\1', spoken)
+    spoken = TABLE_DIVIDER.sub('', spoken)
+    spoken = HORIZONTAL_RULE.sub('', spoken)
+    spoken = _end_structure(spoken)
+    spoken = HEADING.sub('', spoken)
+    spoken = BLOCKQUOTE.sub('', spoken)
+    spoken = LIST_MARKER.sub('', spoken)
+    spoken = EMPHASIS.sub(r'\2', spoken)
+    spoken = UNDERSCORE_EMPHASIS.sub(lambda m: m.group(0) if DUNDER_NAME.fullmatch(m.group(0)) else m.group(2),
+                                     spoken)
+    spoken = _table_rows(spoken)
+    spoken = EMOJI.sub('', spoken)
+    spoken = _join_lines(spoken)
+    spoken = re.sub(r'\s+', ' ', spoken).strip()
+    # Tidy punctuation left behind by removed markup
+    spoken = re.sub(r'\s+([.,!?;:])', r'\1', spoken)
+    spoken = re.sub(r'([.!?]),', r'\1', spoken)
+    spoken = re.sub(r'([,;:])\.', '.', spoken)
+    spoken = re.sub(r'(?<!\.)\.\.(?!\.)', '.', spoken)
+
+    spoken, truncated = _cap_length(spoken, max_chars, cutoff_phrase)
+    stats = {
+        'chars_in': len(original),
+        'chars_out': len(spoken),
+        'chars_saved': len(original) - len(spoken),
+        'truncated': truncated
+    }
+    return spoken, stats
@@ -0,0 +1,163 @@
+import time
+
+# Taken as early as possible: desktop_pet imports this module first
+PROCESS_START = time.perf_counter()
+
+import os
+import threading
+import logging
+from PyQt5.QtCore import QObject, pyqtSignal
+from persistence import get_persistent_writer
+from resources import get_resource_path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Subsystems brought up after the idle owl is on screen, in start order
+STAGES = ('animations', 'audio', 'tts', 'stt', 'llm')
+
+# Time from process start to the first painted frame that the startup check allows
+FIRST_FRAME_BUDGET_MS = 1500
+
+# How long a startup check (OVA_STARTUP_CHECK=1) waits for every stage before giving up
+CHECK_TIMEOUT_MS = 60000
+
+def elapsed_ms():
+    """Milliseconds since the process started"""
+    return (time.perf_counter() - PROCESS_START) * 1000
+
+class StartupSequence(QObject):
+    """Tracks Ova's staged startup and reports how long each stage took
+
+    The window shows the idle owl first; every other subsystem is started
+    afterwards and announces itself through its own ready signal. ready() may
+    be called from any thread. Once every stage is ready the timing report is
+    logged, written to traces/startup.json (or OVA_STARTUP_REPORT) and
+    finished is emitted with it.
+    """
+    first_frame = pyqtSignal(float)  # Milliseconds since process start
+    animations_ready = pyqtSignal()
+    audio_ready = pyqtSignal()
+    tts_ready = pyqtSignal()
+    stt_ready = pyqtSignal()
+    llm_ready = pyqtSignal()
+    stage_ready = pyqtSignal(str, float)  # Stage name, milliseconds since process start
+    finished = pyqtSignal(object)  # The timing report
+    _ready_requested = pyqtSignal(str, object)  # Stage name, error (or None)
+    _work_done = pyqtSignal(object, str)  # Callback, stage name
+
+    def __init__(self, budget_ms=FIRST_FRAME_BUDGET_MS, report_path=None):
+        super().__init__()
+        self.budget_ms = budget_ms
+        self.report_path = report_path or os.environ.get('OVA_STARTUP_REPORT') \
+            or get_resource_path(os.path.join('traces', 'startup.json'))
+        self.first_frame_ms = None
+        self.first_frame_time = None  # Wall clock, so a launcher can include interpreter and bootloader time
+        self.stages = {}  # name -> {'start_ms', 'ready_ms', 'duration_ms', 'error'}
+        self.report = None
+        self._ready_requested.connect(self._mark_ready)
+        self._work_done.connect(self._on_work_done)
+
+    def mark_first_frame(self):
+        """Record the first painted frame (only the first call counts)"""
+        if self.first_frame_ms is not None:
+            return
+        self.first_frame_ms = elapsed_ms()
+        self.first_frame_time = time.time()
+        logger.info(f"First frame after {self.first_frame_ms:.0f} ms")
+        self.first_frame.emit(self.first_frame_ms)
+
+    def begin(self, stage):
+        """Record that a stage has started (only the first call counts)"""
+        self.stages.setdefault(stage, {'start_ms': elapsed_ms(), 'ready_ms': None, 'duration_ms': None, 'error': None})
+
+    def ready(self, stage, error=None):
+        """Record that a stage is up (or gave up with error); safe from any thread"""
+        self._ready_requested.emit(stage, error)
+
+    def run_in_background(self, stage, work, then=None):
+        """Start a stage whose work runs off the GUI thread
+
+        then(result) is called in the GUI thread once work() returns. If it
+        returns a callable, that runs in the background too before the stage
+        counts as ready (e.g. import, then create a QObject, then load data).
+        The stage is marked ready with the error if any step raises.
+        """
+        self.begin(stage)
+        self._start_work(stage, work, then)
+
+    def _start_work(self, stage, work, then):
+        def run():
+            try:
+                result = work()
+            except Exception as e:
+                logger.error(f"Startup stage {stage} failed: {e}")
+                self.ready(stage, str(e))
+                return
+            self._work_done.emit(lambda: then(result) if then else None, stage)
+
+        threading.Thread(target=run, name=f"startup-{stage}", daemon=True).start()
+
+    def _on_work_done(self, callback, stage):
+        try:
+            follow_up = callback()
+        except Exception as e:
+            logger.error(f"Startup stage {stage} failed: {e}")
+            self._mark_ready(stage, str(e))
+            return
+        if callable(follow_up):
+            self._start_work(stage, follow_up, None)
+            return
+        self._mark_ready(stage, None)
+
+    def _mark_ready(self, stage, error):
+        self.begin(stage)
+        timing = self.stages[stage]
+        if timing['ready_ms'] is not None:
+            return
+        timing['ready_ms'] = elapsed_ms()
+        timing['duration_ms'] = timing['ready_ms'] - timing['start_ms']
+        timing['error'] = error
+        if error:
+            logger.warning(f"Startup stage {stage} gave up after {timing['duration_ms']:.0f} ms: {error}")
+        else:
+            logger.info(f"Startup stage {stage} ready after {timing['duration_ms']:.0f} ms")
+
+        signal = getattr(self, f"{stage}_ready", None)
+        if signal is not None:
+            signal.emit()
+        self.stage_ready.emit(stage, timing['ready_ms'])
+
+        if self.report is None and all(self.is_ready(name) for name in STAGES):
+            self._finish()
+
+    def is_ready(self, stage):
+        timing = self.stages.get(stage)
+        return bool(timing and timing['ready_ms'] is not None)
+
+    def timings(self):
+        """The timing report so far"""
+        return {
+            'first_frame_ms': self.first_frame_ms,
+            'first_frame_time': self.first_frame_time,
+            'budget_ms': self.budget_ms,
+            'within_budget': self.first_frame_ms is not None and self.first_frame_ms <= self.budget_ms,
+            'stages': {name: dict(timing) for name, timing in self.stages.items()},
+            'total_ms': max((timing['ready_ms'] for timing in self.stages.values()
+                             if timing['ready_ms'] is not None), default=None)
+        }
+
+    def _finish(self):
+        self.report = self.timings()
+        lines = [f"  {name}: {timing['duration_ms']:.0f} ms" + (f" ({timing['error']})" if timing['error'] else "")
+                 for name, timing in self.report['stages'].items()]
+        logger.info(f"Startup finished after {self.report['total_ms']:.0f} ms, first frame after "
+                    f"{self.report['first_frame_ms'] or 0:.0f} ms (budget {self.budget_ms} ms)\n" + "\n".join(lines))
+        if self.first_frame_ms is not None and self.first_frame_ms > self.budget_ms:
+            logger.warning(f"First frame took {self.first_frame_ms:.0f} ms, over the {self.budget_ms} ms budget")
+        self.save()
+        self.finished.emit(self.report)
+
+    def save(self):
+        """Write the timing report (as far as it got) to report_path"""
+        get_persistent_writer().write_json(self.report_path, self.report or self.timings(), immediate=True)
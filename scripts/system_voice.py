@@ -0,0 +1,126 @@
+import sys
+import time
+import queue
+import threading
+import logging
+from concurrent.futures import Future
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class SystemVoiceBackend:
+    """Installed system voices (pyttsx3), started on first use and run on their own thread
+
+    Every pyttsx3 call, including the blocking runAndWait, runs on the backend
+    thread in the order it was requested; callers get a Future back and never
+    wait unless they choose to. Only stop() reaches into the driver directly,
+    since the backend thread is busy speaking when it is needed.
+    """
+
+    def __init__(self, rate=150, volume=0.9):
+        self.rate = rate
+        self.volume = volume
+        self.driver = None
+        self.error = None           # Exception raised while starting, if any
+        self.startup_seconds = None # Time pyttsx3.init and voice enumeration took
+        self.startup_span = None    # (start, end) epoch seconds, for tracing
+        self._commands = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self):
+        return self._thread is not None
+
+    @property
+    def available(self):
+        """False once starting pyttsx3 has failed"""
+        return self.error is None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='system-voice', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        start_time = time.time()
+        started = time.perf_counter()
+        try:
+            if sys.platform == 'win32':
+                # SAPI is COM based and this is not the thread that imported comtypes
+                import comtypes
+                comtypes.CoInitialize()
+            import pyttsx3
+            self.driver = pyttsx3.init()
+            self.driver.setProperty('rate', self.rate)
+            self.driver.setProperty('volume', self.volume)
+        except Exception as e:
+            self.error = e
+            logger.error(f"Failed to start system voice backend: {e}")
+        self.startup_seconds = time.perf_counter() - started
+        self.startup_span = (start_time, time.time())
+        if self.error is None:
+            logger.info(f"System voice backend started in {self.startup_seconds * 1000:.0f} ms")
+
+        while True:
+            command, args, future = self._commands.get()
+            if command is None:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if self.driver is None:
+                    raise RuntimeError(f"System voices unavailable: {self.error}")
+                future.set_result(command(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _submit(self, command, *args):
+        """Run command(*args) on the backend thread, returns a Future"""
+        self._ensure_started()
+        future = Future()
+        self._commands.put((command, args, future))
+        return future
+
+    def voices(self):
+        """Future of the installed voices as (name, id) pairs"""
+        return self._submit(self._list_voices)
+
+    def _list_voices(self):
+        return [(voice.name, voice.id) for voice in self.driver.getProperty('voices')]
+
+    def set_voice(self, voice_id):
+        """Future that completes once voice_id is selected"""
+        return self._submit(self._set_property, 'voice', voice_id)
+
+    def _set_property(self, name, value):
+        self.driver.setProperty(name, value)
+
+    def speak(self, text):
+        """Future that completes once text has been spoken (or stopped)"""
+        return self._submit(self._say, text)
+
+    def _say(self, text):
+        self.driver.say(text)
+        self.driver.runAndWait()
+
+    def stop(self):
+        """Interrupt the utterance being spoken, from any thread"""
+        if self.driver is not None:
+            self.driver.stop()
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._commands.put((None, (), None))
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_system_voice_backend():
+    """Shared system voice backend; nothing is started until it is first used"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SystemVoiceBackend()
+        return _backend
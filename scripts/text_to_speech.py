@@ -1,174 +1,580 @@
 import os
-import pyttsx3
-from PyQt5.QtCore import QObject, pyqtSignal, QThread
+from PyQt5.QtCore import QObject, pyqtSignal, QThread, QCoreApplication
 import threading
+import queue
+import itertools
 import json
 import logging
 import asyncio
-import edge_tts
-import tempfile
-import pygame
 import time
+import glob
+import socket
+import importlib.util
+from collections import deque
+from tracing import get_tracer
+from speech_queue import SpeechQueue
+from config_service import get_config_service
+from speech_text import normalize_for_speech, CUTOFF_PHRASE, DEFAULT_MAX_CHARS
+from audio_stream import Mp3StreamPlayer, PcmStreamPlayer
+from tts_cache import TTSCache
+from voice_catalogue import get_voice_catalogue
+from audio_engine import get_audio_engine, SPEECH
+from system_voice import get_system_voice_backend
+from acknowledgements import AcknowledgementBank
+from resources import get_resource_path
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize pygame mixer
-pygame.mixer.init()
+# Job priorities, lower numbers are spoken first
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
 
-class TTSWorker(QThread):
-    """Worker thread for TTS playback"""
-    finished = pyqtSignal()
-    error = pyqtSignal(str)
+# Host Edge TTS streams from, probed to decide whether the network voice is usable
+EDGE_HOST = 'speech.platform.bing.com'
+
+class SpeechEngine:
+    """Interface for speech synthesis backends
+    
+    Streaming engines implement synthesize(), an async call that passes audio
+    chunks (mp3 or raw pcm, see audio_format) to on_chunk as they are
+    produced. Each engine keeps recent time-to-first-audio (seconds) and
+    real-time factor (synthesis time / audio duration) samples used for
+    automatic engine selection.
+    """
+    name = 'base'
+    audio_format = 'mp3'
+    streaming = True     # False for engines that play audio themselves
+    cacheable = False    # Whether synthesised audio is worth keeping in the TTS cache
+    expected_ttfa = 1.0  # Guess used before anything has been measured
+    sample_rate = None
+    
+    SAMPLE_WINDOW = 300  # Seconds a latency sample counts towards selection
+    FAILURE_COOLDOWN = 60
+    
+    def __init__(self):
+        self._samples = deque(maxlen=20)  # (time, ttfa, rtf)
+        self._failed_at = None
+    
+    def is_available(self):
+        """True if the engine can synthesise right now"""
+        return self._failed_at is None or time.time() - self._failed_at > self.FAILURE_COOLDOWN
+    
+    async def synthesize(self, text, voice, on_chunk):
+        raise NotImplementedError
+    
+    def create_player(self, channel):
+        """Stream player for this engine's audio format"""
+        if self.audio_format == 'pcm':
+            return PcmStreamPlayer(channel, self.sample_rate, active=False)
+        return Mp3StreamPlayer(channel, active=False)
+    
+    def record(self, ttfa, rtf):
+        """Add one measured sentence"""
+        self._samples.append((time.time(), ttfa, rtf))
+        self._failed_at = None
+    
+    def record_failure(self):
+        """Skip this engine in automatic selection for a while"""
+        self._failed_at = time.time()
     
-    def __init__(self, temp_file, voice):
+    def _recent(self, index):
+        cutoff = time.time() - self.SAMPLE_WINDOW
+        values = sorted(sample[index] for sample in self._samples if sample[0] >= cutoff and sample[index] is not None)
+        return values
+    
+    @property
+    def ttfa(self):
+        """Median recent time-to-first-audio in seconds, or None if unmeasured"""
+        values = self._recent(1)
+        return values[len(values) // 2] if values else None
+    
+    @property
+    def rtf(self):
+        """Median recent real-time factor, or None if unmeasured"""
+        values = self._recent(2)
+        return values[len(values) // 2] if values else None
+    
+    def estimated_ttfa(self):
+        ttfa = self.ttfa
+        return self.expected_ttfa if ttfa is None else ttfa
+    
+    def over_budget(self, max_ttfa, min_samples=3):
+        """True if enough recent sentences were slower to start than max_ttfa"""
+        values = self._recent(1)
+        return len(values) >= min_samples and values[len(values) // 2] > max_ttfa
+    
+    def metrics(self):
+        return {'engine': self.name, 'ttfa': self.ttfa, 'rtf': self.rtf, 'samples': len(self._recent(1))}
+
+class EdgeSpeechEngine(SpeechEngine):
+    """Microsoft Edge online neural voices (MP3 over the network)"""
+    name = 'edge'
+    audio_format = 'mp3'
+    cacheable = True
+    expected_ttfa = 0.6
+    
+    PROBE_INTERVAL = 60
+    
+    def __init__(self):
         super().__init__()
-        self.temp_file = temp_file
-        self.voice = voice
-        self.text = None
+        self.network_ok = True  # Optimistic until the first probe says otherwise
+        self._probed_at = 0
+        self._probing = False
+    
+    def is_available(self):
+        # Never blocks: refresh the reachability flag in the background when stale
+        if time.time() - self._probed_at > self.PROBE_INTERVAL and not self._probing:
+            self._probing = True
+            threading.Thread(target=self._probe, daemon=True).start()
+        return self.network_ok and super().is_available()
+    
+    def _probe(self):
+        try:
+            socket.create_connection((EDGE_HOST, 443), timeout=2).close()
+            self.network_ok = True
+        except OSError:
+            if self.network_ok:
+                logger.warning("Edge TTS host unreachable, using an offline speech engine")
+            self.network_ok = False
+        finally:
+            self._probed_at = time.time()
+            self._probing = False
+    
+    async def synthesize(self, text, voice, on_chunk):
+        # Imported on first use, like the other engines' libraries
+        import edge_tts
+        communicate = edge_tts.Communicate(text, voice)
+        async for chunk in communicate.stream():
+            if chunk['type'] == 'audio':
+                on_chunk(chunk['data'])
+
+class PiperSpeechEngine(SpeechEngine):
+    """Local neural voice running on the CPU (Piper ONNX models, optional)
+    
+    Needs the piper-tts package and a voice model (.onnx with its .onnx.json
+    config), by default the first one found in voices/.
+    """
+    name = 'piper'
+    audio_format = 'pcm'
+    expected_ttfa = 0.4
+    
+    def __init__(self, model_path=None):
+        super().__init__()
+        self.model_path = model_path or self._find_model()
+        self.sample_rate = self._read_sample_rate()
+        self._voice = None
+        self._load_lock = threading.Lock()
+    
+    def _find_model(self):
+        models = sorted(glob.glob(os.path.join(get_resource_path('voices'), '*.onnx')))
+        return models[0] if models else None
+    
+    def _read_sample_rate(self):
+        try:
+            with open(self.model_path + '.json', 'r') as f:
+                return json.load(f)['audio']['sample_rate']
+        except Exception:
+            return 22050
+    
+    def is_available(self):
+        return (self.model_path is not None and os.path.exists(self.model_path)
+                and importlib.util.find_spec('piper') is not None and super().is_available())
+    
+    def _load(self):
+        with self._load_lock:
+            if self._voice is None:
+                from piper.voice import PiperVoice
+                started = time.perf_counter()
+                self._voice = PiperVoice.load(self.model_path)
+                self.sample_rate = self._voice.config.sample_rate
+                logger.info(f"Loaded Piper voice {os.path.basename(self.model_path)} "
+                            f"in {time.perf_counter() - started:.2f}s")
+        return self._voice
+    
+    async def synthesize(self, text, voice, on_chunk):
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
         
-    def set_text(self, text):
-        self.text = text
+        def produce():
+            # CPU-bound: runs in an executor thread, chunks are handed back to the loop
+            piper_voice = self._load()
+            if hasattr(piper_voice, 'synthesize_stream_raw'):
+                chunks = piper_voice.synthesize_stream_raw(text)
+            else:
+                # piper-tts 1.3+ yields AudioChunk objects
+                chunks = (chunk.audio_int16_bytes for chunk in piper_voice.synthesize(text))
+            for audio in chunks:
+                if stop.is_set():
+                    return
+                loop.call_soon_threadsafe(on_chunk, audio)
         
-    def run(self):
         try:
-            # Create communicate instance and save audio
-            communicate = edge_tts.Communicate(self.text, self.voice)
-            
-            # Create event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            await loop.run_in_executor(None, produce)
+        finally:
+            stop.set()
+        # Let chunks scheduled by the producer reach the player first
+        await asyncio.sleep(0)
+
+class FakeSpeechEngine(SpeechEngine):
+    """Silent engine with configurable latency, for offline runs and benchmarks"""
+    name = 'fake'
+    audio_format = 'pcm'
+    expected_ttfa = 0.05
+    sample_rate = 16000
+    
+    def __init__(self, ttfa=0.05, rtf=0.1, chars_per_second=15):
+        super().__init__()
+        self.fake_ttfa = ttfa
+        self.fake_rtf = rtf
+        self.chars_per_second = chars_per_second
+    
+    async def synthesize(self, text, voice, on_chunk):
+        await asyncio.sleep(self.fake_ttfa)
+        duration = max(0.2, len(text) / self.chars_per_second)
+        chunk_seconds = 0.1
+        chunk = bytes(int(self.sample_rate * chunk_seconds) * 2)
+        for _ in range(int(duration / chunk_seconds)):
+            on_chunk(chunk)
+            await asyncio.sleep(chunk_seconds * self.fake_rtf)
+
+class SystemSpeechEngine(SpeechEngine):
+    """Installed system voices through the shared pyttsx3 backend; synthesises and plays in one call"""
+    name = 'system'
+    streaming = False
+    
+    def __init__(self):
+        super().__init__()
+        self.backend = get_system_voice_backend()
+        self._startup_traced = False
+    
+    def is_available(self):
+        return self.backend.available
+    
+    def speak(self, text, trace_id=None):
+        """Say text on the backend thread, returns a Future that completes once spoken"""
+        started = time.perf_counter()
+        future = self.backend.speak(text)
+        
+        def done(f):
+            if f.exception() is None:
+                # No separate first-audio point; the real-time factor is per estimated speech length
+                self.record(None, (time.perf_counter() - started) / max(1.0, len(text) / 15))
+            # The backend's startup cost belongs to the first interaction that needed it
+            if trace_id and not self._startup_traced and self.backend.startup_span:
+                self._startup_traced = True
+                get_tracer().record_span(trace_id, 'system_voice_startup', *self.backend.startup_span)
+        
+        future.add_done_callback(done)
+        return future
+    
+    def stop(self):
+        self.backend.stop()
+
+# Engines considered by automatic selection, in order of preference
+AUTO_ENGINES = ['edge', 'piper']
+
+class TTSJob:
+    """One utterance waiting for or being processed by the TTS worker"""
+    
+    def __init__(self, job_id, text, voice, engine, trace_id=None, priority=PRIORITY_NORMAL, lookahead=2):
+        self.job_id = job_id
+        self.text = text
+        self.voice = voice
+        self.engine = engine
+        self.trace_id = trace_id
+        self.priority = priority
+        self.lookahead = lookahead
+        self.requested_at = time.time()
+        self.cancelled = False
+        self.generation = 0
+        self.queue = None   # SpeechQueue while the job is playing
+        self.stats = None   # SpeechQueue stats once the job has played
+
+class TTSWorker(QThread):
+    """Long-lived worker that streams Edge TTS audio straight into playback
+    
+    Owns a single event loop and processes jobs one at a time from a priority
+    queue. Jobs are submitted, cancelled and flushed from any thread.
+    """
+    job_started = pyqtSignal(int)
+    job_first_audio = pyqtSignal(int)
+    job_finished = pyqtSignal(int)
+    job_cancelled = pyqtSignal(int)
+    job_error = pyqtSignal(int, str)
+    
+    def __init__(self, channel, cache=None):
+        super().__init__()
+        self.channel = channel
+        self.cache = cache
+        self.current_job = None
+        self._jobs = queue.PriorityQueue()
+        self._sequence = itertools.count()  # Keeps FIFO order within a priority
+        self._generation = 0                # Bumped by flush(); older jobs are skipped
+        self._lock = threading.Lock()
+        self._loop = None
+        self._task = None
+        
+    @property
+    def busy(self):
+        """True while a job is playing or waiting"""
+        return self.current_job is not None or not self._jobs.empty()
+        
+    def submit(self, job):
+        """Queue a job for synthesis and playback"""
+        job.generation = self._generation
+        self._jobs.put((job.priority, next(self._sequence), job))
+        
+    def cancel(self, job=None):
+        """Abort the current job (or the given one if it is current) and stop its playback"""
+        with self._lock:
+            current = self.current_job
+            if current is None or (job is not None and job is not current):
+                if job is not None:
+                    # Not started yet: skipped when it reaches the front of the queue
+                    job.cancelled = True
+                return
+            current.cancelled = True
+            loop, task = self._loop, self._task
+        if loop and task and not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+        # Silence immediately rather than waiting for the playback loop to notice
+        if current.queue:
+            current.queue.stop()
             
+    def flush(self):
+        """Drop every waiting job and cancel the current one"""
+        with self._lock:
+            # Under the lock, so a job being handed to _run_job sees the new generation
+            self._generation += 1
+        while True:
             try:
-                # Generate audio file
-                loop.run_until_complete(communicate.save(self.temp_file))
-                
-                # Play audio
-                pygame.mixer.music.load(self.temp_file)
-                pygame.mixer.music.play()
-                
-                while pygame.mixer.music.get_busy():
-                    time.sleep(0.1)
-                    
-            finally:
-                loop.close()
-                
-            self.finished.emit()
-            
+                _, _, job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.cancelled = True
+                self.job_cancelled.emit(job.job_id)
+            else:
+                # Keep a pending shutdown request
+                self._jobs.put((PRIORITY_URGENT - 1, next(self._sequence), None))
+                break
+        self.cancel()
+        
+    def shutdown(self):
+        """Stop after cancelling outstanding work"""
+        self.flush()
+        self._jobs.put((PRIORITY_URGENT - 1, next(self._sequence), None))
+        
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            while True:
+                _, _, job = self._jobs.get()
+                if job is None:
+                    break
+                if job.cancelled or job.generation < self._generation:
+                    # Cancelled, or taken off the queue just as a flush ran
+                    job.cancelled = True
+                    self.job_cancelled.emit(job.job_id)
+                    continue
+                self._run_job(loop, job)
+        finally:
+            self._loop = None
+            loop.close()
+    
+    def _run_job(self, loop, job):
+        with self._lock:
+            # A flush or cancel may have run since run() took the job off the queue
+            if job.cancelled or job.generation < self._generation:
+                job.cancelled = True
+                stale = True
+            else:
+                stale = False
+                self.current_job = job
+                self._task = loop.create_task(self._stream_and_play(job))
+        if stale:
+            self.job_cancelled.emit(job.job_id)
+            return
+        self.job_started.emit(job.job_id)
+        try:
+            loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
-            self.error.emit(str(e))
+            if job.queue:
+                job.queue.stop()
+            if not job.cancelled:
+                self.job_error.emit(job.job_id, str(e))
+                return
         finally:
-            # Cleanup
-            try:
-                pygame.mixer.music.unload()
-                os.remove(self.temp_file)
-            except:
-                pass
+            with self._lock:
+                self._task = None
+                self.current_job = None
+        
+        if job.cancelled:
+            self.job_cancelled.emit(job.job_id)
+        else:
+            self.job_finished.emit(job.job_id)
+    
+    async def _stream_and_play(self, job):
+        """Play the text sentence by sentence, synthesising ahead of playback"""
+        tracer = get_tracer()
+        job.queue = SpeechQueue(lambda sentence, player: self._synthesize(job, sentence, player),
+                                self.channel, job.lookahead, trace=(tracer, job.trace_id),
+                                create_player=job.engine.create_player,
+                                on_first_audio=lambda: self.job_first_audio.emit(job.job_id))
+        try:
+            job.stats = await job.queue.play(job.text)
+        finally:
+            first_audio_at = job.queue.first_audio_at
+            if first_audio_at is not None:
+                tracer.record_span(job.trace_id, 'first_audio', job.requested_at, first_audio_at,
+                                   engine=job.engine.name)
+                tracer.record_span(job.trace_id, 'playback', first_audio_at, time.time(),
+                                   cancelled=job.cancelled, engine=job.engine.name,
+                                   **self._queue_summary(job.queue))
+    
+    async def _synthesize(self, job, sentence, player):
+        """Synthesise one sentence into its player, or play it from the cache"""
+        engine = job.engine
+        if self.cache and engine.cacheable:
+            cached = self.cache.get(engine.name, job.voice, sentence)
+            if cached is not None:
+                player.feed(cached)
+                return
+        
+        audio = bytearray()
+        started = time.perf_counter()
+        first_chunk = None
+        
+        def on_chunk(data):
+            nonlocal first_chunk
+            if first_chunk is None:
+                first_chunk = time.perf_counter()
+            if engine.cacheable:
+                audio.extend(data)
+            player.feed(data)
+        
+        try:
+            await engine.synthesize(sentence, job.voice, on_chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            engine.record_failure()
+            raise
+        
+        # Only complete sentences reach here; cancelled streams raise before this
+        if first_chunk is not None and player.audio_seconds:
+            engine.record(first_chunk - started, (time.perf_counter() - started) / player.audio_seconds)
+        if self.cache and audio:
+            self.cache.put(engine.name, job.voice, sentence, bytes(audio))
+    
+    def _queue_summary(self, speech_queue):
+        stats = speech_queue.stats
+        return {
+            'sentences': stats['sentences'],
+            'max_queue_depth': stats['max_queue_depth'],
+            'underruns': stats['underruns']
+        }
 
 class TTSEngine(QObject):
     speak_started = pyqtSignal()
     speak_finished = pyqtSignal()
+    speak_cancelled = pyqtSignal(float)  # Cancel-to-silence latency in milliseconds
     speak_error = pyqtSignal(str)
     
     def __init__(self):
         super().__init__()
-        self.windows_engine = None
         self.use_fallback = False
-        self.config = self.load_config()
+        self.config = get_config_service()
+        self.voice_name = self.config.get('voice_name')  # Voice in use, may differ if the saved one is missing
         self.is_speaking = False
-        self.temp_dir = tempfile.mkdtemp()
-        self.tts_worker = None
+        self.audio = get_audio_engine()
+        self.speech_channel = self.audio.channel(SPEECH)
+        # Duck sound effects while speaking
+        self.speak_started.connect(lambda: self.audio.duck(True))
+        self.speak_finished.connect(lambda: self.audio.duck(False))
+        self.speak_cancelled.connect(lambda latency: self.audio.duck(False))
+        self.speak_error.connect(lambda error: self.audio.duck(False))
+        self.jobs = {}  # Edge TTS jobs submitted and not yet done, by job ID
+        self._job_ids = itertools.count(1)
+        self.cancel_requested_at = None  # perf_counter timestamp of the pending stop request
+        self.last_cancel_latency_ms = None
+        self._windows_cancelled = False
+        self.trace_id = None  # Trace of the utterance being spoken
+        self.last_queue_stats = None  # Sentence queue depth/underrun counters of the last utterance
+        self.cache = TTSCache(max_bytes=int(self.config.get('tts_cache_mb') * 1024 * 1024))
+        self.engines = {
+            'edge': EdgeSpeechEngine(),
+            'piper': PiperSpeechEngine(self.config.get('piper_voice')),
+            'fake': FakeSpeechEngine(),
+            'system': SystemSpeechEngine()
+        }
+        
+        # One worker thread and event loop for every utterance
+        self.tts_worker = TTSWorker(self.speech_channel, self.cache)
+        self.tts_worker.job_started.connect(self._on_job_started)
+        self.tts_worker.job_first_audio.connect(self._on_first_audio)
+        self.tts_worker.job_finished.connect(self._on_tts_finished)
+        self.tts_worker.job_cancelled.connect(self._on_tts_cancelled)
+        self.tts_worker.job_error.connect(self._on_tts_error)
+        self.tts_worker.start()
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.shutdown)
+        
         self.setup_engine()
         
+        # Fillers played while thinking, synthesised once per voice
+        self.acknowledgements = AcknowledgementBank(self.audio, self.cache)
+        if self.config.get('acknowledgements') and not self.use_fallback:
+            self.acknowledgements.prepare(self.voice_name)
+        
+        # React only to the settings speech depends on
+        self.config.subscribe(('voice_type', 'voice_name'), self.on_voice_changed)
+        self.config.subscribe('tts_cache_mb', self.on_cache_size_changed)
+        self.config.subscribe('piper_voice', self.on_piper_voice_changed)
+        
         # Log initial state
-        logger.info(f"TTS Engine initialized with config: {self.config}")
+        logger.info(f"TTS Engine initialized with voice: {self.voice_name}")
         logger.info(f"Using fallback: {self.use_fallback}")
     
-    def load_config(self):
-        """Load configuration from config.json"""
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
-        default_config = {
-            'voice_type': 'Edge Voice',
-            'voice_name': 'en-US-AnaNeural',
-            'sleep_timer': 30,
-            'personality_preset': 'ova'
-        }
-        
-        try:
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    loaded_config = json.load(f)
-                    logger.info(f"TTS loaded config: {loaded_config}")
-                    return loaded_config
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
-        
-        return default_config.copy()
-
-    async def _list_voices(self):
-        """List available Edge TTS voices"""
-        try:
-            voices = await edge_tts.list_voices()
-            logger.info("Available Edge TTS voices:")
-            for voice in voices:
-                logger.info(f"- {voice['ShortName']}")
-            return voices
-        except Exception as e:
-            logger.error(f"Error listing voices: {e}")
-            return []
-
     def setup_engine(self):
-        """Setup Edge TTS engine with fallback to Windows voices"""
+        """Setup Edge TTS engine with fallback to Windows voices
+        
+        The Windows voice backend is only started here if it is the selected
+        voice; as a fallback it starts the first time it is needed.
+        """
         try:
-            # First set up Windows engine as fallback
-            self.windows_engine = pyttsx3.init()
-            voices = self.windows_engine.getProperty('voices')
-            
             # Get saved voice settings
-            voice_type = self.config.get('voice_type', 'Edge Voice')
-            voice_name = self.config.get('voice_name', 'en-US-AnaNeural')
+            voice_type = self.config.get('voice_type')
+            voice_name = self.config.get('voice_name')
+            self.voice_name = voice_name
             
             logger.info(f"Setting up TTS with voice type: {voice_type}, voice name: {voice_name}")
             
-            # Configure Windows voice as fallback
-            if len(voices) > 0:
-                if voice_type == 'Windows Voice':
-                    self.windows_engine.setProperty('voice', voice_name)
-                    logger.info(f"Set Windows voice to: {voice_name}")
-                else:
-                    # Use first available voice as fallback
-                    self.windows_engine.setProperty('voice', voices[0].id)
-                    logger.info(f"Set fallback Windows voice to: {voices[0].id}")
-            
-            self.windows_engine.setProperty('rate', 150)
-            self.windows_engine.setProperty('volume', 0.9)
-            
             # If Windows voice is selected, use fallback
             if voice_type == 'Windows Voice':
+                get_system_voice_backend().set_voice(voice_name)
                 self.use_fallback = True
                 logger.info("Using Windows voice as primary")
                 return
             
-            # Test Edge TTS by listing voices
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            voices = loop.run_until_complete(self._list_voices())
-            loop.close()
-            
-            if not voices:
-                raise Exception("No Edge TTS voices available")
-            
-            # Verify the selected voice exists
-            voice_exists = any(v['ShortName'] == voice_name for v in voices)
-            if not voice_exists:
+            # Check the selected voice against the cached catalogue, never the network
+            catalogue = get_voice_catalogue()
+            catalogue.refresh()
+            if not catalogue.has_edge_voice(voice_name):
                 logger.warning(f"Selected voice {voice_name} not found in Edge TTS voices")
                 # Try to find a similar voice
-                for v in voices:
-                    if 'en-US' in v['ShortName']:
-                        voice_name = v['ShortName']
-                        logger.info(f"Using alternative voice: {voice_name}")
-                        break
+                for _, voice_id in catalogue.edge_voices('en-US'):
+                    voice_name = voice_id
+                    self.voice_name = voice_name
+                    logger.info(f"Using alternative voice: {voice_name}")
+                    break
             
             self.use_fallback = False
             logger.info("Edge TTS setup successful")
@@ -181,102 +587,237 @@ class TTSEngine(QObject):
 
     def change_voice(self, voice_name):
         """Change the voice being used"""
-        try:
-            if "Neural" in voice_name:  # Edge voice
-                logger.info(f"Changing to Edge voice: {voice_name}")
-                # Just update the config, voice will be used in next speak call
-                self.use_fallback = False
-                
-                # Update local config only
-                self.config['voice_type'] = 'Edge Voice'
-                self.config['voice_name'] = voice_name
-                logger.info(f"Changed to Edge voice: {voice_name}")
-                
-            else:  # Windows voice
-                logger.info(f"Changing to Windows voice: {voice_name}")
-                if not self.windows_engine:
-                    self.windows_engine = pyttsx3.init()
-                self.windows_engine.setProperty('voice', voice_name)
-                self.use_fallback = True
-                
-                # Update local config only
-                self.config['voice_type'] = 'Windows Voice'
-                self.config['voice_name'] = voice_name
-                logger.info(f"Changed to Windows voice: {voice_name}")
+        if "Neural" in voice_name:  # Edge voice
+            logger.info(f"Changing to Edge voice: {voice_name}")
+            # Just update the config, voice will be used in next speak call
+            self.use_fallback = False
             
-        except Exception as e:
+            self.voice_name = voice_name
+            if self.config.get('acknowledgements'):
+                self.acknowledgements.prepare(voice_name)
+            logger.info(f"Changed to Edge voice: {voice_name}")
+            
+        else:  # Windows voice
+            logger.info(f"Changing to Windows voice: {voice_name}")
+            future = get_system_voice_backend().set_voice(voice_name)
+            future.add_done_callback(self._on_windows_voice_set)
             self.use_fallback = True
-            error_msg = f"Failed to set voice, falling back to Windows: {str(e)}"
+            
+            self.voice_name = voice_name
+    
+    def on_voice_changed(self, changes):
+        self.change_voice(self.config.get('voice_name'))
+    
+    def on_cache_size_changed(self, changes):
+        self.cache.set_max_bytes(int(changes['tts_cache_mb'] * 1024 * 1024))
+    
+    def on_piper_voice_changed(self, changes):
+        # The model is loaded lazily, so swapping the engine is cheap
+        self.engines['piper'] = PiperSpeechEngine(changes['piper_voice'])
+    
+    def _on_windows_voice_set(self, future):
+        """Report a Windows voice that could not be selected (backend thread)"""
+        if future.exception() is not None:
+            error_msg = f"Failed to set Windows voice: {future.exception()}"
             logger.error(error_msg)
             self.speak_error.emit(error_msg)
-            
-            # Try to set up Windows fallback if not already done
-            if not self.windows_engine:
-                try:
-                    self.windows_engine = pyttsx3.init()
-                    voices = self.windows_engine.getProperty('voices')
-                    if voices:
-                        self.windows_engine.setProperty('voice', voices[0].id)
-                except Exception as we:
-                    error_msg = f"Failed to set up Windows fallback: {str(we)}"
-                    logger.error(error_msg)
-                    self.speak_error.emit(error_msg)
+        else:
+            logger.info(f"Changed to Windows voice: {self.voice_name}")
 
-    def speak(self, text):
-        """Speak text using Edge TTS with fallback to Windows voices"""
+    def acknowledge(self, trace_id=None):
+        """Play a short filler clip while the answer is generated, if one is ready"""
+        if self.use_fallback or not self.config.get('acknowledgements'):
+            return
+        if self.acknowledgements.play(self.voice_name):
+            get_tracer().event(trace_id, 'acknowledgement')
+    
+    def prepare_text(self, text, trace_id=None):
+        """Normalise model output for speech, logging and tracing the characters saved"""
+        # Only point at the chat if the answer is actually shown somewhere
+        cutoff = CUTOFF_PHRASE if self.config.get('display_mode') != 'none' else ''
+        spoken, stats = normalize_for_speech(text, self.config.get('max_spoken_chars', DEFAULT_MAX_CHARS), cutoff)
+        if stats['chars_saved'] or stats['truncated']:
+            logger.info(f"Speech text: {stats['chars_in']} -> {stats['chars_out']} chars "
+                        f"({stats['chars_saved']} saved{', truncated' if stats['truncated'] else ''})")
+        get_tracer().event(trace_id, 'tts_text', **stats)
+        return spoken
+    
+    def select_engine(self):
+        """Pick the streaming engine for the next utterance, or None for the system voice
+        
+        The tts_engine setting forces an engine while it is available. In auto
+        mode the Edge voice is used while the network is reachable and its
+        measured time-to-first-audio stays within max_tts_ttfa; otherwise the
+        available engine expected to start speaking soonest wins.
+        """
         if self.use_fallback:
+            return None
+        
+        choice = self.config.get('tts_engine')
+        engine = self.engines.get(choice)
+        if engine and engine.streaming and engine.is_available():
+            return engine
+        
+        preferred = self.engines['edge']
+        if preferred.is_available() and not preferred.over_budget(self.config.get('max_tts_ttfa')):
+            return preferred
+        candidates = [self.engines[name] for name in AUTO_ENGINES if self.engines[name].is_available()]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda e: e.estimated_ttfa())
+    
+    def speak(self, text, trace_id=None, priority=PRIORITY_NORMAL, interrupt=True):
+        """Speak text with the selected speech engine, falling back to Windows voices
+        
+        By default anything still being spoken is cancelled first; with
+        interrupt=False the text is queued behind it by priority. Returns the
+        job ID for streamed speech, or None for the Windows voice.
+        """
+        self.trace_id = trace_id
+        text = self.prepare_text(text, trace_id)
+        if not text:
+            # Nothing speakable (e.g. only emoji)
+            self.acknowledgements.cut()
+            self.speak_finished.emit()
+            return None
+        
+        engine = self.select_engine()
+        if engine is None:
             logger.info("Using Windows fallback for speech")
             self._speak_windows(text)
-        else:
-            logger.info("Using Edge TTS for speech")
-            
-            # Clean up previous worker if it exists
-            if self.tts_worker and self.tts_worker.isRunning():
-                self.tts_worker.terminate()
-                self.tts_worker.wait()
-            
-            # Generate temp file path
-            temp_file = os.path.join(self.temp_dir, 'temp_speech.mp3')
-            
-            # Create and setup worker
-            self.tts_worker = TTSWorker(temp_file, self.config.get('voice_name', 'en-US-AnaNeural'))
-            self.tts_worker.set_text(text)
-            self.tts_worker.finished.connect(self._on_tts_finished)
-            self.tts_worker.error.connect(self._on_tts_error)
-            
-            # Start speaking
-            self.is_speaking = True
-            self.speak_started.emit()
-            self.tts_worker.start()
+            return None
+        
+        logger.info(f"Using {engine.name} engine for speech")
+        if interrupt:
+            self.tts_worker.flush()
+        return self._submit(text, engine, trace_id, priority)
     
-    def _on_tts_finished(self):
-        """Handle TTS completion"""
+    def _submit(self, text, engine, trace_id=None, priority=PRIORITY_NORMAL):
+        job = TTSJob(next(self._job_ids), text, self.voice_name,
+                     engine, trace_id, priority, self.config.get('tts_lookahead'))
+        self.jobs[job.job_id] = job
+        self.is_speaking = True
+        self.tts_worker.submit(job)
+        return job.job_id
+    
+    def engine_metrics(self):
+        """Measured time-to-first-audio and real-time factor per engine"""
+        return [engine.metrics() for engine in self.engines.values()]
+    
+    def stop(self, requested_at=None):
+        """Stop synthesis and playback now, measuring cancel-to-silence latency
+        
+        requested_at is the perf_counter time the user interrupted; defaults to now.
+        """
+        self.acknowledgements.cut()
+        if not self.is_speaking and not self.tts_worker.busy:
+            return
+        self.cancel_requested_at = requested_at or time.perf_counter()
+        logger.info("Stopping speech")
+        
+        if self.tts_worker.busy:
+            self.tts_worker.flush()
+            # Edge playback is silent as soon as the mixer has stopped
+            self._record_cancel_latency()
+        elif self.is_speaking:
+            self._windows_cancelled = True
+            try:
+                self.engines['system'].stop()
+            except Exception as e:
+                logger.error(f"Error stopping Windows TTS: {e}")
+            self._record_cancel_latency()
         self.is_speaking = False
+    
+    def shutdown(self):
+        """Stop the worker thread, waiting briefly for it to exit"""
+        self.tts_worker.shutdown()
+        self.tts_worker.wait(2000)
+        get_system_voice_backend().shutdown()
+    
+    def _record_cancel_latency(self):
+        """Log the time from the interrupt request until playback went silent"""
+        if self.cancel_requested_at is None:
+            return
+        self.last_cancel_latency_ms = (time.perf_counter() - self.cancel_requested_at) * 1000
+        self.cancel_requested_at = None
+        logger.info(f"Cancel-to-silence latency: {self.last_cancel_latency_ms:.1f} ms")
+        self.speak_cancelled.emit(self.last_cancel_latency_ms)
+    
+    def _on_job_started(self, job_id):
+        """Handle the worker starting an utterance"""
+        job = self.jobs.get(job_id)
+        if job:
+            self.trace_id = job.trace_id
+        self.is_speaking = True
+        self.speak_started.emit()
+    
+    def _on_first_audio(self, job_id):
+        """The answer is audible: cut the acknowledgement short"""
+        self.acknowledgements.cut()
+    
+    def _on_tts_cancelled(self, job_id):
+        """Handle a job that was cancelled before or while playing"""
+        self.jobs.pop(job_id, None)
+        if not self.tts_worker.busy:
+            self.is_speaking = False
+        
+    def _on_tts_finished(self, job_id):
+        """Handle TTS completion"""
+        job = self.jobs.pop(job_id, None)
+        if job:
+            self.last_queue_stats = job.stats
+            logger.info(f"Speech engine: {job.engine.metrics()}")
+        logger.info(f"TTS cache: {self.cache.stats()}")
+        if not self.tts_worker.busy:
+            self.is_speaking = False
         self.speak_finished.emit()
         
-    def _on_tts_error(self, error):
+    def _on_tts_error(self, job_id, error):
         """Handle TTS error"""
+        job = self.jobs.pop(job_id, None)
         self.is_speaking = False
-        error_msg = f"Edge TTS error: {error}"
+        engine_name = job.engine.name if job else 'Speech'
+        error_msg = f"{engine_name} TTS error: {error}"
         logger.error(error_msg)
         self.speak_error.emit(error_msg)
-        # Fall back to Windows voice
-        self._speak_windows(self.tts_worker.text)
+        if not job:
+            return
+        # Only the sentences that did not finish playing are spoken again
+        text = job.queue.remaining_text(job.text) if job.queue else job.text
+        if not text:
+            return
+        # The failed engine is now cooling down, so this picks the next best one
+        self.trace_id = job.trace_id
+        engine = self.select_engine()
+        if engine is not None and engine is not job.engine:
+            logger.info(f"Retrying with {engine.name} engine")
+            self._submit(text, engine, job.trace_id, job.priority)
+        else:
+            # Fall back to Windows voice
+            self._speak_windows(text)
         
     def _speak_windows(self, text):
         """Fallback method using Windows voices"""
-        def speak_thread():
-            try:
-                self.is_speaking = True
-                self.speak_started.emit()
-                self.windows_engine.say(text)
-                self.windows_engine.runAndWait()
-                self.is_speaking = False
-                self.speak_finished.emit()
-            except Exception as e:
-                self.is_speaking = False
-                error_msg = f"Windows TTS error: {str(e)}"
+        trace_id = self.trace_id
+        self.acknowledgements.cut()
+        self._windows_cancelled = False
+        self.is_speaking = True
+        self.speak_started.emit()
+        started = time.time()
+        
+        def on_spoken(future):
+            # Runs on the system voice thread; signals are queued to the GUI thread
+            self.is_speaking = False
+            if future.exception() is not None:
+                error_msg = f"Windows TTS error: {str(future.exception())}"
                 logger.error(error_msg)
                 self.speak_error.emit(error_msg)
+                return
+            # pyttsx3 synthesises and plays in one call, so it is traced as playback
+            get_tracer().record_span(trace_id, 'playback', started, time.time(),
+                                     engine='windows', cancelled=self._windows_cancelled)
+            # A stopped utterance is not a finished one
+            if not self._windows_cancelled:
+                self.speak_finished.emit()
         
-        threading.Thread(target=speak_thread, daemon=True).start()
+        self.engines['system'].speak(text, trace_id).add_done_callback(on_spoken)
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import uuid
+import threading
+import logging
+from logging.handlers import RotatingFileHandler
+from resources import get_resource_path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Pipeline stages recorded for each interaction, in order
+STAGES = ['capture', 'endpoint', 'stt', 'llm_ttft', 'llm_complete',
+          'tts_synthesis', 'first_audio', 'playback']
+
+class Span:
+    """A timed stage of one interaction, written when end() is called"""
+
+    def __init__(self, tracer, trace_id, name, attrs):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self.ended = False
+
+    def end(self, **attrs):
+        if self.ended:
+            return
+        self.ended = True
+        self.attrs.update(attrs)
+        self.tracer.record_span(self.trace_id, self.name, self.start, time.time(), **self.attrs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs['error'] = str(exc)
+        self.end()
+
+class Tracer:
+    """Writes interaction spans and events to a rotating JSONL file
+
+    Every line is one JSON object with a trace_id; spans carry start/end epoch
+    seconds and duration_ms, events carry a single ts. helpers/trace_report.py
+    turns the file into per-stage latency percentiles.
+    """
+
+    def __init__(self, path=None, max_bytes=5 * 1024 * 1024, backup_count=3, enabled=True):
+        self.path = path or get_resource_path(os.path.join('traces', 'traces.jsonl'))
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._writer = logging.getLogger('ova.trace')
+        self._writer.propagate = False
+        self._writer.setLevel(logging.INFO)
+        if enabled and not self._writer.handlers:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                handler = RotatingFileHandler(self.path, maxBytes=max_bytes,
+                                              backupCount=backup_count, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self._writer.addHandler(handler)
+            except Exception as e:
+                logger.error(f"Error opening trace file, tracing disabled: {e}")
+                self.enabled = False
+
+    def new_trace(self):
+        """Return a new trace ID for one interaction"""
+        return uuid.uuid4().hex[:16]
+
+    def _write(self, record):
+        if not self.enabled:
+            return
+        try:
+            self._writer.info(json.dumps(record))
+        except Exception as e:
+            logger.error(f"Error writing trace: {e}")
+
+    def start_span(self, trace_id, name, **attrs):
+        """Start a span now; call end() on the result (or use it as a context manager)"""
+        return Span(self, trace_id, name, attrs)
+
+    def record_span(self, trace_id, name, start, end, **attrs):
+        """Record a span whose start and end (epoch seconds) were measured elsewhere"""
+        if trace_id is None:
+            return
+        self._write({
+            'trace_id': trace_id,
+            'span': name,
+            'start': round(start, 6),
+            'end': round(end, 6),
+            'duration_ms': round((end - start) * 1000, 3),
+            'attrs': attrs
+        })
+
+    def event(self, trace_id, name, **attrs):
+        """Record an instantaneous event such as a state transition"""
+        if trace_id is None:
+            return
+        self._write({
+            'trace_id': trace_id,
+            'event': name,
+            'ts': round(time.time(), 6),
+            'attrs': attrs
+        })
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def get_tracer():
+    """Shared tracer instance"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            enabled = os.environ.get('OVA_TRACING', '1') != '0'
+            _tracer = Tracer(enabled=enabled)
+        return _tracer
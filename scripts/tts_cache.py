@@ -0,0 +1,132 @@
+import os
+import hashlib
+import threading
+import time
+import unicodedata
+import logging
+from resources import get_resource_path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+def normalize_text(text):
+    """Canonical form of text for cache keys (unicode NFC, collapsed whitespace)"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+class TTSCache:
+    """Content-addressed on-disk cache of synthesised audio with an LRU byte budget
+
+    Entries are keyed by (engine, voice, normalised text) and stored as one file
+    per key. Recency is tracked with file modification times so it survives
+    restarts; the least recently used entries are evicted once the cache grows
+    past max_bytes.
+    """
+
+    def __init__(self, directory=None, max_bytes=50 * 1024 * 1024, extension='.mp3'):
+        self.directory = directory or get_resource_path(os.path.join('cache', 'tts'))
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> [size, last_used]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for name in os.listdir(self.directory):
+                if not name.endswith(self.extension):
+                    continue
+                stat = os.stat(os.path.join(self.directory, name))
+                self._entries[name[:-len(self.extension)]] = [stat.st_size, stat.st_mtime]
+            logger.info(f"TTS cache: {len(self._entries)} entries, {self.total_bytes} bytes")
+        except Exception as e:
+            logger.error(f"Error loading TTS cache index: {e}")
+
+    @property
+    def total_bytes(self):
+        return sum(size for size, _ in self._entries.values())
+
+    def key(self, engine, voice, text):
+        """Cache key for a piece of synthesised speech"""
+        raw = f"{engine}\0{voice}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def get(self, engine, voice, text):
+        """Return the cached audio bytes or None"""
+        key = self.key(engine, voice, text)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), 'rb') as f:
+                    data = f.read()
+                now = time.time()
+                os.utime(self._path(key), (now, now))
+                self._entries[key][1] = now
+                self.hits += 1
+                return data
+            except OSError:
+                # File vanished underneath us
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+    def put(self, engine, voice, text, data):
+        """Store audio bytes and evict old entries past the byte budget"""
+        if not data or len(data) > self.max_bytes:
+            return
+        key = self.key(engine, voice, text)
+        path = self._path(key)
+        with self._lock:
+            try:
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+                self._entries[key] = [len(data), time.time()]
+            except OSError as e:
+                logger.error(f"Error writing TTS cache entry: {e}")
+                return
+            self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        """Change the byte budget, evicting straight away if it shrank"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until under budget (lock held)"""
+        total = self.total_bytes
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._entries[key]
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'evictions': self.evictions
+            }
@@ -1,33 +1,26 @@
 import speech_recognition as sr
 import threading
 import time
-from ollama import Client
 import os
-import sys
 import json
 import logging
-import pygame
+from audio_engine import get_audio_engine, PROMPTS
+from cancellation import CancellationToken, CancelledError
+from llm_client import LLMClient, LLMUnavailableError
+from model_router import ModelRouter
+from tracing import get_tracer
+from config_service import get_config_service
+from persistence import get_persistent_writer
+from resources import get_resource_path
 
 # Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def get_resource_path(relative_path):
-    """Get the correct resource path whether running as script or frozen exe"""
-    if hasattr(sys, '_MEIPASS'):
-        # Running as PyInstaller bundle
-        base_path = sys._MEIPASS
-    else:
-        # Running as script
-        base_path = os.path.dirname(os.path.dirname(__file__))
-    return os.path.join(base_path, relative_path)
-
 class VoiceAssistant:
     def __init__(self, callback=None):
         self.callback = callback
         self.recognizer = sr.Recognizer()
         self.is_listening = False
-        self.client = Client(host='http://localhost:11434')
         self.last_text = ""  # Store the last recognized text
         self.mic = None  # Microphone instance
         self.listen_thread = None
@@ -35,24 +28,24 @@ class VoiceAssistant:
         self.direct_listen_timer = None
         self.no_response_timer = None
         self.conversation_history = []  # Store conversation history
+        self.history_path = None  # File the current conversation is stored in
+        self.current_token = None  # Cancellation token for the in-flight interaction
+        self.current_trace_id = None  # Trace ID of the in-flight interaction
+        self.tracer = get_tracer()
+        self.response_thread = None
         
-        # Load config and history
-        self.config = self.load_config()
+        # Shared config and the current conversation
+        self.config = get_config_service()
         self.load_conversation_history()
+        self.client = LLMClient(host=self.config.get('ollama_host'))
+        self.router = ModelRouter(self.config)
+        self.config.subscribe('model_routing', self.on_routing_changed)
+        self.config.subscribe('ollama_host', self.on_host_changed)
+        self.config.subscribe(('current_conversation', 'save_conversation_history', 'max_conversation_pairs'),
+                              self.on_history_settings_changed)
         
-        # Sound file paths and initialization
-        self.activation_sound = get_resource_path(os.path.join('assets', 'sounds', 'HeyOva.mp3'))
-        self.no_answer_sound = get_resource_path(os.path.join('assets', 'sounds', 'NoAnswer.mp3'))
-        
-        # Load sounds
-        pygame.mixer.init()
-        try:
-            self.activation_sound_obj = pygame.mixer.Sound(self.activation_sound)
-            self.no_answer_sound_obj = pygame.mixer.Sound(self.no_answer_sound)
-        except Exception as e:
-            print(f"Error loading sounds: {e}")
-            self.activation_sound_obj = None
-            self.no_answer_sound_obj = None
+        # Activation and no-answer sounds come preloaded from the shared audio engine
+        self.audio = get_audio_engine()
         
         logger.info(f"Voice assistant initialized with config: {self.config}")
         
@@ -64,19 +57,6 @@ class VoiceAssistant:
         self.recognizer.non_speaking_duration = 0.5  # Shorter non-speaking duration
         self.recognizer.operation_timeout = None  # No timeout
 
-    def load_config(self):
-        """Load configuration from config.json"""
-        config_path = get_resource_path('config.json')
-        try:
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                    logger.info(f"Loaded config: {config}")
-                    return config
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
-        return {'personality_preset': 'ova'}
-    
     def load_conversation_history(self):
         """Load conversation history from file"""
         history_dir = get_resource_path('history')
@@ -98,18 +78,15 @@ class VoiceAssistant:
             else:
                 # Create first conversation file
                 history_path = os.path.join(history_dir, '1.json')
-                with open(history_path, 'w') as f:
-                    json.dump([], f)
+                get_persistent_writer().write_json(history_path, [], immediate=True)
             
-            # Update config with current conversation
-            self.config['current_conversation'] = os.path.basename(history_path)
-            try:
-                config_path = get_resource_path('config.json')
-                with open(config_path, 'w') as f:
-                    json.dump(self.config, f)
-            except Exception as e:
-                logger.error(f"Error saving config: {e}")
+            # Remember it as the current conversation
+            self._remember_conversation(history_path)
+        
+        self.history_path = history_path if self.config.get('save_conversation_history', True) else None
         
+        # Make sure a save still waiting to be written is not read back stale
+        get_persistent_writer().flush(history_path)
         try:
             if os.path.exists(history_path) and self.config.get('save_conversation_history', True):
                 with open(history_path, 'r') as f:
@@ -123,6 +100,11 @@ class VoiceAssistant:
             logger.error(f"Error loading conversation history: {e}")
             self.conversation_history = []
 
+    def _remember_conversation(self, history_path):
+        """Store history_path as the current conversation in the config"""
+        self.history_path = history_path
+        self.config.set('current_conversation', os.path.basename(history_path))
+
     def save_conversation_history(self):
         """Save conversation history to file"""
         if not self.config.get('save_conversation_history', True):
@@ -146,14 +128,8 @@ class VoiceAssistant:
                 # Create first conversation file
                 history_path = os.path.join(history_dir, '1.json')
                 
-            # Update config with current conversation
-            self.config['current_conversation'] = os.path.basename(history_path)
-            try:
-                config_path = get_resource_path('config.json')
-                with open(config_path, 'w') as f:
-                    json.dump(self.config, f)
-            except Exception as e:
-                logger.error(f"Error saving config: {e}")
+            # Remember it as the current conversation
+            self._remember_conversation(history_path)
             
         try:
             # Ensure we don't exceed max pairs
@@ -161,41 +137,65 @@ class VoiceAssistant:
             if len(self.conversation_history) > max_pairs * 2:
                 self.conversation_history = self.conversation_history[-(max_pairs * 2):]
                 
-            with open(history_path, 'w') as f:
-                json.dump(self.conversation_history, f)
+            # Written atomically, and only once per burst of saves
+            get_persistent_writer().write_json(history_path, self.conversation_history)
             logger.info(f"Saved {len(self.conversation_history)} messages to history")
         except Exception as e:
             logger.error(f"Error saving conversation history: {e}")
 
-    def reload_config(self):
-        """Reload configuration"""
-        self.config = self.load_config()
-        logger.info(f"Reloaded voice assistant config: {self.config}")
-        # Reload conversation history with new settings
-        self.load_conversation_history()
+    def on_routing_changed(self, changes):
+        self.router.update_config(self.config)
+    
+    def on_host_changed(self, changes):
+        # Point at a different Ollama (e.g. helpers/fake_ollama.py)
+        if changes['ollama_host'] != self.client.host:
+            self.client.close()
+            self.client = LLMClient(host=changes['ollama_host'])
+    
+    def on_history_settings_changed(self, changes):
+        """Reload the history when the conversation changes, otherwise just apply the new limit"""
+        # Changes are delivered later on the GUI thread, so our own pick of a
+        # conversation file (already loaded) is recognised by its name
+        conversation = changes.get('current_conversation')
+        if conversation is not None and self.history_path and conversation == os.path.basename(self.history_path):
+            changes = {key: value for key, value in changes.items() if key != 'current_conversation'}
+        if 'current_conversation' in changes or 'save_conversation_history' in changes:
+            self.load_conversation_history()
+        elif 'max_conversation_pairs' in changes:
+            max_pairs = changes['max_conversation_pairs']
+            self.conversation_history = self.conversation_history[-(max_pairs * 2):]
 
     def start_listening(self):
-        """Start continuous listening in a separate thread"""
+        """Start continuous listening in a separate thread
+        
+        The microphone is opened and calibrated on that thread unless
+        open_microphone() has already been called.
+        """
         if not self.is_listening:
             self.is_listening = True
             
-            # Initialize microphone if not already done
-            if self.mic is None:
-                try:
-                    self.mic = sr.Microphone()
-                    with self.mic as source:
-                        print("Adjusting for ambient noise...")
-                        self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                except Exception as e:
-                    print(f"Error initializing microphone: {e}")
-                    return
-            
             # Start listening thread
             self.listen_thread = threading.Thread(target=self._continuous_listen, daemon=True)
             self.listen_thread.start()
 
+    def open_microphone(self):
+        """Open and calibrate the microphone if not done yet (blocks for about a second)"""
+        if self.mic is None:
+            mic = sr.Microphone()
+            with mic as source:
+                print("Adjusting for ambient noise...")
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            self.mic = mic
+
     def _continuous_listen(self):
         """Continuous listening function running in separate thread"""
+        try:
+            self.open_microphone()
+        except Exception as e:
+            print(f"Error initializing microphone: {e}")
+            self.is_listening = False
+            return
+        
         print("Starting continuous listening...")
         
         # List of wake word variations
@@ -209,9 +209,9 @@ class VoiceAssistant:
             while self.is_listening:
                 try:
                     # Use shorter phrase time limit for wake word detection
-                    audio = self.recognizer.listen(source, timeout=None, phrase_time_limit=2)
+                    audio, timings = self._listen_timed(source, timeout=None, phrase_time_limit=2)
                     try:
-                        text = self.recognizer.recognize_google(audio).lower()
+                        text = self._recognize_timed(audio, timings)
                         print("Heard:", text)
                         
                         # Check for wake word or direct listen mode
@@ -223,13 +223,22 @@ class VoiceAssistant:
                                     break
                         
                         if detected_wake_word or self.direct_listen_mode:
+                            # A new wake word barges in on whatever Ova is still doing
+                            if detected_wake_word:
+                                self.interrupt()
+                            
+                            # Every wake word (or direct-mode answer) starts a new trace
+                            trace_id = self.tracer.new_trace()
+                            self.current_trace_id = trace_id
+                            self._record_stages(trace_id, timings, phase='wake' if detected_wake_word else 'direct')
+                            
                             # Play activation sound for wake word only
-                            if detected_wake_word and self.activation_sound_obj:
-                                self.activation_sound_obj.play()
+                            if detected_wake_word:
+                                self.audio.play('activation', PROMPTS)
                             
                             # Start listening animation if not already listening
                             if not self.direct_listen_mode and self.callback:
-                                self.callback("START_LISTENING")
+                                self.callback(("START_LISTENING", trace_id))
                             
                             # Flag to track if we got a response
                             got_response = False
@@ -239,8 +248,8 @@ class VoiceAssistant:
                                 # In direct listen mode, process the text directly
                                 got_response = True
                                 if self.callback:
-                                    self.callback("START_THINKING")
-                                self._generate_response(text)
+                                    self.callback(("START_THINKING", trace_id))
+                                self._start_response(text, trace_id)
                                 # Exit direct listen mode
                                 self.stop_direct_listening()
                             else:
@@ -249,8 +258,8 @@ class VoiceAssistant:
                                 if command_after_wake:
                                     got_response = True
                                     if self.callback:
-                                        self.callback("START_THINKING")
-                                    self._generate_response(command_after_wake)
+                                        self.callback(("START_THINKING", trace_id))
+                                    self._start_response(command_after_wake, trace_id)
                                 else:
                                     # Start no-response timer
                                     if self.no_response_timer:
@@ -259,10 +268,9 @@ class VoiceAssistant:
                                     def handle_no_response():
                                         nonlocal got_response
                                         if not got_response:
-                                            if self.no_answer_sound_obj:
-                                                self.no_answer_sound_obj.play()
+                                            self.audio.play('no_answer', PROMPTS)
                                             if self.callback:
-                                                self.callback("STOP_LISTENING")
+                                                self.callback(("STOP_LISTENING", trace_id))
                                             got_response = True
                                     
                                     self.no_response_timer = threading.Timer(10.0, handle_no_response)
@@ -274,9 +282,10 @@ class VoiceAssistant:
                                         start_time = time.time()
                                         while not got_response and time.time() - start_time < 5:
                                             try:
-                                                command_audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
-                                                command_text = self.recognizer.recognize_google(command_audio).lower()
+                                                command_audio, command_timings = self._listen_timed(source, timeout=1, phrase_time_limit=10)
+                                                command_text = self._recognize_timed(command_audio, command_timings)
                                                 print("Command:", command_text)
+                                                self._record_stages(trace_id, command_timings, phase='command')
                                                 
                                                 if self.no_response_timer:
                                                     self.no_response_timer.cancel()
@@ -285,8 +294,8 @@ class VoiceAssistant:
                                                 
                                                 if command_text:
                                                     if self.callback:
-                                                        self.callback("START_THINKING")
-                                                    self._generate_response(command_text)
+                                                        self.callback(("START_THINKING", trace_id))
+                                                    self._start_response(command_text, trace_id)
                                                 break
                                                 
                                             except sr.WaitTimeoutError:
@@ -311,6 +320,32 @@ class VoiceAssistant:
                         print(f"Error in continuous listening: {e}")
                         time.sleep(0.5)
 
+    def _listen_timed(self, source, **kwargs):
+        """Capture one phrase, returning (audio, stage timings) for tracing"""
+        start = time.time()
+        audio = self.recognizer.listen(source, **kwargs)
+        end = time.time()
+        # The recognizer ends a phrase after pause_threshold seconds of silence,
+        # so the tail of the capture is endpoint detection rather than speech
+        endpoint_start = max(start, end - self.recognizer.pause_threshold)
+        # listen() also waits for speech to begin; only the recorded audio counts as
+        # capture, so idle time before the user spoke does not inflate the trace
+        duration = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        onset = min(max(start, end - duration), endpoint_start)
+        return audio, {'capture': (onset, endpoint_start), 'endpoint': (endpoint_start, end)}
+
+    def _recognize_timed(self, audio, timings):
+        """Run speech-to-text, adding its timing to timings"""
+        start = time.time()
+        text = self.recognizer.recognize_google(audio).lower()
+        timings['stt'] = (start, time.time())
+        return text
+
+    def _record_stages(self, trace_id, timings, **attrs):
+        """Write measured capture/endpoint/STT timings as spans of a trace"""
+        for name, (start, end) in timings.items():
+            self.tracer.record_span(trace_id, name, start, end, **attrs)
+
     def stop_listening(self):
         """Stop the listening thread"""
         self.is_listening = False
@@ -321,7 +356,7 @@ class VoiceAssistant:
     def start_direct_listening(self, timeout=5):
         """Start listening directly without wake word for a specified duration"""
         self.direct_listen_mode = True
-        self.callback("START_LISTENING")  # Trigger listening animation
+        self.callback(("START_LISTENING", None))  # Trigger listening animation
         
         # Start no-response timer
         if self.no_response_timer:
@@ -330,10 +365,9 @@ class VoiceAssistant:
         def handle_no_response():
             self.direct_listen_mode = False
             self.direct_listen_timer = None
-            if self.no_answer_sound_obj:
-                self.no_answer_sound_obj.play()
+            self.audio.play('no_answer', PROMPTS)
             if self.callback:
-                self.callback("STOP_LISTENING")
+                self.callback(("STOP_LISTENING", None))
         
         self.no_response_timer = threading.Timer(timeout, handle_no_response)
         self.no_response_timer.start()
@@ -360,8 +394,7 @@ class VoiceAssistant:
     def handle_no_response(self):
         """Handle when no response is received after wake word"""
         try:
-            if self.no_answer_sound_obj:
-                self.no_answer_sound_obj.play()
+            self.audio.play('no_answer', PROMPTS)
         except Exception as e:
             print(f"Error playing no-answer sound: {e}")
         finally:
@@ -369,8 +402,30 @@ class VoiceAssistant:
             if self.direct_listen_mode:
                 self.stop_direct_listening()
 
-    def _generate_response(self, text):
-        """Generate a response using Ollama with llama3.2"""
+    def interrupt(self):
+        """Cancel the in-flight interaction (generation, speech and pending display updates)"""
+        token = self.current_token
+        if token is None or token.cancelled:
+            return
+        logger.info("Interrupting current interaction")
+        token.cancel()
+        if self.callback:
+            self.callback(("INTERRUPT", token))
+
+    def _start_response(self, text, trace_id=None):
+        """Generate a response on a worker thread so the listen loop stays responsive"""
+        # Make sure a stale generation can never deliver after this one
+        if self.current_token:
+            self.current_token.cancel()
+        token = CancellationToken()
+        self.current_token = token
+        self.response_thread = threading.Thread(target=self._generate_response, args=(text, token, trace_id), daemon=True)
+        self.response_thread.start()
+
+    def _generate_response(self, text, token=None, trace_id=None):
+        """Generate a response using the Ollama model picked by the router"""
+        if token is None:
+            token = CancellationToken()
         try:
             print("Generating response for:", text)
             
@@ -404,10 +459,30 @@ class VoiceAssistant:
                 'content': text
             })
             
-            # Generate response using llama3.2 with selected preset and history
-            response = self.client.chat(model='llama3.2:latest', messages=messages)
+            # Stream the response on the LLM client's event loop; cancelling the
+            # token aborts the request even before the first chunk arrives
+            model = self.router.route(text)
+            logger.info(f"Routing prompt to model: {model}")
             
-            response_text = response['message']['content']
+            def on_stats(stats):
+                self.router.record(model, stats)
+                # Trace time to first token and completion from the request start
+                started = time.time() - stats['latency']
+                if stats['ttft'] is not None:
+                    self.tracer.record_span(trace_id, 'llm_ttft', started, started + stats['ttft'], model=model)
+                self.tracer.record_span(trace_id, 'llm_complete', started, started + stats['latency'],
+                                        model=model, eval_count=stats.get('eval_count'))
+            
+            def on_chunk(content):
+                # Let the display show the answer as it is written
+                if self.callback and not token.cancelled:
+                    self.callback(("PARTIAL", (content, text, token)))
+            
+            try:
+                response_text = self.client.chat(model, messages, token=token, on_chunk=on_chunk, on_stats=on_stats)
+            except CancelledError:
+                logger.info("Response generation cancelled")
+                return
             print("Generated response:", response_text)
             
             # Add the exchange to conversation history
@@ -428,18 +503,47 @@ class VoiceAssistant:
             # Save updated history
             self.save_conversation_history()
             
-            if self.callback:
-                self.callback((response_text, text))  # Pass tuple of (response, last_text)
+            if self.callback and not token.cancelled:
+                self.callback((response_text, text, token, trace_id))  # Pass tuple of (response, last_text, token, trace_id)
+        except LLMUnavailableError as e:
+            print(f"Ollama unavailable: {e}")
+            if self.callback and not token.cancelled:
+                self.callback(("I'm sorry Miss Kathy, my little owl brain is having trouble thinking right now. Could you please make sure my friend Ollama is running?", text, token, trace_id))
         except Exception as e:
             print(f"Error generating response: {e}")
-            if self.callback:
-                self.callback(("I'm sorry Miss Kathy, my little owl brain is having trouble thinking right now. Could you please make sure my friend Ollama is running?", text))
+            if self.callback and not token.cancelled:
+                self.callback(("I'm sorry Miss Kathy, my little owl brain is having trouble thinking right now. Could you please make sure my friend Ollama is running?", text, token, trace_id))
 
     def test_ollama(self):
-        """Test if Ollama is running and check for llama3.2"""
+        """Test if Ollama is running and check for the routed models"""
         try:
-            models = self.client.list()
-            if not any(model['name'] == 'llama3.2:latest' for model in models['models']):
-                print("Warning: llama3.2 model not found. Please run: ollama pull llama3.2")
+            self.check_models()
         except Exception as e:
             print("Error connecting to Ollama. Make sure it's running:", e)
+
+    def check_models(self):
+        """Warn about routed models that are not installed, raises if Ollama cannot be reached"""
+        installed = set()
+        for model in self.client.list_models(timeout=5):
+            # Newer clients return Model objects keyed 'model', older ones dicts keyed 'name'
+            name = model.get('model') or model.get('name')
+            if name:
+                installed.update((name, name.removesuffix(':latest')))
+        for name in self.router.models():
+            if name not in installed:
+                print(f"Warning: {name} model not found. Please run: ollama pull {name}")
+
+    def warm_up(self):
+        """Check Ollama and load the fast model so the first answer is not slowed by it
+        
+        Blocks; run it off the GUI thread. Raises if the model cannot be loaded.
+        """
+        try:
+            self.check_models()
+        except Exception as e:
+            # Listing is only for the warning; loading the model is what the stage waits for
+            logger.warning(f"Could not list Ollama models: {e}")
+        model = self.router.policy['fast_model']
+        started = time.perf_counter()
+        self.client.warm_up(model, timeout=60)
+        logger.info(f"Loaded {model} in {time.perf_counter() - started:.2f}s")
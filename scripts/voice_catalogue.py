@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+import logging
+from PyQt5.QtCore import QObject, pyqtSignal
+from system_voice import get_system_voice_backend
+from persistence import get_persistent_writer
+from resources import get_resource_path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Display names that differ from the generated ones
+FRIENDLY_NAMES = {
+    # Rename Ana to Ova
+    'en-US-AnaNeural': 'Ova'
+}
+
+# Region labels that differ from the locale code
+REGION_NAMES = {
+    'GB': 'UK'
+}
+
+# Edge voices offered before the catalogue has ever been fetched
+BUNDLED_EDGE_VOICES = [
+    # US Voices
+    'en-US-AnaNeural', 'en-US-AriaNeural', 'en-US-ChristopherNeural', 'en-US-EricNeural',
+    'en-US-GuyNeural', 'en-US-JennyNeural', 'en-US-MichelleNeural', 'en-US-RogerNeural',
+    'en-US-SteffanNeural',
+    # US Multilingual
+    'en-US-AvaMultilingualNeural', 'en-US-AndrewMultilingualNeural',
+    'en-US-EmmaMultilingualNeural', 'en-US-BrianMultilingualNeural',
+    # UK Voices
+    'en-GB-LibbyNeural', 'en-GB-MaisieNeural', 'en-GB-RyanNeural', 'en-GB-SoniaNeural',
+    'en-GB-ThomasNeural',
+    # Australian Voices
+    'en-AU-NatashaNeural', 'en-AU-WilliamNeural',
+    # Canadian Voices
+    'en-CA-ClaraNeural', 'en-CA-LiamNeural',
+    # Irish Voices
+    'en-IE-ConnorNeural', 'en-IE-EmilyNeural',
+    # Indian Voices
+    'en-IN-NeerjaNeural', 'en-IN-NeerjaExpressiveNeural', 'en-IN-PrabhatNeural',
+    # South African Voices
+    'en-ZA-LeahNeural', 'en-ZA-LukeNeural',
+    # Other Regional Voices
+    'en-KE-AsiliaNeural', 'en-KE-ChilembaNeural', 'en-NZ-MitchellNeural', 'en-NZ-MollyNeural',
+    'en-NG-AbeoNeural', 'en-NG-EzinneNeural', 'en-PH-JamesNeural', 'en-PH-RosaNeural',
+    'en-SG-LunaNeural', 'en-SG-WayneNeural', 'en-TZ-ElimuNeural', 'en-TZ-ImaniNeural'
+]
+
+def edge_display_name(short_name):
+    """Readable name for an Edge voice, e.g. en-US-AvaMultilingualNeural -> Ava (US Multi)"""
+    if short_name in FRIENDLY_NAMES:
+        return FRIENDLY_NAMES[short_name]
+    parts = short_name.split('-')
+    if len(parts) < 3:
+        return short_name
+    region = REGION_NAMES.get(parts[1], parts[1])
+    name = '-'.join(parts[2:])
+    if name.endswith('Neural'):
+        name = name[:-len('Neural')]
+    if name.endswith('Multilingual'):
+        name = name[:-len('Multilingual')]
+        region += ' Multi'
+    # Split camel case, e.g. NeerjaExpressive -> Neerja Expressive
+    name = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', name)
+    return f"{name} ({region})"
+
+class VoiceCatalogue(QObject):
+    """Edge and Windows voices, persisted on disk and refreshed in the background
+
+    Lookups never touch the network: they read the cached catalogue, or the
+    bundled Edge voice list until the first successful fetch. refresh() starts
+    a background fetch once the cache is older than the TTL and emits updated
+    when new voices have been stored.
+    """
+    updated = pyqtSignal()
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600):
+        super().__init__()
+        self.path = path or get_resource_path(os.path.join('cache', 'voices.json'))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._data = {'fetched_at': 0, 'edge': [], 'windows': []}
+        self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    self._data.update(json.load(f))
+        except Exception as e:
+            logger.error(f"Error loading voice catalogue: {e}")
+
+    def _save(self):
+        get_persistent_writer().write_json(self.path, self._data)
+
+    @property
+    def is_stale(self):
+        return time.time() - self._data.get('fetched_at', 0) > self.ttl
+
+    def edge_voices(self, prefix='en-'):
+        """List of (display name, short name) for Edge voices whose locale starts with prefix"""
+        with self._lock:
+            ids = [v['id'] for v in self._data['edge']] or BUNDLED_EDGE_VOICES
+        # Renamed voices (Ova) first
+        ids = sorted(ids, key=lambda i: i not in FRIENDLY_NAMES)
+        return [(edge_display_name(i), i) for i in ids if i.startswith(prefix)]
+
+    def windows_voices(self):
+        """List of (name, id) for installed Windows voices, as last reported"""
+        with self._lock:
+            return [(v['name'], v['id']) for v in self._data['windows']]
+
+    def has_edge_voice(self, voice_id):
+        return any(i == voice_id for _, i in self.edge_voices(prefix=''))
+
+    def display_name(self, voice_id):
+        """Name shown in the settings for a voice ID"""
+        for name, i in self.edge_voices(prefix='') + self.windows_voices():
+            if i == voice_id:
+                return name
+        return voice_id
+
+    def set_windows_voices(self, voices):
+        """Store the installed Windows voices as (name, id) pairs"""
+        voices = [{'name': name, 'id': voice_id} for name, voice_id in voices]
+        with self._lock:
+            if voices == self._data['windows']:
+                return
+            self._data['windows'] = voices
+            self._save()
+        self.updated.emit()
+
+    def refresh_windows_voices(self):
+        """Ask the shared system voice backend for installed voices, starting it if needed"""
+        def on_voices(future):
+            if future.exception() is None:
+                self.set_windows_voices(future.result())
+            else:
+                logger.warning(f"Could not list Windows voices: {future.exception()}")
+        get_system_voice_backend().voices().add_done_callback(on_voices)
+
+    def refresh(self, force=False):
+        """Fetch the Edge voice list in a background thread if the cache is stale"""
+        with self._lock:
+            if self._refreshing or not (force or self.is_stale):
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_thread, daemon=True).start()
+
+    def _refresh_thread(self):
+        try:
+            import edge_tts
+            voices = asyncio.run(edge_tts.list_voices())
+            if not voices:
+                raise Exception("No Edge TTS voices returned")
+            edge = [{'id': v['ShortName'], 'locale': v.get('Locale', ''), 'gender': v.get('Gender', '')}
+                    for v in voices]
+            with self._lock:
+                self._data['edge'] = edge
+                self._data['fetched_at'] = time.time()
+                self._save()
+            logger.info(f"Voice catalogue refreshed: {len(edge)} Edge voices")
+            self.updated.emit()
+        except Exception as e:
+            # Keep serving the cached or bundled list; try again on the next refresh
+            logger.warning(f"Could not refresh Edge voice catalogue: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+_catalogue = None
+_catalogue_lock = threading.Lock()
+
+def get_voice_catalogue():
+    """Shared voice catalogue instance"""
+    global _catalogue
+    with _catalogue_lock:
+        if _catalogue is None:
+            _catalogue = VoiceCatalogue()
+        return _catalogue